@@ -0,0 +1,159 @@
+import json
+import os
+import time
+import tracemalloc
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock, MagicMock, patch
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+
+from benchmark.fake_api import FakeSpypointApi
+from custom_components.spypoint import DOMAIN, SpypointCoordinator
+from custom_components.spypoint import device_tracker, sensor
+
+SIZES = [int(size) for size in os.environ.get('SPYPOINT_BENCH_SIZES', '10,100,1000,5000').split(',')]
+BASELINE = Path(__file__).with_name('baseline.json')
+UPDATE_BASELINE = os.environ.get('SPYPOINT_BENCH_UPDATE') == '1'
+
+# wall time is noisy across machines, memory and state writes are not
+TOLERANCES = {'seconds': 2.0, 'peak_kib': 1.25, 'writes': 1.0}
+# sub-millisecond stages of small fleets jitter more than any ratio
+NOISE_FLOORS = {'seconds': 0.005, 'peak_kib': 0.0, 'writes': 0}
+METRICS = os.environ.get('SPYPOINT_BENCH_METRICS', ','.join(TOLERANCES)).split(',')
+
+
+class Measure:
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.peak_kib = 0.0
+        self.writes = 0
+
+
+class FleetBenchmark(IsolatedAsyncioTestCase):
+    """Measures setup, refresh and entity fan-out cost of synthetic fleets.
+
+    Run with `make benchmark`, record a new baseline with `make benchmark-baseline`.
+    """
+
+    baseline: dict = {}
+    results: dict = {}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        cls.results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        for stage, sizes in sorted(cls.results.items()):
+            for size, result in sorted(sizes.items(), key=lambda item: int(item[0])):
+                print(f"{stage:<10} {size:>6} cameras {result['seconds'] * 1000:>10.1f} ms "
+                      f"{result['peak_kib']:>10.0f} KiB {result['writes']:>8} writes")
+        if UPDATE_BASELINE:
+            BASELINE.write_text(json.dumps(cls.results, indent=2, sort_keys=True) + '\n')
+
+    async def test_platform_setup(self):
+        for size in SIZES:
+            coordinator = await self.coordinator(size)
+            entities = []
+
+            async def setup():
+                entities.clear()
+                for platform in (sensor, device_tracker):
+                    await platform.async_setup_entry(self.hass(coordinator), self.entry(), entities.extend)
+
+            result = await self.measure(setup)
+            self.assertEqual(len(entities), size * 12 + len(sensor.METRICS) + len(sensor.FLEET_SENSORS))
+            self.check('setup', size, result)
+
+    async def test_coordinator_refresh(self):
+        for size in SIZES:
+            coordinator = await self.coordinator(size)
+
+            async def refresh():
+                coordinator.data = await coordinator._async_update_data()
+
+            result = await self.measure(refresh)
+            self.assertEqual(len(coordinator.changes), coordinator.api.checking_in)
+            self.check('refresh', size, result)
+
+    async def test_entity_fan_out(self):
+        for size in SIZES:
+            coordinator = await self.coordinator(size)
+            entities = []
+            for platform in (sensor, device_tracker):
+                await platform.async_setup_entry(self.hass(coordinator), self.entry(), entities.extend)
+            # entities disabled by default are never added to hass
+            entities = [entity for entity in entities if entity.entity_registry_enabled_default]
+            for entity in entities:
+                await entity.async_added_to_hass()
+            coordinator.data = await coordinator._async_update_data()
+
+            async def fan_out():
+                for entity in entities:
+                    entity._handle_coordinator_update()
+
+            result = await self.measure(fan_out)
+            # each check-in changes the battery, last update and battery prediction sensors,
+            # the first drop below the starting battery level moves the fleet's lowest battery
+            self.assertEqual(result.writes, coordinator.api.checking_in * 4 + 1)
+            self.check('fan_out', size, result)
+
+    async def measure(self, stage) -> Measure:
+        result = Measure()
+
+        def count_write(_):
+            result.writes += 1
+
+        with patch.object(Entity, 'async_write_ha_state', count_write):
+            started = time.perf_counter()
+            await stage()
+            result.seconds = time.perf_counter() - started
+
+        tracemalloc.start()
+        try:
+            with patch.object(Entity, 'async_write_ha_state', lambda _: None):
+                await stage()
+            result.peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+        return result
+
+    def check(self, stage: str, size: int, result: Measure) -> None:
+        measured = {'seconds': result.seconds, 'peak_kib': result.peak_kib, 'writes': result.writes}
+        self.results.setdefault(stage, {})[str(size)] = measured
+        if UPDATE_BASELINE:
+            return
+        baseline = self.baseline.get(stage, {}).get(str(size))
+        if baseline is None:
+            self.fail(f'no baseline for {stage} of {size} cameras, record one with make benchmark-baseline')
+        for metric in METRICS:
+            with self.subTest(stage=stage, size=size, metric=metric):
+                limit = max(baseline[metric] * TOLERANCES[metric], baseline[metric] + NOISE_FLOORS[metric])
+                self.assertLessEqual(measured[metric], limit,
+                                     f'{stage} of {size} cameras regressed on {metric}')
+
+    @staticmethod
+    async def coordinator(size: int) -> SpypointCoordinator:
+        entry = Mock(ConfigEntry)
+        entry.entry_id = 'entry'
+        entry.title = 'fleet@example.com'
+        coordinator = SpypointCoordinator(Mock(HomeAssistant), FakeSpypointApi(size), entry)
+        coordinator.async_add_listener = MagicMock()
+        coordinator.data = await coordinator._async_update_data()
+        return coordinator
+
+    @staticmethod
+    def hass(coordinator: SpypointCoordinator) -> HomeAssistant:
+        hass = Mock(HomeAssistant)
+        hass.data = {DOMAIN: {'entry': coordinator}}
+        return hass
+
+    @staticmethod
+    def entry() -> ConfigEntry:
+        entry = Mock(ConfigEntry)
+        entry.entry_id = 'entry'
+        return entry
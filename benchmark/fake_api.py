@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from spypointapi import Camera, Coordinates
+
+
+class FakeSpypointApi:
+    """Serves a synthetic fleet of cameras, a share of them checking in on each fetch."""
+
+    def __init__(self, count: int, check_in_ratio: float = 0.1) -> None:
+        self.now = datetime(2024, 6, 1, 12, 0).astimezone()
+        self.check_in_ratio = check_in_ratio
+        self.fetches = 0
+        self.cameras = [self._camera(index) for index in range(count)]
+
+    async def async_get_cameras(self) -> list[Camera]:
+        if self.fetches > 0:
+            self.check_in()
+        self.fetches += 1
+        return [Camera(**camera.__dict__) for camera in self.cameras]
+
+    @property
+    def checking_in(self) -> int:
+        return int(len(self.cameras) * self.check_in_ratio)
+
+    def check_in(self) -> None:
+        self.now += timedelta(minutes=1)
+        start = (self.fetches * self.checking_in) % max(len(self.cameras), 1)
+        for offset in range(self.checking_in):
+            index = (start + offset) % len(self.cameras)
+            camera = self.cameras[index]
+            self.cameras[index] = Camera(**{**camera.__dict__, 'last_update_time': self.now, 'battery': camera.battery - 1})
+
+    def _camera(self, index: int) -> Camera:
+        return Camera(
+            id=f'camera-{index:05}',
+            name=f'Camera {index}',
+            model='FLEX-M',
+            modem_firmware='modem',
+            camera_firmware='camera',
+            last_update_time=self.now - timedelta(minutes=index % 60),
+            signal=80,
+            temperature=15,
+            battery=90,
+            battery_type='AA',
+            memory=12.5,
+            notifications=[],
+            owner='Owner',
+            coordinates=Coordinates(latitude=45.0 + index / 10000, longitude=-70.0),
+        )
@@ -3,34 +3,97 @@ Spypoint cameras integration
 """
 from __future__ import annotations
 
+from pathlib import Path
+
 from spypointapi import SpypointApi
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform, CONF_USERNAME, CONF_PASSWORD
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.device_registry import DeviceEntry
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.typing import ConfigType
 
+from .archive import ARCHIVE_DIRECTORY, SpypointArchive, SpypointPhotoArchiver
 from .const import DOMAIN
 from .coordinator import SpypointCoordinator
+from .events import SpypointEventEmitter, SpypointEventStore
+from .orchestrator import async_get_orchestrator
+from .photo_index import SpypointPhotoIndexer
+from .renditions import SpypointPhotoView
+from .services import async_setup_services
+from .snapshot import SpypointSnapshotStore
+from .statistics import SpypointSampleStore, SpypointStatisticsImporter
+from .token_store import async_get_token_store
+
+PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.DEVICE_TRACKER, Platform.IMAGE]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.DEVICE_TRACKER]
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    async_setup_services(hass)
+    hass.http.register_view(SpypointPhotoView())
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     spypoint_api = SpypointApi(entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD], async_get_clientsession(hass))
-    spypoint_coordinator = SpypointCoordinator(hass, spypoint_api, entry)
+    token_store = async_get_token_store(hass)
+    await token_store.async_restore(spypoint_api)
+    snapshot_store = SpypointSnapshotStore(hass, entry.entry_id)
+    orchestrator = async_get_orchestrator(hass)
+    orchestrator.register(entry.entry_id)
+    spypoint_coordinator = SpypointCoordinator(hass, spypoint_api, entry, token_store, snapshot_store, orchestrator)
+    spypoint_coordinator.set_options(entry.options)
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = spypoint_coordinator
 
-    await spypoint_coordinator.async_config_entry_first_refresh()
+    restored = await spypoint_coordinator.async_restore_snapshot()
+    if not restored:
+        try:
+            await spypoint_coordinator.async_config_entry_first_refresh()
+        except (ConfigEntryAuthFailed, ConfigEntryNotReady):
+            # nothing of a failed setup is left behind, a reauth or retry sets the entry up again
+            hass.data[DOMAIN].pop(entry.entry_id)
+            orchestrator.unregister(entry.entry_id)
+            raise
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    photo_indexer = SpypointPhotoIndexer(hass, spypoint_coordinator)
+    entry.async_on_unload(spypoint_coordinator.async_add_listener(photo_indexer.async_schedule))
+    photo_indexer.async_schedule()
+
+    archive = SpypointArchive(Path(hass.config.path(ARCHIVE_DIRECTORY, entry.entry_id)))
+    photo_archiver = SpypointPhotoArchiver(hass, spypoint_coordinator, archive, async_get_clientsession(hass))
+    entry.async_on_unload(spypoint_coordinator.async_add_listener(photo_archiver.async_schedule))
+    entry.async_on_unload(photo_archiver.async_close)
+    photo_archiver.async_schedule()
+
+    event_emitter = SpypointEventEmitter(hass, spypoint_coordinator, SpypointEventStore(hass, entry.entry_id))
+    await event_emitter.async_load()
+    entry.async_on_unload(spypoint_coordinator.async_add_listener(event_emitter.async_update))
+
+    statistics_importer = SpypointStatisticsImporter(hass, spypoint_coordinator, SpypointSampleStore(hass, entry.entry_id))
+    await statistics_importer.async_load()
+    entry.async_on_unload(spypoint_coordinator.async_add_listener(statistics_importer.async_update))
+
+    if restored:
+        # entities come up stale from the snapshot while the cloud is polled in the background
+        entry.async_create_background_task(hass, spypoint_coordinator.async_refresh(), f'{DOMAIN} first refresh')
+
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        async_get_orchestrator(hass).unregister(entry.entry_id)
 
     return unload_ok
 
@@ -38,3 +101,23 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     await async_unload_entry(hass, entry)
     await async_setup_entry(hass, entry)
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    # a reauth updates the entry data too, its credentials are already swapped in place
+    if coordinator.set_options(entry.options):
+        await coordinator.async_request_refresh()
+
+
+async def async_remove_config_entry_device(hass: HomeAssistant, entry: ConfigEntry, device: DeviceEntry) -> bool:
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    in_use = {entry.entry_id, *coordinator.data}
+    return not any(identifier in in_use for domain, identifier in device.identifiers if domain == DOMAIN)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await SpypointSnapshotStore(hass, entry.entry_id).async_remove()
+    await SpypointSampleStore(hass, entry.entry_id).async_remove()
+    await SpypointEventStore(hass, entry.entry_id).async_remove()
+    await async_get_token_store(hass).async_remove(entry.data[CONF_USERNAME])
@@ -0,0 +1,314 @@
+"""
+Spypoint photo archive
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from aiohttp import ClientError, ClientSession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from spypointapi import SpypointApiError
+
+from .const import DOMAIN, LOGGER, FETCH_TIMEOUT
+from .coordinator import SpypointCoordinator
+from .photos import Photo
+
+ARCHIVE_DIRECTORY = f'{DOMAIN}_archive'
+
+PAGE_SIZE = 100
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_TIMEOUT = 60
+CHUNK_SIZE = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    sha256 TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    taken_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_by_taken_at ON files (taken_at);
+CREATE TABLE IF NOT EXISTS photos (
+    id TEXT PRIMARY KEY,
+    camera_id TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS photos_by_sha256 ON photos (sha256);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    camera_id TEXT PRIMARY KEY,
+    newest REAL,
+    oldest REAL,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+@dataclass
+class ArchiveCheckpoint:
+    """Photos of a camera taken between oldest and newest are archived, complete once oldest is its first photo."""
+    newest: datetime | None = None
+    oldest: datetime | None = None
+    complete: bool = False
+
+
+class SpypointArchiveFile:
+    """Partial file of a photo being downloaded, hashed as it is written."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._file = path.open('wb')
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._sha256.update(chunk)
+        self.size += len(chunk)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+class SpypointArchive:
+    """Photo files of an entry and their SQLite bookkeeping, all methods block and run in the executor.
+
+    Photos are stored once per content, a photo with the same bytes as an archived
+    one only gets a row pointing to its file. Evicted photos keep their row, so they
+    are not downloaded again.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.size = 0
+        self._partial = directory / '.partial'
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        # downloads interrupted by a restart start over
+        shutil.rmtree(self._partial, ignore_errors=True)
+        self._partial.mkdir(parents=True)
+        self._connection = sqlite3.connect(self.directory / 'archive.db', check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript(SCHEMA)
+            (size,) = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM files').fetchone()
+        self.size = size
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def checkpoint(self, camera_id: str) -> ArchiveCheckpoint:
+        with self._lock:
+            row = self._connection.execute('SELECT newest, oldest, complete FROM checkpoints WHERE camera_id = ?', (camera_id,)).fetchone()
+        if row is None:
+            return ArchiveCheckpoint()
+        newest, oldest, complete = row
+        return ArchiveCheckpoint(_datetime(newest), _datetime(oldest), bool(complete))
+
+    def save_checkpoint(self, camera_id: str, checkpoint: ArchiveCheckpoint) -> None:
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)',
+                                     (camera_id, _timestamp(checkpoint.newest), _timestamp(checkpoint.oldest), int(checkpoint.complete)))
+
+    def archived(self, photo_ids: list[str]) -> set[str]:
+        with self._lock:
+            rows = self._connection.execute(f'SELECT id FROM photos WHERE id IN ({", ".join("?" * len(photo_ids))})', photo_ids)
+            return {row[0] for row in rows}
+
+    def create_file(self, photo_id: str) -> SpypointArchiveFile:
+        return SpypointArchiveFile(self._partial / f'{photo_id}.part')
+
+    def discard(self, file: SpypointArchiveFile) -> None:
+        file.close()
+        file.path.unlink(missing_ok=True)
+
+    def store(self, file: SpypointArchiveFile, photo: Photo) -> None:
+        file.close()
+        sha256 = file.hexdigest()
+        with self._lock, self._connection:
+            if self._connection.execute('SELECT 1 FROM files WHERE sha256 = ?', (sha256,)).fetchone() is None:
+                path = Path(photo.camera_id, dt_util.as_local(photo.date).date().isoformat(), f'{photo.id}.jpg')
+                (self.directory / path).parent.mkdir(parents=True, exist_ok=True)
+                os.replace(file.path, self.directory / path)
+                self._connection.execute('INSERT INTO files VALUES (?, ?, ?, ?)', (sha256, str(path), file.size, photo.date.timestamp()))
+                self.size += file.size
+            else:
+                file.path.unlink()
+            self._connection.execute('INSERT OR IGNORE INTO photos VALUES (?, ?, ?, ?)', (photo.id, photo.camera_id, photo.date.timestamp(), sha256))
+
+    def evict(self, quota: int) -> set[str]:
+        """Deletes the oldest files until the archive fits in its quota, returns the ids of the evicted photos."""
+        evicted = set()
+        with self._lock, self._connection:
+            while self.size > quota:
+                row = self._connection.execute('SELECT sha256, path, size FROM files ORDER BY taken_at LIMIT 1').fetchone()
+                if row is None:
+                    break
+                sha256, path, size = row
+                (self.directory / path).unlink(missing_ok=True)
+                try:
+                    (self.directory / path).parent.rmdir()
+                except OSError:
+                    pass
+                self._connection.execute('DELETE FROM files WHERE sha256 = ?', (sha256,))
+                evicted.update(row[0] for row in self._connection.execute('SELECT id FROM photos WHERE sha256 = ?', (sha256,)))
+                self.size -= size
+        return evicted
+
+
+def _timestamp(value: datetime | None) -> float | None:
+    return value.timestamp() if value is not None else None
+
+
+def _datetime(value: float | None) -> datetime | None:
+    return dt_util.utc_from_timestamp(value) if value is not None else None
+
+
+class SpypointPhotoArchiver:
+    """Archives the photos of the cameras of an entry to disk while the entry has an archive quota.
+
+    The first run of each camera walks its history newest first, one page at a
+    time, and checkpoints each page once all its photos are stored, so a restart
+    resumes where it stopped. Later runs archive the photos taken since the newest
+    checkpoint. History older than what fits in the quota is not downloaded.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: SpypointCoordinator, archive: SpypointArchive, session: ClientSession) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.archive = archive
+        self._session = session
+        self._workers = asyncio.Semaphore(DOWNLOAD_WORKERS)
+        self._pending: set[str] = set()
+        self._started = False
+        self._opened = False
+        self._running = False
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_schedule(self) -> None:
+        if not self.coordinator.archive_quota:
+            self._started = False
+            return
+
+        if self._started:
+            self._pending.update(camera_id for camera_id, fields in self.coordinator.changes.items() if 'last_update_time' in fields)
+        else:
+            # every camera resumes from its checkpoint after a restart or once the archive is turned on
+            self._started = True
+            self._pending.update(self.coordinator.data)
+        if self._running or not self._pending:
+            return
+
+        self._running = True
+        self._task = self.coordinator.config_entry.async_create_background_task(self.hass, self._async_run(), f'{DOMAIN} photo archive')
+
+    async def async_close(self) -> None:
+        # a write in flight would otherwise hit a closed database
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.wait([self._task])
+        if self._opened:
+            await self.hass.async_add_executor_job(self.archive.close)
+
+    async def _async_run(self) -> None:
+        if not self._opened:
+            await self.hass.async_add_executor_job(self.archive.open)
+            self._opened = True
+        try:
+            while self._pending and self.coordinator.archive_quota:
+                camera_id = self._pending.pop()
+                if camera_id in self.coordinator.data:
+                    await self._async_archive_camera(camera_id)
+        # a malformed photo listing raises KeyError or ValueError, the next run resumes from the checkpoints
+        except (SpypointApiError, ClientError, TimeoutError, KeyError, ValueError) as error:
+            LOGGER.debug('Photo archive interrupted: %s', error)
+        finally:
+            self._running = False
+
+    async def _async_archive_camera(self, camera_id: str) -> None:
+        checkpoint = await self.hass.async_add_executor_job(self.archive.checkpoint, camera_id)
+        if (checkpoint.newest is not None or checkpoint.complete) and not await self._async_archive_new_photos(camera_id, checkpoint):
+            return
+
+        while not checkpoint.complete:
+            photos = await self._async_get_photos(camera_id, checkpoint.oldest)
+            evicted = await self._async_download(photos)
+            if evicted is None:
+                return
+            if photos:
+                checkpoint.newest = checkpoint.newest or photos[0].date
+                checkpoint.oldest = photos[-1].date
+            # older photos would be evicted as soon as they are downloaded
+            checkpoint.complete = len(photos) < PAGE_SIZE or any(photo.id in evicted for photo in photos)
+            await self.hass.async_add_executor_job(self.archive.save_checkpoint, camera_id, checkpoint)
+
+    async def _async_archive_new_photos(self, camera_id: str, checkpoint: ArchiveCheckpoint) -> bool:
+        newest = None
+        date_end = None
+        while True:
+            photos = await self._async_get_photos(camera_id, date_end)
+            new_photos = [photo for photo in photos if checkpoint.newest is None or photo.date > checkpoint.newest]
+            if await self._async_download(new_photos) is None:
+                # the checkpoint stays, photos already stored are skipped by the next run
+                return False
+            if newest is None and new_photos:
+                newest = new_photos[0].date
+            if len(photos) < PAGE_SIZE or len(new_photos) < len(photos):
+                break
+            date_end = photos[-1].date
+
+        if newest is not None:
+            checkpoint.newest = newest
+            await self.hass.async_add_executor_job(self.archive.save_checkpoint, camera_id, checkpoint)
+        return True
+
+    async def _async_get_photos(self, camera_id: str, date_end: datetime | None) -> list[Photo]:
+        async with asyncio.timeout(FETCH_TIMEOUT.total_seconds()):
+            return await self.coordinator.photos.async_get_photos(camera_id, limit=PAGE_SIZE, date_end=date_end)
+
+    async def _async_download(self, photos: list[Photo]) -> set[str] | None:
+        """Stores the photos not archived yet, returns the evicted photo ids or None when a download failed."""
+        if not photos:
+            return set()
+        archived = await self.hass.async_add_executor_job(self.archive.archived, [photo.id for photo in photos])
+        missing = [photo for photo in photos if photo.id not in archived]
+        if not missing:
+            return set()
+
+        results = await asyncio.gather(*(self._async_download_photo(photo) for photo in missing))
+        evicted = await self.hass.async_add_executor_job(self.archive.evict, self.coordinator.archive_quota)
+        return evicted if all(results) else None
+
+    async def _async_download_photo(self, photo: Photo) -> bool:
+        async with self._workers:
+            file = await self.hass.async_add_executor_job(self.archive.create_file, photo.id)
+            try:
+                async with asyncio.timeout(DOWNLOAD_TIMEOUT):
+                    async with self._session.get(photo.url) as response:
+                        response.raise_for_status()
+                        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                            await self.hass.async_add_executor_job(file.write, chunk)
+                await self.hass.async_add_executor_job(self.archive.store, file, photo)
+            # timeouts and disk errors are OSErrors
+            except (ClientError, OSError) as error:
+                LOGGER.debug('Unable to archive photo %s: %s', photo.id, error)
+                await self.hass.async_add_executor_job(self.archive.discard, file)
+                return False
+        return True
@@ -0,0 +1,76 @@
+"""
+Spypoint battery drain predictor
+"""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+
+# readings kept per camera, about two days at a 30 minutes check-in cadence
+WINDOW = 96
+# fewer readings give a rate dominated by the 1% resolution of the battery level
+MIN_READINGS = 3
+# a level rising this much is a new battery, not a measurement noise
+SWAP_THRESHOLD = 10
+
+SECONDS_PER_DAY = 86400
+
+
+class SpypointBatteryPredictor:
+    """Estimates the battery drain rate of a camera with a sliding least squares fit.
+
+    The fit keeps running sums of the readings in a bounded window, so adding a
+    reading and evicting the oldest one are O(1). Readings are timed in days from
+    the first reading since the last battery swap.
+    """
+
+    def __init__(self, window: int = WINDOW) -> None:
+        self._readings: deque[tuple[float, float]] = deque(maxlen=window)
+        self._origin: datetime | None = None
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = 0.0
+
+    @property
+    def level(self) -> float | None:
+        return self._readings[-1][1] if self._readings else None
+
+    def add(self, when: datetime, level: float) -> None:
+        if self._readings and level >= self._readings[-1][1] + SWAP_THRESHOLD:
+            self.reset()
+        if self._origin is None:
+            self._origin = when
+
+        x = (when - self._origin).total_seconds() / SECONDS_PER_DAY
+        if self._readings and x <= self._readings[-1][0]:
+            return
+
+        if len(self._readings) == self._readings.maxlen:
+            self._update_sums(*self._readings[0], sign=-1)
+        self._readings.append((x, level))
+        self._update_sums(x, level, sign=1)
+
+    def reset(self) -> None:
+        self._readings.clear()
+        self._origin = None
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = 0.0
+
+    def drain_rate(self) -> float | None:
+        """Battery percent lost per day, negative while charging."""
+        count = len(self._readings)
+        if count < MIN_READINGS:
+            return None
+        denominator = count * self._sum_xx - self._sum_x ** 2
+        if denominator <= 1e-9:
+            return None
+        return -(count * self._sum_xy - self._sum_x * self._sum_y) / denominator
+
+    def days_remaining(self) -> float | None:
+        rate = self.drain_rate()
+        if rate is None or rate <= 0:
+            return None
+        return self.level / rate
+
+    def _update_sums(self, x: float, y: float, sign: int) -> None:
+        self._sum_x += sign * x
+        self._sum_y += sign * y
+        self._sum_xx += sign * x * x
+        self._sum_xy += sign * x * y
@@ -0,0 +1,62 @@
+"""
+Spypoint cloud circuit breaker
+"""
+from __future__ import annotations
+
+import random
+from datetime import timedelta
+
+from .const import LOGGER, DEFAULT_UPDATE_INTERVAL, CIRCUIT_FAILURE_THRESHOLD, MAX_BACKOFF
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# caps the exponent, the backoff reaches its maximum long before
+MAX_DOUBLINGS = 10
+
+
+class SpypointCircuitBreaker:
+    """Backs off from a failing cloud and lets a single probe through to close again.
+
+    Every consecutive failure doubles the delay before the next poll, with jitter so
+    accounts that failed together do not retry together. After enough failures the
+    circuit opens and no request is sent until the delay is over. The next poll is
+    then a half-open probe: a success closes the circuit, a failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, base: timedelta = DEFAULT_UPDATE_INTERVAL,
+                 maximum: timedelta = MAX_BACKOFF) -> None:
+        self._failure_threshold = failure_threshold
+        self._base = base
+        self._maximum = maximum
+        self._retry_at = 0.0
+        self.state = CLOSED
+        self.failures = 0
+
+    def allow_request(self, now: float) -> bool:
+        if self.state == OPEN and now >= self._retry_at:
+            LOGGER.debug('Circuit half open, probing the Spypoint cloud')
+            self.state = HALF_OPEN
+        return self.state != OPEN
+
+    def retry_in(self, now: float) -> timedelta:
+        return timedelta(seconds=max(self._retry_at - now, 0.0))
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            LOGGER.info('Spypoint cloud reachable again after %d failures', self.failures)
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self, now: float) -> timedelta:
+        self.failures += 1
+        backoff = min(self._maximum, self._base * 2 ** min(self.failures - 1, MAX_DOUBLINGS))
+        delay = timedelta(seconds=random.uniform(backoff.total_seconds() / 2, backoff.total_seconds()))
+        self._retry_at = now + delay.total_seconds()
+
+        if self.state == HALF_OPEN or self.failures >= self._failure_threshold:
+            if self.state == CLOSED:
+                LOGGER.warning('Spypoint cloud failed %d times in a row, backing off', self.failures)
+            self.state = OPEN
+        return delay
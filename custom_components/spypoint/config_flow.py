@@ -9,10 +9,14 @@ import voluptuous as vol
 from spypointapi import SpypointApi, SpypointApiInvalidCredentialsError, SpypointApiError
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN, LOGGER
+from .const import DOMAIN, LOGGER, CONF_EXCLUDED_CAMERAS, CONF_SLOW_CAMERAS, CONF_MAX_WRITE_INTERVAL, DEADBAND_OPTIONS, \
+    DEFAULT_MAX_WRITE_INTERVAL, MINUTE, CONF_ARCHIVE_QUOTA
+from .token_store import async_get_token_store
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
@@ -38,14 +42,15 @@ class SpypointConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         errors: dict[str, str] = {}
         try:
-            spypoint_api = SpypointApi(data[CONF_USERNAME], data[CONF_PASSWORD], async_create_clientsession(self.hass))
+            # the typed password must be verified, the resulting token is handed over to the entry setup
+            spypoint_api = SpypointApi(data[CONF_USERNAME], data[CONF_PASSWORD], async_get_clientsession(self.hass))
             await spypoint_api.async_authenticate()
+            await async_get_token_store(self.hass).async_save(spypoint_api)
 
             if self._reauth_entry is None:
                 return self.async_create_entry(title=data[CONF_USERNAME], data=data)
             else:
-                self.hass.config_entries.async_update_entry(self._reauth_entry, data=data)
-                await self.hass.config_entries.async_reload(self._reauth_entry.entry_id)
+                await self._async_reauth_entry(spypoint_api, data)
                 return self.async_abort(reason="reauth_successful")
 
         except SpypointApiInvalidCredentialsError:
@@ -61,3 +66,53 @@ class SpypointConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_reauth(self, data: dict[str, Any] | None = None) -> FlowResult:
         self._reauth_entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
         return await self.async_step_user(data)
+
+    async def _async_reauth_entry(self, spypoint_api: SpypointApi, data: dict[str, Any]) -> None:
+        entry = self._reauth_entry
+        if entry.state is not config_entries.ConfigEntryState.LOADED:
+            # the entry failed to set up, there is nothing running to take the new credentials
+            self.hass.config_entries.async_update_entry(entry, data=data)
+            await self.hass.config_entries.async_reload(entry.entry_id)
+            return
+
+        coordinator = self.hass.data[DOMAIN][entry.entry_id]
+        # swapping the credentials keeps every entity in place, a reload would set the whole account up again
+        coordinator.set_credentials(spypoint_api)
+        self.hass.config_entries.async_update_entry(entry, data=data)
+        # polling stopped when authentication failed
+        entry.async_create_background_task(self.hass, coordinator.async_refresh(), f'{DOMAIN} reauth refresh')
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        return SpypointOptionsFlow()
+
+
+class SpypointOptionsFlow(config_entries.OptionsFlow):
+
+    async def async_step_init(self, data: dict[str, Any] | None = None) -> FlowResult:
+        if data is not None:
+            return self.async_create_entry(data=data)
+
+        excluded = self.config_entry.options.get(CONF_EXCLUDED_CAMERAS, [])
+        slow = self.config_entry.options.get(CONF_SLOW_CAMERAS, [])
+        # excluded cameras are not polled anymore, they are listed by id until the account reports them again
+        cameras = {camera_id: camera_id for camera_id in [*excluded, *slow]}
+        if coordinator := self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id):
+            cameras.update(coordinator.account_cameras)
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Optional(CONF_EXCLUDED_CAMERAS, default=excluded): cv.multi_select(cameras),
+                vol.Optional(CONF_SLOW_CAMERAS, default=slow): cv.multi_select(cameras),
+                **{
+                    vol.Optional(option, default=options.get(option, 0)): vol.All(vol.Coerce(float), vol.Range(min=0))
+                    for option in DEADBAND_OPTIONS
+                },
+                vol.Optional(CONF_MAX_WRITE_INTERVAL, default=options.get(CONF_MAX_WRITE_INTERVAL, DEFAULT_MAX_WRITE_INTERVAL // MINUTE)):
+                    vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(CONF_ARCHIVE_QUOTA, default=options.get(CONF_ARCHIVE_QUOTA, 0)): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            }
+        )
+        return self.async_show_form(step_id='init', data_schema=schema)
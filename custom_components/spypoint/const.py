@@ -1,6 +1,43 @@
+from datetime import timedelta
 from logging import Logger, getLogger
 
 LOGGER: Logger = getLogger(__package__)
 
 DOMAIN = 'spypoint'
 MANUFACTURER = 'Spypoint'
+# objects shared by every entry, hass.data[DOMAIN] only holds the coordinators by entry id
+DATA_SHARED = f'{DOMAIN}_shared'
+
+ATTR_STALE = 'stale'
+
+CONF_EXCLUDED_CAMERAS = 'excluded_cameras'
+CONF_SLOW_CAMERAS = 'slow_cameras'
+CONF_TEMPERATURE_DEADBAND = 'temperature_deadband'
+CONF_SIGNAL_DEADBAND = 'signal_deadband'
+CONF_MEMORY_DEADBAND = 'memory_deadband'
+CONF_TRACKER_MIN_DISTANCE = 'tracker_min_distance'
+CONF_MAX_WRITE_INTERVAL = 'max_write_interval'
+CONF_ARCHIVE_QUOTA = 'archive_quota'
+
+# options holding the smallest change written by an entity, 0 writes every change
+DEADBAND_OPTIONS = (CONF_TEMPERATURE_DEADBAND, CONF_SIGNAL_DEADBAND, CONF_MEMORY_DEADBAND, CONF_TRACKER_MIN_DISTANCE)
+
+DEFAULT_UPDATE_INTERVAL = timedelta(seconds=60)
+MIN_UPDATE_INTERVAL = timedelta(seconds=30)
+MAX_UPDATE_INTERVAL = timedelta(minutes=30)
+MAX_OFFLINE_UPDATE_INTERVAL = timedelta(hours=1)
+SLOW_UPDATE_INTERVAL = timedelta(minutes=30)
+CHECK_IN_GRACE_PERIOD = timedelta(seconds=20)
+MAX_POLL_JITTER = timedelta(seconds=30)
+FETCH_TIMEOUT = timedelta(seconds=10)
+MAX_CONCURRENT_FETCHES = 4
+CIRCUIT_FAILURE_THRESHOLD = 3
+MAX_BACKOFF = timedelta(minutes=30)
+DEFAULT_MAX_WRITE_INTERVAL = timedelta(hours=1)
+# unit of the max write interval option
+MINUTE = timedelta(minutes=1)
+# unit of the archive quota option, 0 turns the archive off
+MEGABYTE = 1024 * 1024
+
+PHOTO_CACHE_MAX_BYTES = 32 * 1024 * 1024
+RENDITION_CACHE_MAX_BYTES = 64 * 1024 * 1024
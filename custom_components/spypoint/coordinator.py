@@ -1,35 +1,329 @@
 import asyncio
-from datetime import timedelta
+import json
+import time
+from contextlib import AbstractAsyncContextManager, AbstractContextManager, nullcontext
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from typing import Any, Collection, Iterable, Mapping
 
+from aiohttp import ClientError
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 from spypointapi import SpypointApi, Camera, SpypointApiInvalidCredentialsError, SpypointApiError
 
-from .const import DOMAIN, LOGGER
+from .battery import SpypointBatteryPredictor
+from .circuit import SpypointCircuitBreaker
+from .const import DOMAIN, LOGGER, DEFAULT_UPDATE_INTERVAL, FETCH_TIMEOUT, MIN_UPDATE_INTERVAL, SLOW_UPDATE_INTERVAL, \
+    CONF_EXCLUDED_CAMERAS, CONF_SLOW_CAMERAS, CONF_MAX_WRITE_INTERVAL, DEADBAND_OPTIONS, DEFAULT_MAX_WRITE_INTERVAL, MINUTE, \
+    CONF_ARCHIVE_QUOTA, MEGABYTE
+from .diff import SpypointCameraDiffer
+from .fleet import SpypointFleetAggregates
+from .metrics import SpypointCoordinatorMetrics
+from .orchestrator import SpypointPollOrchestrator
+from .photos import SpypointPhotoApi
+from .profiler import SpypointProfiler
+from .scheduler import SpypointPollScheduler
+from .snapshot import SpypointSnapshotStore
+from .token_store import SpypointTokenStore
 
 
 # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
 class SpypointCoordinator(DataUpdateCoordinator):
     config_entry: ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, api: SpypointApi, entry: ConfigEntry) -> None:
+    def __init__(self, hass: HomeAssistant, api: SpypointApi, entry: ConfigEntry,
+                 token_store: SpypointTokenStore | None = None, snapshot_store: SpypointSnapshotStore | None = None,
+                 orchestrator: SpypointPollOrchestrator | None = None) -> None:
         super().__init__(
             hass=hass,
             logger=LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=60),
+            update_interval=DEFAULT_UPDATE_INTERVAL,
             config_entry=entry,
         )
         self.api = api
+        self.photos = SpypointPhotoApi(api)
+        self.token_store = token_store
+        self.snapshot_store = snapshot_store
+        self.orchestrator = orchestrator
+        self.stale = False
+        self.scheduler = SpypointPollScheduler()
+        self.differ = SpypointCameraDiffer()
+        self.fleet = SpypointFleetAggregates()
+        self.breaker = SpypointCircuitBreaker()
+        self.changes: dict[str, frozenset[str]] = {}
+        self.added_cameras: frozenset[str] = frozenset()
+        self.removed_cameras: frozenset[str] = frozenset()
+        self.metrics = SpypointCoordinatorMetrics()
+        self.batteries: dict[str, SpypointBatteryPredictor] = {}
+        self.account_cameras: dict[str, str] = {}
+        self.excluded_cameras: frozenset[str] = frozenset()
+        self.slow_cameras: frozenset[str] = frozenset()
+        self._slow_due_at = 0.0
+        self.deadbands: dict[str, float] = {}
+        self.max_write_interval = DEFAULT_MAX_WRITE_INTERVAL
+        self.archive_quota = 0
+        self._fetch: asyncio.Task[list[Camera]] | None = None
+        # set by the profile service for its next cycles
+        self.profiler: SpypointProfiler | None = None
+
+    def set_options(self, options: Mapping[str, Any]) -> bool:
+        """Applies the entry options, returns whether the cameras must be refreshed."""
+        # entities read the deadbands at their next change, nothing to refresh for them
+        self.deadbands = {option: options[option] for option in DEADBAND_OPTIONS if options.get(option)}
+        self.max_write_interval = timedelta(minutes=options.get(CONF_MAX_WRITE_INTERVAL, DEFAULT_MAX_WRITE_INTERVAL // MINUTE))
+        # the archiver reads it at its next run
+        self.archive_quota = int(options.get(CONF_ARCHIVE_QUOTA, 0) * MEGABYTE)
+
+        excluded_cameras = frozenset(options.get(CONF_EXCLUDED_CAMERAS, []))
+        slow_cameras = frozenset(options.get(CONF_SLOW_CAMERAS, [])) - excluded_cameras
+        if (excluded_cameras, slow_cameras) == (self.excluded_cameras, self.slow_cameras):
+            return False
+
+        self.excluded_cameras = excluded_cameras
+        self.slow_cameras = slow_cameras
+        # a camera moved to the slow tier is refreshed once more before it slows down
+        self._slow_due_at = 0.0
+        return True
+
+    def set_credentials(self, api: SpypointApi) -> None:
+        """Takes over the credentials and the access token of an api a reauth just authenticated.
+
+        The live api is updated in place, the photo api and the entities keep using it.
+        """
+        self.api.username = api.username
+        self.api.password = api.password
+        self.api.headers.update(api.headers)
+        self.api.expires_at = api.expires_at
+
+    def changed_fields(self, camera_id: str) -> frozenset[str]:
+        return self.changes.get(camera_id, frozenset())
+
+    def battery(self, camera_id: str) -> SpypointBatteryPredictor | None:
+        return self.batteries.get(camera_id)
+
+    def count_entity_update(self) -> None:
+        self.metrics.count_notified()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        self.metrics.start_notifying()
+        with self._profile_stage('notify'):
+            super().async_update_listeners()
+        self.metrics.stop_notifying()
+        if self.profiler is not None:
+            self.profiler.end_cycle(self.config_entry.entry_id)
+
+    async def async_restore_snapshot(self) -> bool:
+        if self.snapshot_store is None:
+            return False
+
+        data = await self.snapshot_store.async_load()
+        if not data:
+            return False
+
+        # the restored cameras are the baseline, so the live refresh only reports real changes
+        self.differ.diff(data)
+        for camera in data.values():
+            self.fleet.update(camera)
+        self.scheduler.observe(list(data.values()))
+        self.account_cameras = {camera.id: camera.name for camera in data.values()}
+        self._observe_batteries(data, data.keys())
+        self.data = data
+        self.stale = True
+        LOGGER.debug('Restored %d cameras from snapshot', len(data))
+        return True
 
     async def _async_update_data(self) -> dict[str, Camera]:
+        self.changes = {}
+        self.added_cameras = self.removed_cameras = frozenset()
+        if not self.breaker.allow_request(time.monotonic()):
+            self.update_interval = self.breaker.retry_in(time.monotonic())
+            LOGGER.debug('Circuit open, next probe in %s', self.update_interval)
+            if self.data is None:
+                raise ConnectionError('Spypoint cloud unavailable')
+            self.stale = True
+            return self.data
+
         try:
-            async with asyncio.timeout(10):
-                cameras = await self.api.async_get_cameras()
-                return {camera.id: camera for camera in cameras}
+            cameras = await self._async_fetch_cameras()
+        except TimeoutError as error:
+            return self._serve_stale(error)
         except SpypointApiInvalidCredentialsError as error:
             raise ConfigEntryAuthFailed from error
-        except SpypointApiError as error:
+        except (SpypointApiError, ClientError, json.JSONDecodeError) as error:
+            return self._serve_stale(error)
+        self.breaker.record_success()
+        with self._profile_stage('apply'):
+            return await self._async_apply(cameras)
+
+    async def async_refresh_cameras(self, camera_ids: Collection[str] | None = None) -> None:
+        """Refreshes the given cameras, or all of them, sharing a fetch already in flight.
+
+        The cloud always returns every camera, only the targeted ones take the new
+        readings so the entities of the other cameras are not written.
+        """
+        if not self.breaker.allow_request(time.monotonic()):
+            raise HomeAssistantError('Spypoint cloud unavailable, retry later')
+        try:
+            cameras = await self._async_fetch_cameras()
+        except SpypointApiInvalidCredentialsError as error:
+            raise ConfigEntryAuthFailed from error
+        except (TimeoutError, SpypointApiError, ClientError, json.JSONDecodeError) as error:
+            raise HomeAssistantError('Refreshing Spypoint cameras failed') from error
+        self.breaker.record_success()
+
+        self.changes = {}
+        self.added_cameras = self.removed_cameras = frozenset()
+        targets = None if camera_ids is None else frozenset(camera_ids)
+        with self._profile_stage('apply'):
+            data = await self._async_apply(cameras, targets)
+        self.async_set_updated_data(data)
+
+    async def _async_fetch_cameras(self) -> list[Camera]:
+        # refreshes requested while a fetch is in flight wait for it instead of calling the cloud again
+        if self._fetch is None:
+            self._fetch = asyncio.get_running_loop().create_task(self._async_fetch())
+        return await asyncio.shield(self._fetch)
+
+    async def _async_fetch(self) -> list[Camera]:
+        try:
+            async with self._async_fetch_slot():
+                started = time.monotonic()
+                with self._profile_stage('fetch'):
+                    async with asyncio.timeout(FETCH_TIMEOUT.total_seconds()):
+                        cameras = await self._async_get_cameras()
+                self.metrics.record_fetch(time.monotonic() - started, len(cameras))
+                return cameras
+        except TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        except SpypointApiInvalidCredentialsError:
+            # rejected credentials ask for a reauth, they are not a fetch error
+            raise
+        except (SpypointApiError, ClientError, json.JSONDecodeError):
+            # a truncated body parses as invalid json
+            self.metrics.errors += 1
+            raise
+        finally:
+            self._fetch = None
+
+    async def _async_apply(self, cameras: list[Camera], targets: frozenset[str] | None = None) -> dict[str, Camera]:
+        if self.token_store is not None:
+            await self.token_store.async_save(self.api)
+
+        self.account_cameras = {camera.id: camera.name for camera in cameras}
+        cameras = self._select_cameras(cameras, targets)
+
+        now = dt_util.now()
+        self.update_interval = self._next_interval(cameras, now)
+        if self.orchestrator is not None:
+            self.update_interval = self.orchestrator.spread(self.config_entry.entry_id, self.update_interval)
+        LOGGER.debug('Next poll in %s', self.update_interval)
+
+        data = {camera.id: camera for camera in cameras}
+        self.changes = self.differ.diff(data)
+        LOGGER.debug('%d of %d cameras changed', len(self.changes), len(data))
+        for camera_id in self.changes:
+            self.fleet.update(data[camera_id])
+        self._observe_batteries(data, [camera_id for camera_id, fields in self.changes.items() if 'last_update_time' in fields])
+
+        if self.data is not None:
+            for camera_id, fields in self.changes.items():
+                last_update_time = data[camera_id].last_update_time
+                # a camera whose last update the cloud omitted has no check-in to measure
+                if 'last_update_time' in fields and camera_id in self.data and last_update_time is not None:
+                    self.metrics.record_check_in_lag(now - last_update_time)
+
+            self.added_cameras = frozenset(data.keys() - self.data.keys())
+            self.removed_cameras = frozenset(self.data.keys() - data.keys())
+            if self.removed_cameras:
+                self._async_remove_devices(self.removed_cameras)
+                for camera_id in self.removed_cameras:
+                    self.batteries.pop(camera_id, None)
+                    self.fleet.remove(camera_id)
+
+        if self.snapshot_store is not None and (self.stale or self.changes or self.removed_cameras):
+            self.snapshot_store.async_save(data)
+        self.stale = False
+        return data
+
+    def _observe_batteries(self, data: dict[str, Camera], camera_ids: Iterable[str]) -> None:
+        # a check-in is a new battery reading, the level alone repeats between check-ins
+        for camera_id in camera_ids:
+            camera = data[camera_id]
+            if camera.battery is not None and camera.last_update_time is not None:
+                self.batteries.setdefault(camera_id, SpypointBatteryPredictor()).add(camera.last_update_time, camera.battery)
+
+    def _select_cameras(self, cameras: list[Camera], targets: frozenset[str] | None) -> list[Camera]:
+        slow_due = targets is None and time.monotonic() >= self._slow_due_at
+        if slow_due:
+            self._slow_due_at = time.monotonic() + SLOW_UPDATE_INTERVAL.total_seconds()
+
+        selected = []
+        for camera in cameras:
+            if camera.id in self.excluded_cameras:
+                continue
+            if targets is None:
+                due = camera.id not in self.slow_cameras or slow_due
+            else:
+                due = camera.id in targets
+            if not due and self.data and camera.id in self.data:
+                # the previous reading is kept so nothing is diffed or written
+                camera = self.data[camera.id]
+            selected.append(camera)
+        return selected
+
+    def _next_interval(self, cameras: list[Camera], now: datetime) -> timedelta:
+        fast = [camera for camera in cameras if camera.id not in self.slow_cameras]
+        if len(fast) == len(cameras):
+            return self.scheduler.next_interval(fast, now)
+
+        slow_due_in = max(timedelta(seconds=self._slow_due_at - time.monotonic()), MIN_UPDATE_INTERVAL)
+        if not fast:
+            return slow_due_in
+        return min(self.scheduler.next_interval(fast, now), slow_due_in)
+
+    def _serve_stale(self, error: Exception) -> dict[str, Camera]:
+        self.update_interval = self.breaker.record_failure(time.monotonic())
+        LOGGER.debug('Fetching cameras failed (%s), next poll in %s', error, self.update_interval)
+        if self.data is None:
+            if isinstance(error, TimeoutError):
+                raise error
             raise ConnectionError from error
+        # keep the last known values, flagged stale, instead of blanking every entity
+        self.stale = True
+        return self.data
+
+    def _profile_stage(self, stage: str) -> AbstractContextManager:
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(self.config_entry.entry_id, stage)
+
+    def _async_fetch_slot(self) -> AbstractAsyncContextManager:
+        if self.orchestrator is None:
+            return nullcontext()
+        return self.orchestrator.async_fetch_slot()
+
+    async def _async_get_cameras(self) -> list[Camera]:
+        try:
+            return await self.api.async_get_cameras()
+        except SpypointApiInvalidCredentialsError:
+            raise
+        except SpypointApiError as error:
+            if error.status != HTTPStatus.UNAUTHORIZED:
+                raise
+            # the api drops a rejected token, so the retry logs in again
+            LOGGER.debug('Access token rejected, authenticating again')
+            return await self.api.async_get_cameras()
+
+    def _async_remove_devices(self, camera_ids: frozenset[str]) -> None:
+        device_registry = dr.async_get(self.hass)
+        for camera_id in camera_ids:
+            LOGGER.debug('Camera %s removed from account', camera_id)
+            if device := device_registry.async_get_device(identifiers={(DOMAIN, camera_id)}):
+                device_registry.async_update_device(device.id, remove_config_entry_id=self.config_entry.entry_id)
@@ -3,28 +3,42 @@ Spypoint camera location tracker
 """
 from __future__ import annotations
 
+from typing import Iterable
+
 from homeassistant.components.device_tracker import SourceType, TrackerEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.location import distance
 from spypointapi import Camera
 
 from . import SpypointCoordinator
-from .const import DOMAIN
+from .const import DOMAIN, CONF_TRACKER_MIN_DISTANCE
 from .entity import SpypointCameraEntity
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> None:
     coordinator = hass.data[DOMAIN][entry.entry_id]
 
+    @callback
+    def async_add_new_cameras() -> None:
+        trackers = create_trackers(coordinator, [coordinator.data[camera_id] for camera_id in coordinator.added_cameras])
+        if trackers:
+            async_add_entities(trackers)
+
+    async_add_entities(create_trackers(coordinator, coordinator.data.values()))
+    entry.async_on_unload(coordinator.async_add_listener(async_add_new_cameras))
+
+
+def create_trackers(coordinator: SpypointCoordinator, cameras: Iterable[Camera]) -> list[TrackerEntity]:
     trackers = []
-    for camera in coordinator.data.values():
+    for camera in cameras:
         if camera.coordinates is not None:
             trackers.append(SpypointCameraTracker(coordinator, camera))
-
-    async_add_entities(trackers)
+    return trackers
 
 
 class SpypointCameraTracker(SpypointCameraEntity, TrackerEntity):
+    _camera_fields = frozenset({'coordinates'})
 
     def __init__(self, coordinator: SpypointCoordinator, camera: Camera) -> None:
         super().__init__(coordinator, camera, 'Location')
@@ -34,9 +48,22 @@ class SpypointCameraTracker(SpypointCameraEntity, TrackerEntity):
         return SourceType.GPS
 
     @property
-    def latitude(self) -> float:
-        return self._camera.coordinates.latitude
+    def latitude(self) -> float | None:
+        coordinates = self._value('coordinates')
+        return None if coordinates is None else coordinates.latitude
 
     @property
-    def longitude(self) -> float:
-        return self._camera.coordinates.longitude
+    def longitude(self) -> float | None:
+        coordinates = self._value('coordinates')
+        return None if coordinates is None else coordinates.longitude
+
+    def _deadband(self) -> float | None:
+        return self.coordinator.deadbands.get(CONF_TRACKER_MIN_DISTANCE)
+
+    def _deadband_value(self) -> tuple[float, float] | None:
+        coordinates = self._value('coordinates')
+        return None if coordinates is None else (coordinates.latitude, coordinates.longitude)
+
+    def _deadband_distance(self, written: tuple[float, float], value: tuple[float, float]) -> float:
+        # in meters, like the minimum distance option
+        return distance(*written, *value)
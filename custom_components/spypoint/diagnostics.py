@@ -0,0 +1,43 @@
+"""
+Spypoint diagnostics
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .orchestrator import async_get_orchestrator
+from .snapshot import camera_to_dict
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, 'title', 'unique_id', 'owner', 'coordinates'}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    orchestrator = async_get_orchestrator(hass)
+
+    return {
+        'entry': async_redact_data(entry.as_dict(), TO_REDACT),
+        'coordinator': {
+            'last_update_success': coordinator.last_update_success,
+            'update_interval': str(coordinator.update_interval),
+            'stale': coordinator.stale,
+            'metrics': coordinator.metrics.as_dict(),
+        },
+        'circuit': {
+            'state': coordinator.breaker.state,
+            'failures': coordinator.breaker.failures,
+        },
+        'orchestrator': {
+            'entries': orchestrator.entries,
+            'queue_depth': orchestrator.queue_depth,
+            'lag': round(orchestrator.lag, 3),
+            'max_lag': round(orchestrator.max_lag, 3),
+        },
+        'cameras': async_redact_data([camera_to_dict(camera) for camera in (coordinator.data or {}).values()], TO_REDACT),
+    }
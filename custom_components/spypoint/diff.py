@@ -0,0 +1,36 @@
+"""
+Spypoint camera snapshot diff
+"""
+from __future__ import annotations
+
+from dataclasses import fields
+
+from spypointapi import Camera
+
+# is_online is derived from the clock, so it is captured at refresh time like the other fields
+CAMERA_FIELDS: frozenset[str] = frozenset([field.name for field in fields(Camera)] + ['is_online'])
+
+_ORDERED_FIELDS = tuple(sorted(CAMERA_FIELDS))
+
+
+class SpypointCameraDiffer:
+    """Computes which fields of each camera changed since the previous refresh."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, tuple] = {}
+
+    def diff(self, cameras: dict[str, Camera]) -> dict[str, frozenset[str]]:
+        changes: dict[str, frozenset[str]] = {}
+        values: dict[str, tuple] = {}
+        for camera_id, camera in cameras.items():
+            current = tuple(getattr(camera, name) for name in _ORDERED_FIELDS)
+            values[camera_id] = current
+
+            previous = self._values.get(camera_id)
+            if previous is None:
+                changes[camera_id] = CAMERA_FIELDS
+            elif previous != current:
+                changes[camera_id] = frozenset(name for name, old, new in zip(_ORDERED_FIELDS, previous, current) if old != new)
+
+        self._values = values
+        return changes
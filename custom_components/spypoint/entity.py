@@ -1,34 +1,119 @@
 """
-Spypoint camera
+Spypoint camera and account entities
 """
+import time
+from typing import Any
+
 from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import slugify
 from spypointapi import Camera
 
 from . import SpypointCoordinator
-from .const import DOMAIN, MANUFACTURER
+from .const import DOMAIN, MANUFACTURER, ATTR_STALE
+from .diff import CAMERA_FIELDS
 
 
 class SpypointCameraEntity(CoordinatorEntity):
     _attr_attribution = f'Data provided by {MANUFACTURER}'
+    # camera fields the entity state is built from, only changes to them are written
+    _camera_fields: frozenset[str] = CAMERA_FIELDS
 
-    def __init__(self, coordinator: SpypointCoordinator, camera: Camera, sensor_name: str) -> None:
+    def __init__(self, coordinator: SpypointCoordinator, camera: Camera, sensor_name: str,
+                 device_info: DeviceInfo | None = None) -> None:
         super().__init__(coordinator)
-        device_name = f'{MANUFACTURER} {camera.name}'
-        self._attr_name = f'{device_name} {sensor_name}'
+        self._attr_name = f'{MANUFACTURER} {camera.name} {sensor_name}'
         self._attr_unique_id = slugify(self._attr_name)
-        self._camera = camera
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, camera.id)},
-            manufacturer=MANUFACTURER,
-            model=camera.model,
-            sw_version=camera.camera_firmware,
-            hw_version=camera.modem_firmware,
-            name=device_name)
+        # the camera is read from the coordinator data, so the entity keeps no old camera object alive
+        self._camera_id = camera.id
+        self._written_status: tuple[bool, bool] | None = None
+        self._written_value: Any = None
+        self._written_at = 0.0
+        # entities of the same camera share one device info instead of holding a copy each
+        self._attr_device_info = device_info or camera_device_info(camera)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._written_status = self._status()
+        self._remember_written()
+
+    @property
+    def available(self) -> bool:
+        return super().available and self._camera_id in self.coordinator.data
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if self.coordinator.stale:
+            return {ATTR_STALE: True}
+        return None
+
+    def _value(self, field: str) -> Any:
+        if (camera := self.coordinator.data.get(self._camera_id)) is None:
+            return None
+        return getattr(camera, field)
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        self._camera = self.coordinator.data[self._camera.id]
+        status = self._status()
+        if status == self._written_status:
+            if not self._camera_fields & self.coordinator.changed_fields(self._camera_id) or self._within_deadband():
+                return
+
+        self._written_status = status
+        self._remember_written()
+        self.coordinator.count_entity_update()
         self.async_write_ha_state()
+
+    def _status(self) -> tuple[bool, bool]:
+        return self.available, self.coordinator.stale
+
+    def _deadband(self) -> float | None:
+        """Smallest change written, None or 0 to write every change."""
+        return None
+
+    def _deadband_value(self) -> Any:
+        return None
+
+    def _deadband_distance(self, written: Any, value: Any) -> float:
+        return abs(value - written)
+
+    def _remember_written(self) -> None:
+        self._written_value = self._deadband_value() if self.available and self._deadband() else None
+        self._written_at = time.monotonic()
+
+    def _within_deadband(self) -> bool:
+        # compared to the last written value, not the last reading, so a slow drift is written once it adds up
+        if not self._deadband() or self._written_value is None:
+            return False
+        if time.monotonic() - self._written_at >= self.coordinator.max_write_interval.total_seconds():
+            return False
+        value = self._deadband_value()
+        return value is not None and self._deadband_distance(self._written_value, value) < self._deadband()
+
+
+def camera_device_info(camera: Camera) -> DeviceInfo:
+    return DeviceInfo(
+        identifiers={(DOMAIN, camera.id)},
+        manufacturer=MANUFACTURER,
+        model=camera.model,
+        sw_version=camera.camera_firmware,
+        hw_version=camera.modem_firmware,
+        name=f'{MANUFACTURER} {camera.name}')
+
+
+class SpypointAccountEntity(CoordinatorEntity):
+    _attr_attribution = f'Data provided by {MANUFACTURER}'
+
+    def __init__(self, coordinator: SpypointCoordinator, key: str, sensor_name: str) -> None:
+        super().__init__(coordinator)
+        entry = coordinator.config_entry
+        device_name = f'{MANUFACTURER} {entry.title}'
+        self._attr_name = f'{device_name} {sensor_name}'
+        self._attr_unique_id = f'{entry.entry_id}_{key}'
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            manufacturer=MANUFACTURER,
+            entry_type=DeviceEntryType.SERVICE,
+            name=device_name)
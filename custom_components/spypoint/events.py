@@ -0,0 +1,122 @@
+"""
+Spypoint camera events
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from spypointapi import Camera
+
+from .const import DOMAIN, LOGGER
+from .coordinator import SpypointCoordinator
+
+EVENT_SPYPOINT = f'{DOMAIN}_event'
+
+EVENT_NOTIFICATION = 'notification'
+EVENT_OFFLINE = 'offline'
+EVENT_ONLINE = 'online'
+EVENT_NEW_PHOTO = 'new_photo'
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+# notifications remembered per camera, a camera only reports a handful at once
+MAX_SEEN = 32
+
+
+@callback
+def async_fire_event(hass: HomeAssistant, coordinator: SpypointCoordinator, event_type: str, camera_id: str,
+                     **data: Any) -> None:
+    LOGGER.debug('Camera %s %s event', camera_id, event_type)
+    hass.bus.async_fire(EVENT_SPYPOINT, {
+        'type': event_type,
+        'camera_id': camera_id,
+        'camera_name': coordinator.account_cameras.get(camera_id, camera_id),
+        **data,
+    })
+
+
+class SpypointEventStore:
+    """Persists what the events of an entry were last fired for, so a restart does not fire them again."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f'{DOMAIN}.{entry_id}.events')
+
+    async def async_load(self) -> dict[str, Any] | None:
+        return await self._store.async_load()
+
+    @callback
+    def async_save(self, seen: dict[str, list[str]], online: dict[str, bool]) -> None:
+        self._store.async_delay_save(lambda: {'seen': seen, 'online': online}, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+
+class SpypointEventEmitter:
+    """Fires an event for each new camera notification and each camera going offline or online.
+
+    A notification is new when it is not in the seen set of its camera. The seen
+    set holds the notifications the camera still reports, so one that clears and
+    comes back fires again. The first time a camera is seen, its state is only
+    recorded: firing everything it already reports would flood automations.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: SpypointCoordinator, store: SpypointEventStore) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._store = store
+        self._seen: dict[str, list[str]] = {}
+        self._online: dict[str, bool] = {}
+
+    async def async_load(self) -> None:
+        if data := await self._store.async_load():
+            self._seen = data['seen']
+            self._online = data['online']
+        self.async_update()
+
+    @callback
+    def async_update(self) -> None:
+        changed = False
+        for camera_id, fields in self._coordinator.changes.items():
+            camera = self._coordinator.data.get(camera_id)
+            if camera is None:
+                continue
+            if 'notifications' in fields or camera_id not in self._seen:
+                changed |= self._update_notifications(camera)
+            if 'is_online' in fields or camera_id not in self._online:
+                changed |= self._update_online(camera)
+
+        for camera_id in self._coordinator.removed_cameras:
+            changed |= self._seen.pop(camera_id, None) is not None
+            changed |= self._online.pop(camera_id, None) is not None
+
+        if changed:
+            self._store.async_save(self._seen, self._online)
+
+    def _update_notifications(self, camera: Camera) -> bool:
+        notifications = list(dict.fromkeys(camera.notifications or []))[-MAX_SEEN:]
+        seen = self._seen.get(camera.id)
+        if seen == notifications:
+            return False
+
+        if seen is not None:
+            for notification in notifications:
+                if notification not in seen:
+                    async_fire_event(self._hass, self._coordinator, EVENT_NOTIFICATION, camera.id, notification=notification)
+        self._seen[camera.id] = notifications
+        return True
+
+    def _update_online(self, camera: Camera) -> bool:
+        online = self._online.get(camera.id)
+        if online == camera.is_online:
+            return False
+
+        if online is not None:
+            last_update_time = camera.last_update_time.isoformat() if camera.last_update_time is not None else None
+            async_fire_event(self._hass, self._coordinator, EVENT_ONLINE if camera.is_online else EVENT_OFFLINE, camera.id,
+                             last_update_time=last_update_time)
+        self._online[camera.id] = camera.is_online
+        return True
@@ -0,0 +1,83 @@
+"""
+Spypoint fleet aggregates
+"""
+from __future__ import annotations
+
+import heapq
+from typing import NamedTuple
+
+from spypointapi import Camera
+
+# outdated lowest battery candidates are compacted once they outnumber the cameras this much
+HEAP_SLACK = 2
+
+
+class FleetReading(NamedTuple):
+    online: bool
+    battery: float | None
+    memory: float | None
+    notified: bool
+
+
+class SpypointFleetAggregates:
+    """Fleet totals of an entry, kept up to date from the cameras a refresh changed.
+
+    Counts and sums are adjusted by the difference between the previous and the new
+    reading of a camera. The lowest battery comes from a heap whose outdated entries
+    are dropped when they surface. Updating costs the changed cameras, not the fleet.
+    """
+
+    def __init__(self) -> None:
+        self._readings: dict[str, FleetReading] = {}
+        self._batteries: list[tuple[float, str]] = []
+        self.offline = 0
+        self.with_notifications = 0
+        self._memory_total = 0.0
+        self._memory_count = 0
+
+    def __len__(self) -> int:
+        return len(self._readings)
+
+    def update(self, camera: Camera) -> None:
+        reading = FleetReading(camera.is_online, camera.battery, camera.memory, bool(camera.notifications))
+        previous = self._readings.get(camera.id)
+        if reading == previous:
+            return
+        if previous is not None:
+            self._count(previous, -1)
+        self._readings[camera.id] = reading
+        self._count(reading, 1)
+        if reading.battery is not None and (previous is None or reading.battery != previous.battery):
+            heapq.heappush(self._batteries, (reading.battery, camera.id))
+            if len(self._batteries) > HEAP_SLACK * len(self._readings):
+                self._compact()
+
+    def remove(self, camera_id: str) -> None:
+        if (previous := self._readings.pop(camera_id, None)) is not None:
+            self._count(previous, -1)
+
+    def average_memory(self) -> float | None:
+        return self._memory_total / self._memory_count if self._memory_count else None
+
+    def lowest_battery(self) -> tuple[float, str] | None:
+        """Lowest battery level and its camera id."""
+        batteries = self._batteries
+        while batteries:
+            battery, camera_id = batteries[0]
+            if (reading := self._readings.get(camera_id)) is not None and reading.battery == battery:
+                return battery, camera_id
+            heapq.heappop(batteries)
+        return None
+
+    def _count(self, reading: FleetReading, sign: int) -> None:
+        if not reading.online:
+            self.offline += sign
+        if reading.notified:
+            self.with_notifications += sign
+        if reading.memory is not None:
+            self._memory_total += sign * reading.memory
+            self._memory_count += sign
+
+    def _compact(self) -> None:
+        self._batteries = [(reading.battery, camera_id) for camera_id, reading in self._readings.items() if reading.battery is not None]
+        heapq.heapify(self._batteries)
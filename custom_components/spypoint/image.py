@@ -0,0 +1,85 @@
+"""
+Spypoint camera latest photo
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Iterable
+
+from aiohttp import ClientError
+from homeassistant.components.image import ImageEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from spypointapi import Camera, SpypointApiError
+
+from . import SpypointCoordinator
+from .const import DOMAIN, LOGGER, FETCH_TIMEOUT
+from .entity import SpypointCameraEntity
+from .photo_cache import async_get_photo_cache, SpypointPhotoCache
+from .photos import Photo
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> None:
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    photo_cache = async_get_photo_cache(hass)
+
+    @callback
+    def async_add_new_cameras() -> None:
+        images = create_images(coordinator, photo_cache, [coordinator.data[camera_id] for camera_id in coordinator.added_cameras])
+        if images:
+            async_add_entities(images)
+
+    async_add_entities(create_images(coordinator, photo_cache, coordinator.data.values()))
+    entry.async_on_unload(coordinator.async_add_listener(async_add_new_cameras))
+
+
+def create_images(coordinator: SpypointCoordinator, photo_cache: SpypointPhotoCache, cameras: Iterable[Camera]) -> list[ImageEntity]:
+    return [SpypointLatestPhoto(coordinator, photo_cache, camera) for camera in cameras]
+
+
+class SpypointLatestPhoto(SpypointCameraEntity, ImageEntity):
+    _attr_content_type = 'image/jpeg'
+    # the state is the photo, written when a check-in brings a new photo id
+    _camera_fields = frozenset()
+
+    def __init__(self, coordinator: SpypointCoordinator, photo_cache: SpypointPhotoCache, camera: Camera) -> None:
+        SpypointCameraEntity.__init__(self, coordinator, camera, 'Latest Photo')
+        ImageEntity.__init__(self, coordinator.hass)
+        self._photo_cache = photo_cache
+        self._photo: Photo | None = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._async_schedule_photo_update()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if 'last_update_time' in self.coordinator.changed_fields(self._camera_id):
+            self._async_schedule_photo_update()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_schedule_photo_update(self) -> None:
+        self.coordinator.config_entry.async_create_background_task(
+            self.hass, self._async_update_photo(), f'{DOMAIN} {self._camera_id} latest photo')
+
+    async def _async_update_photo(self) -> None:
+        try:
+            async with asyncio.timeout(FETCH_TIMEOUT.total_seconds()):
+                photo = await self.coordinator.photos.async_get_latest_photo(self._camera_id)
+        # a malformed photo listing raises KeyError or ValueError, the current photo stays
+        except (SpypointApiError, ClientError, TimeoutError, KeyError, ValueError) as error:
+            LOGGER.debug('Unable to get latest photo of camera %s: %s', self._camera_id, error)
+            return
+
+        if photo is None or (self._photo is not None and photo.id == self._photo.id):
+            return
+
+        self._photo = photo
+        self._attr_image_last_updated = photo.date
+        self.async_write_ha_state()
+
+    async def async_image(self) -> bytes | None:
+        if self._photo is None:
+            return None
+        return await self._photo_cache.async_get(self._photo.id, self._photo.url)
@@ -0,0 +1,122 @@
+"""
+Spypoint photo history media source
+"""
+from __future__ import annotations
+
+from homeassistant.components.media_player import MediaClass
+from homeassistant.components.media_player.errors import BrowseError
+from homeassistant.components.media_source.error import Unresolvable
+from homeassistant.components.media_source.models import BrowseMediaSource, MediaSource, MediaSourceItem, PlayMedia
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from spypointapi import Camera
+
+from .const import DOMAIN, MANUFACTURER
+from .photo_index import async_get_photo_index, SpypointPhotoIndex
+from .photos import Photo
+from .renditions import SpypointPhotoView
+
+DAYS_PER_PAGE = 31
+PHOTOS_PER_PAGE = 50
+PHOTO_CONTENT_TYPE = 'image/jpeg'
+
+
+async def async_get_media_source(hass: HomeAssistant) -> MediaSource:
+    return SpypointMediaSource(hass)
+
+
+class SpypointMediaSource(MediaSource):
+    """Browses photo history by camera and by day from the local photo index."""
+
+    name = MANUFACTURER
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        super().__init__(DOMAIN)
+        self.hass = hass
+
+    async def async_resolve_media(self, item: MediaSourceItem) -> PlayMedia:
+        kind, _, photo_id = (item.identifier or '').partition('/')
+        if kind != 'photo':
+            raise Unresolvable(f'Unknown media item {item.identifier}')
+
+        index = await async_get_photo_index(self.hass)
+        photo = await self.hass.async_add_executor_job(index.photo, photo_id)
+        if photo is None:
+            raise Unresolvable(f'Photo {photo_id} not found')
+        return PlayMedia(photo.url, PHOTO_CONTENT_TYPE)
+
+    async def async_browse_media(self, item: MediaSourceItem) -> BrowseMediaSource:
+        if not item.identifier:
+            return self._browse_cameras()
+
+        parts = item.identifier.split('/')
+        cameras = self._cameras()
+        if len(parts) < 2 or parts[1] not in cameras:
+            raise BrowseError(f'Unknown media item {item.identifier}')
+
+        index = await async_get_photo_index(self.hass)
+        try:
+            if parts[0] == 'camera' and len(parts) <= 3:
+                page = int(parts[2]) if len(parts) == 3 else 0
+                return await self._async_browse_days(index, cameras[parts[1]], page)
+            if parts[0] == 'day' and 3 <= len(parts) <= 4:
+                page = int(parts[3]) if len(parts) == 4 else 0
+                return await self._async_browse_photos(index, cameras[parts[1]], parts[2], page)
+        except ValueError as error:
+            raise BrowseError(f'Unknown media item {item.identifier}') from error
+        raise BrowseError(f'Unknown media item {item.identifier}')
+
+    def _cameras(self) -> dict[str, Camera]:
+        cameras = {}
+        for coordinator in self.hass.data.get(DOMAIN, {}).values():
+            if coordinator.data:
+                cameras.update(coordinator.data)
+        return cameras
+
+    def _browse_cameras(self) -> BrowseMediaSource:
+        children = [_directory(f'camera/{camera.id}', camera.name)
+                    for camera in sorted(self._cameras().values(), key=lambda camera: camera.name)]
+        return _directory('', MANUFACTURER, children)
+
+    async def _async_browse_days(self, index: SpypointPhotoIndex, camera: Camera, page: int) -> BrowseMediaSource:
+        # one extra row tells whether an older page exists
+        days = await self.hass.async_add_executor_job(index.days, camera.id, DAYS_PER_PAGE + 1, page * DAYS_PER_PAGE)
+        children = [_directory(f'day/{camera.id}/{day}', f'{day} ({count})') for day, count in days[:DAYS_PER_PAGE]]
+        if len(days) > DAYS_PER_PAGE:
+            children.append(_directory(f'camera/{camera.id}/{page + 1}', 'Older days'))
+        return _directory(f'camera/{camera.id}/{page}', camera.name, children)
+
+    async def _async_browse_photos(self, index: SpypointPhotoIndex, camera: Camera, day: str, page: int) -> BrowseMediaSource:
+        photos = await self.hass.async_add_executor_job(index.photos, camera.id, day, PHOTOS_PER_PAGE + 1, page * PHOTOS_PER_PAGE)
+        children = [_photo(photo) for photo in photos[:PHOTOS_PER_PAGE]]
+        if len(photos) > PHOTOS_PER_PAGE:
+            children.append(_directory(f'day/{camera.id}/{day}/{page + 1}', 'Older photos'))
+        return _directory(f'day/{camera.id}/{day}/{page}', f'{camera.name} {day}', children)
+
+
+def _directory(identifier: str, title: str, children: list[BrowseMediaSource] | None = None) -> BrowseMediaSource:
+    return BrowseMediaSource(
+        domain=DOMAIN,
+        identifier=identifier,
+        media_class=MediaClass.DIRECTORY,
+        media_content_type='',
+        title=title,
+        can_play=False,
+        can_expand=True,
+        children=children,
+        children_media_class=MediaClass.IMAGE if children is not None else None,
+    )
+
+
+def _photo(photo: Photo) -> BrowseMediaSource:
+    return BrowseMediaSource(
+        domain=DOMAIN,
+        identifier=f'photo/{photo.id}',
+        media_class=MediaClass.IMAGE,
+        media_content_type=PHOTO_CONTENT_TYPE,
+        title=dt_util.as_local(photo.date).strftime('%H:%M:%S'),
+        can_play=True,
+        can_expand=False,
+        # rendered locally, tiles of the media browser are far smaller than the photos
+        thumbnail=f'{SpypointPhotoView.url.format(photo_id=photo.id)}?size=small',
+    )
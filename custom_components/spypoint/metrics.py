@@ -0,0 +1,70 @@
+"""
+Spypoint coordinator performance metrics
+"""
+from __future__ import annotations
+
+from collections import deque
+from datetime import timedelta
+from typing import Any
+
+# refreshes kept for the percentiles
+WINDOW = 100
+
+
+class SpypointCoordinatorMetrics:
+    """Rolling performance numbers of a coordinator, read by diagnostics and diagnostic sensors."""
+
+    def __init__(self) -> None:
+        self._latencies: deque[float] = deque(maxlen=WINDOW)
+        self._check_in_lags: deque[float] = deque(maxlen=WINDOW)
+        self.fetches = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.cameras = 0
+        self.entities_notified = 0
+        self._notifying = 0
+
+    def record_fetch(self, latency: float, cameras: int) -> None:
+        self.fetches += 1
+        self._latencies.append(latency)
+        self.cameras = cameras
+
+    def record_check_in_lag(self, lag: timedelta) -> None:
+        self._check_in_lags.append(max(lag.total_seconds(), 0.0))
+
+    def start_notifying(self) -> None:
+        self._notifying = 0
+
+    def count_notified(self) -> None:
+        self._notifying += 1
+
+    def stop_notifying(self) -> None:
+        self.entities_notified = self._notifying
+
+    def latency(self, percentile: int) -> float | None:
+        return _percentile(self._latencies, percentile)
+
+    def check_in_lag(self, percentile: int) -> float | None:
+        return _percentile(self._check_in_lags, percentile)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'fetches': self.fetches,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'cameras': self.cameras,
+            'entities_notified': self.entities_notified,
+            'latency_p50': self.latency(50),
+            'latency_p95': self.latency(95),
+            'latency_p99': self.latency(99),
+            'check_in_lag_p50': self.check_in_lag(50),
+            'check_in_lag_p95': self.check_in_lag(95),
+        }
+
+
+def _percentile(values: deque[float], percentile: int) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(percentile / 100 * (len(ordered) - 1)))
+    return round(ordered[index], 3)
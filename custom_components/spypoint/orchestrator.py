@@ -0,0 +1,82 @@
+"""
+Spypoint domain-wide poll orchestrator
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_SHARED, LOGGER, DEFAULT_UPDATE_INTERVAL, MAX_CONCURRENT_FETCHES, MAX_POLL_JITTER
+
+DATA_ORCHESTRATOR = 'orchestrator'
+
+# share of the interval added as jitter to each poll
+JITTER_RATIO = 0.25
+
+
+@callback
+def async_get_orchestrator(hass: HomeAssistant) -> SpypointPollOrchestrator:
+    shared = hass.data.setdefault(DATA_SHARED, {})
+    if DATA_ORCHESTRATOR not in shared:
+        shared[DATA_ORCHESTRATOR] = SpypointPollOrchestrator()
+    return shared[DATA_ORCHESTRATOR]
+
+
+class SpypointPollOrchestrator:
+    """Spreads the polls of every account and bounds how many fetches run at once."""
+
+    def __init__(self, max_concurrent_fetches: int = MAX_CONCURRENT_FETCHES) -> None:
+        self._semaphore = asyncio.Semaphore(max_concurrent_fetches)
+        self._entries: set[str] = set()
+        self._unscheduled: set[str] = set()
+        self.queue_depth = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    @property
+    def entries(self) -> int:
+        return len(self._entries)
+
+    def register(self, entry_id: str) -> None:
+        self._entries.add(entry_id)
+        self._unscheduled.add(entry_id)
+
+    def unregister(self, entry_id: str) -> None:
+        self._entries.discard(entry_id)
+        self._unscheduled.discard(entry_id)
+
+    def spread(self, entry_id: str, interval: timedelta) -> timedelta:
+        if interval < DEFAULT_UPDATE_INTERVAL:
+            # the scheduler shortened the interval to catch an expected check-in, jitter would miss it
+            return interval
+        seconds = interval.total_seconds()
+        if entry_id in self._unscheduled:
+            # entries set up together start in phase, their first poll picks a random slot to drift apart
+            self._unscheduled.discard(entry_id)
+            return interval + timedelta(seconds=random.uniform(0, min(seconds, DEFAULT_UPDATE_INTERVAL.total_seconds())))
+        return interval + timedelta(seconds=random.uniform(0, min(seconds * JITTER_RATIO, MAX_POLL_JITTER.total_seconds())))
+
+    @asynccontextmanager
+    async def async_fetch_slot(self) -> AsyncIterator[None]:
+        queued_at = time.monotonic()
+        self.queue_depth += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        self.lag = time.monotonic() - queued_at
+        self.max_lag = max(self.max_lag, self.lag)
+        if self.lag > 1:
+            LOGGER.debug('Fetch waited %.1fs for a slot, %d still queued', self.lag, self.queue_depth)
+
+        try:
+            yield
+        finally:
+            self._semaphore.release()
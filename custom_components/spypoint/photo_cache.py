@@ -0,0 +1,90 @@
+"""
+Spypoint photo bytes cache
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from aiohttp import ClientError, ClientSession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DATA_SHARED, LOGGER, FETCH_TIMEOUT, PHOTO_CACHE_MAX_BYTES
+
+DATA_PHOTO_CACHE = 'photo_cache'
+
+# photos never change once taken, cached bytes are only revalidated once in a while
+REVALIDATE_AFTER = 24 * 60 * 60
+
+
+@callback
+def async_get_photo_cache(hass: HomeAssistant) -> SpypointPhotoCache:
+    shared = hass.data.setdefault(DATA_SHARED, {})
+    if DATA_PHOTO_CACHE not in shared:
+        shared[DATA_PHOTO_CACHE] = SpypointPhotoCache(async_get_clientsession(hass))
+    return shared[DATA_PHOTO_CACHE]
+
+
+@dataclass
+class CachedPhoto:
+    content: bytes
+    etag: str | None
+    last_modified: str | None
+    validated_at: float
+
+
+class SpypointPhotoCache:
+    """Size-bounded LRU of photo bytes shared by every camera."""
+
+    def __init__(self, session: ClientSession, max_bytes: int = PHOTO_CACHE_MAX_BYTES) -> None:
+        self._session = session
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedPhoto] = OrderedDict()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def async_get(self, key: str, url: str) -> bytes | None:
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            if time.monotonic() - cached.validated_at < REVALIDATE_AFTER:
+                return cached.content
+
+        headers = {}
+        if cached is not None and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached is not None and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+        try:
+            async with asyncio.timeout(FETCH_TIMEOUT.total_seconds()), self._session.get(url, headers=headers) as response:
+                if response.status == 304 and cached is not None:
+                    cached.validated_at = time.monotonic()
+                    return cached.content
+                response.raise_for_status()
+                content = await response.read()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except (ClientError, TimeoutError) as error:
+            LOGGER.warning('Unable to download photo %s: %s', key, error)
+            return cached.content if cached is not None else None
+
+        self._put(key, CachedPhoto(content, etag, last_modified, time.monotonic()))
+        return content
+
+    def _put(self, key: str, photo: CachedPhoto) -> None:
+        if (previous := self._entries.pop(key, None)) is not None:
+            self.size -= len(previous.content)
+        if len(photo.content) > self._max_bytes:
+            return
+
+        self._entries[key] = photo
+        self.size += len(photo.content)
+        while self.size > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.content)
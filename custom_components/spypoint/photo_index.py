@@ -0,0 +1,253 @@
+"""
+Spypoint local photo index
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from aiohttp import ClientError
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, Event, callback
+from homeassistant.util import dt as dt_util
+from spypointapi import SpypointApiError
+
+from .const import DOMAIN, DATA_SHARED, LOGGER
+from .coordinator import SpypointCoordinator
+from .events import async_fire_event, EVENT_NEW_PHOTO
+from .photos import Photo
+
+DATA_PHOTO_INDEX = 'photo_index'
+
+PAGE_SIZE = 100
+# bounds the cloud requests of one indexing run, older history is backfilled over the next runs
+MAX_PAGES_PER_RUN = 5
+MAX_BACKFILLS_PER_RUN = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS photos (
+    id TEXT PRIMARY KEY,
+    camera_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    urls TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS photos_by_camera_day ON photos (camera_id, day, taken_at);
+CREATE TABLE IF NOT EXISTS cameras (
+    camera_id TEXT PRIMARY KEY,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS gaps (
+    camera_id TEXT NOT NULL,
+    newest REAL NOT NULL,
+    date_end REAL NOT NULL,
+    PRIMARY KEY (camera_id, newest)
+);
+"""
+
+
+async def async_get_photo_index(hass: HomeAssistant) -> SpypointPhotoIndex:
+    shared = hass.data.setdefault(DATA_SHARED, {})
+    if DATA_PHOTO_INDEX not in shared:
+        # entries set up concurrently all wait on the same open
+        shared[DATA_PHOTO_INDEX] = hass.async_create_task(_async_open_photo_index(hass))
+    return await shared[DATA_PHOTO_INDEX]
+
+
+async def _async_open_photo_index(hass: HomeAssistant) -> SpypointPhotoIndex:
+    index = SpypointPhotoIndex(hass.config.path(f'{DOMAIN}_photos.db'))
+    await hass.async_add_executor_job(index.open)
+
+    @callback
+    def async_close(_: Event) -> None:
+        hass.async_add_executor_job(index.close)
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_close)
+    return index
+
+
+class SpypointPhotoIndex:
+    """SQLite index of photo metadata, all methods block and run in the executor."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        self._connection = sqlite3.connect(self._path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def add(self, camera_id: str, photos: list[Photo]) -> None:
+        rows = [(photo.id, photo.camera_id, dt_util.as_local(photo.date).date().isoformat(), photo.date.timestamp(), json.dumps(photo.urls))
+                for photo in photos]
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR IGNORE INTO cameras (camera_id) VALUES (?)', (camera_id,))
+            self._connection.executemany('INSERT OR IGNORE INTO photos VALUES (?, ?, ?, ?, ?)', rows)
+
+    def set_complete(self, camera_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO cameras (camera_id, complete) VALUES (?, 1)', (camera_id,))
+
+    def incomplete_cameras(self) -> list[str]:
+        with self._lock:
+            return [row[0] for row in self._connection.execute('SELECT camera_id FROM cameras WHERE complete = 0')]
+
+    def gaps(self) -> list[tuple[str, datetime, datetime]]:
+        """Unindexed photos of each camera taken after newest and before date_end."""
+        with self._lock:
+            rows = self._connection.execute('SELECT camera_id, newest, date_end FROM gaps').fetchall()
+        return [(camera_id, dt_util.utc_from_timestamp(newest), dt_util.utc_from_timestamp(date_end)) for camera_id, newest, date_end in rows]
+
+    def save_gap(self, camera_id: str, newest: datetime, date_end: datetime) -> None:
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO gaps VALUES (?, ?, ?)', (camera_id, newest.timestamp(), date_end.timestamp()))
+
+    def remove_gap(self, camera_id: str, newest: datetime) -> None:
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM gaps WHERE camera_id = ? AND newest = ?', (camera_id, newest.timestamp()))
+
+    def remove_camera(self, camera_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM photos WHERE camera_id = ?', (camera_id,))
+            self._connection.execute('DELETE FROM cameras WHERE camera_id = ?', (camera_id,))
+            self._connection.execute('DELETE FROM gaps WHERE camera_id = ?', (camera_id,))
+
+    def newest(self, camera_id: str) -> datetime | None:
+        return self._taken_at('SELECT MAX(taken_at) FROM photos WHERE camera_id = ?', camera_id)
+
+    def oldest(self, camera_id: str) -> datetime | None:
+        return self._taken_at('SELECT MIN(taken_at) FROM photos WHERE camera_id = ?', camera_id)
+
+    def days(self, camera_id: str, limit: int, offset: int = 0) -> list[tuple[str, int]]:
+        with self._lock:
+            return self._connection.execute(
+                'SELECT day, COUNT(*) FROM photos WHERE camera_id = ? GROUP BY day ORDER BY day DESC LIMIT ? OFFSET ?',
+                (camera_id, limit, offset)).fetchall()
+
+    def photos(self, camera_id: str, day: str, limit: int, offset: int = 0) -> list[Photo]:
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT id, camera_id, taken_at, urls FROM photos WHERE camera_id = ? AND day = ? ORDER BY taken_at DESC LIMIT ? OFFSET ?',
+                (camera_id, day, limit, offset)).fetchall()
+        return [_photo_from_row(row) for row in rows]
+
+    def photo(self, photo_id: str) -> Photo | None:
+        with self._lock:
+            row = self._connection.execute('SELECT id, camera_id, taken_at, urls FROM photos WHERE id = ?', (photo_id,)).fetchone()
+        return _photo_from_row(row) if row is not None else None
+
+    def _taken_at(self, query: str, camera_id: str) -> datetime | None:
+        with self._lock:
+            (taken_at,) = self._connection.execute(query, (camera_id,)).fetchone()
+        return dt_util.utc_from_timestamp(taken_at) if taken_at is not None else None
+
+
+def _photo_from_row(row: tuple) -> Photo:
+    photo_id, camera_id, taken_at, urls = row
+    return Photo(id=photo_id, camera_id=camera_id, date=dt_util.utc_from_timestamp(taken_at), urls=json.loads(urls))
+
+
+class SpypointPhotoIndexer:
+    """Keeps the photo index of an entry up to date after each coordinator refresh."""
+
+    def __init__(self, hass: HomeAssistant, coordinator: SpypointCoordinator) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.index: SpypointPhotoIndex | None = None
+        self._pending: set[str] = set()
+        self._removed: set[str] = set()
+        self._running = False
+
+    @callback
+    def async_schedule(self) -> None:
+        self._pending.update(camera_id for camera_id, fields in self.coordinator.changes.items() if 'last_update_time' in fields)
+        # excluded cameras are still on the account and keep their history in case they are included again
+        self._removed.update(camera_id for camera_id in self.coordinator.removed_cameras if camera_id not in self.coordinator.account_cameras)
+        if self._running or not (self._pending or self._removed):
+            return
+
+        self._running = True
+        self.coordinator.config_entry.async_create_background_task(self.hass, self._async_run(), f'{DOMAIN} photo index')
+
+    async def _async_run(self) -> None:
+        if self.index is None:
+            self.index = await async_get_photo_index(self.hass)
+        try:
+            while self._pending or self._removed:
+                for camera_id in list(self._removed):
+                    self._removed.discard(camera_id)
+                    self._pending.discard(camera_id)
+                    await self.hass.async_add_executor_job(self.index.remove_camera, camera_id)
+
+                camera_ids = list(self._pending)
+                self._pending.clear()
+                for camera_id in camera_ids:
+                    await self._async_index_new_photos(camera_id)
+
+                await self._async_fill_gaps()
+                await self._async_backfill()
+        # a malformed photo listing raises KeyError or ValueError, the next run starts over from the index
+        except (SpypointApiError, ClientError, TimeoutError, KeyError, ValueError) as error:
+            LOGGER.debug('Photo index update interrupted: %s', error)
+        finally:
+            self._running = False
+
+    async def _async_index_new_photos(self, camera_id: str) -> None:
+        newest = await self.hass.async_add_executor_job(self.index.newest, camera_id)
+        date_end = None
+        for _ in range(MAX_PAGES_PER_RUN):
+            photos = await self.coordinator.photos.async_get_photos(camera_id, limit=PAGE_SIZE, date_end=date_end)
+            new_photos = [photo for photo in photos if newest is None or photo.date > newest]
+            await self.hass.async_add_executor_job(self.index.add, camera_id, new_photos)
+            # the first indexing of a camera is its history, not new activity
+            if newest is not None:
+                for photo in sorted(new_photos, key=lambda photo: photo.date):
+                    async_fire_event(self.hass, self.coordinator, EVENT_NEW_PHOTO, camera_id,
+                                     photo_id=photo.id, date=photo.date.isoformat(), url=photo.url)
+
+            if len(photos) < PAGE_SIZE:
+                if newest is None:
+                    await self.hass.async_add_executor_job(self.index.set_complete, camera_id)
+                return
+            if len(new_photos) < len(photos):
+                return
+            date_end = photos[-1].date
+
+        if newest is not None:
+            # the newest photo moved past the ones left, the next runs resume the walk from here
+            await self.hass.async_add_executor_job(self.index.save_gap, camera_id, newest, date_end)
+
+    async def _async_fill_gaps(self) -> None:
+        gaps = await self.hass.async_add_executor_job(self.index.gaps)
+        for camera_id, newest, date_end in gaps[:MAX_BACKFILLS_PER_RUN]:
+            if camera_id not in self.coordinator.data:
+                continue
+            photos = await self.coordinator.photos.async_get_photos(camera_id, limit=PAGE_SIZE, date_end=date_end)
+            # no event for these, they are history by the time they are indexed
+            missing = [photo for photo in photos if photo.date > newest]
+            await self.hass.async_add_executor_job(self.index.add, camera_id, missing)
+            if len(photos) < PAGE_SIZE or len(missing) < len(photos):
+                await self.hass.async_add_executor_job(self.index.remove_gap, camera_id, newest)
+            else:
+                await self.hass.async_add_executor_job(self.index.save_gap, camera_id, newest, photos[-1].date)
+
+    async def _async_backfill(self) -> None:
+        incomplete = await self.hass.async_add_executor_job(self.index.incomplete_cameras)
+        for camera_id in incomplete[:MAX_BACKFILLS_PER_RUN]:
+            if camera_id not in self.coordinator.data:
+                continue
+            oldest = await self.hass.async_add_executor_job(self.index.oldest, camera_id)
+            photos = await self.coordinator.photos.async_get_photos(camera_id, limit=PAGE_SIZE, date_end=oldest)
+            await self.hass.async_add_executor_job(self.index.add, camera_id, photos)
+            if len(photos) < PAGE_SIZE:
+                await self.hass.async_add_executor_job(self.index.set_complete, camera_id)
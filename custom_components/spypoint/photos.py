@@ -0,0 +1,70 @@
+"""
+Spypoint camera photos
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+from spypointapi import SpypointApi, SpypointApiError
+
+PHOTO_SIZES = ('small', 'medium', 'large')
+MAX_CONCURRENT_REQUESTS = 4
+# far future end date, the cloud lists photos taken before it, newest first
+LATEST_DATE_END = '2100-01-01T00:00:00.000Z'
+
+
+@dataclass(frozen=True)
+class Photo:
+    id: str
+    camera_id: str
+    date: datetime
+    urls: dict[str, str]
+
+    @property
+    def url(self) -> str:
+        return self.urls.get('large') or next(iter(self.urls.values()))
+
+
+class SpypointPhotoApi:
+    """Lists camera photos with the authenticated session of a SpypointApi."""
+
+    def __init__(self, api: SpypointApi) -> None:
+        self.api = api
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def async_get_latest_photo(self, camera_id: str) -> Photo | None:
+        photos = await self.async_get_photos(camera_id, limit=1)
+        return photos[0] if photos else None
+
+    async def async_get_photos(self, camera_id: str, limit: int = 100, date_end: datetime | None = None) -> list[Photo]:
+        json = {
+            'camera': [camera_id],
+            'dateEnd': LATEST_DATE_END if date_end is None else date_end.astimezone(dt_util.UTC).isoformat().replace('+00:00', 'Z'),
+            'favorite': False,
+            'hd': False,
+            'limit': limit,
+            'tag': [],
+        }
+        async with self._semaphore:
+            await self.api.async_authenticate()
+            async with self.api.session.post(f'{self.api.base_url}/photo/all', json=json, headers=self.api.headers) as response:
+                if not response.ok:
+                    raise SpypointApiError(response)
+                body = await response.json()
+
+        return [photo for photo in map(photo_from_json, body.get('photos', [])) if photo is not None]
+
+
+def photo_from_json(data: dict[str, Any]) -> Photo | None:
+    urls = {}
+    for size in PHOTO_SIZES:
+        if (location := data.get(size)) and location.get('host') and location.get('path'):
+            urls[size] = f"https://{location['host']}/{location['path']}"
+    date = dt_util.parse_datetime(data.get('originDate') or data.get('date') or '')
+    if not urls or date is None:
+        return None
+    return Photo(id=data['id'], camera_id=data['camera'], date=date, urls=urls)
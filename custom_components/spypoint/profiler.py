@@ -0,0 +1,126 @@
+"""
+Spypoint coordinator profiler
+"""
+from __future__ import annotations
+
+import cProfile
+import pstats
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from .coordinator import SpypointCoordinator
+
+# fetch includes building the Camera objects, notify the entity fan-out and state writes
+STAGES = ('fetch', 'apply', 'notify')
+# functions listed in the report, the .prof file holds all of them
+REPORT_FUNCTIONS = 60
+
+
+class SpypointProfiler:
+    """Profiles the next coordinator cycles of every entry, then writes its report and turns itself off.
+
+    A cycle runs from the first stage of a refresh to the end of its entity fan-out.
+    The profiler only runs while a cycle is in progress, but every task the event
+    loop runs meanwhile is profiled too.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinators: list[SpypointCoordinator], cycles: int) -> None:
+        self._hass = hass
+        self._coordinators = coordinators
+        self.cycles = cycles
+        self._profile = cProfile.Profile()
+        self._current: dict[str, dict[str, float]] = {}
+        self._timings: list[tuple[str, dict[str, float]]] = []
+
+    @callback
+    def attach(self) -> None:
+        for coordinator in self._coordinators:
+            coordinator.profiler = self
+
+    @callback
+    def detach(self) -> None:
+        for coordinator in self._coordinators:
+            if coordinator.profiler is self:
+                coordinator.profiler = None
+        if self._current:
+            self._profile.disable()
+        self._current.clear()
+
+    @contextmanager
+    def stage(self, entry_id: str, stage: str) -> Iterator[None]:
+        if entry_id not in self._current:
+            if not self._start_cycle(entry_id):
+                yield
+                return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if (timings := self._current.get(entry_id)) is not None:
+                timings[stage] += time.perf_counter() - started
+
+    @callback
+    def end_cycle(self, entry_id: str) -> None:
+        timings = self._current.pop(entry_id, None)
+        if timings is None:
+            return
+        if not self._current:
+            self._profile.disable()
+
+        self._timings.append((entry_id, timings))
+        LOGGER.debug('Profiled cycle %d of %d', len(self._timings), self.cycles)
+        if len(self._timings) >= self.cycles:
+            self.detach()
+            self._hass.async_create_task(self._async_write_report(), f'{DOMAIN} profile report')
+
+    def _start_cycle(self, entry_id: str) -> bool:
+        if not self._current:
+            try:
+                self._profile.enable()
+            except ValueError as error:
+                LOGGER.warning('Unable to profile Spypoint, another profiler is running: %s', error)
+                self.detach()
+                return False
+        self._current[entry_id] = dict.fromkeys(STAGES, 0.0)
+        return True
+
+    async def _async_write_report(self) -> None:
+        path = await self._hass.async_add_executor_job(self.write_report, Path(self._hass.config.config_dir))
+        LOGGER.info('Spypoint profile written to %s', path)
+
+    def write_report(self, directory: Path) -> Path:
+        path = directory / f'{DOMAIN}_profile_{dt_util.now().strftime("%Y%m%d_%H%M%S")}.txt'
+        stats = pstats.Stats(self._profile)
+        stats.dump_stats(path.with_suffix('.prof'))
+        with path.open('w') as report:
+            report.write(self._breakdown())
+            report.write(f'\nTop {REPORT_FUNCTIONS} functions by cumulative time, all of them are in {path.with_suffix(".prof").name}\n')
+            stats.stream = report
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_FUNCTIONS)
+        return path
+
+    def _breakdown(self) -> str:
+        titles = {coordinator.config_entry.entry_id: coordinator.config_entry.title for coordinator in self._coordinators}
+        width = max([len('entry'), *(len(title) for title in titles.values())])
+        lines = [f'Spypoint profile of {len(self._timings)} coordinator cycles, in seconds', '',
+                 f'{"cycle":<6}{"entry":<{width + 2}}' + ''.join(f'{stage:>10}' for stage in STAGES) + f'{"total":>10}']
+        for cycle, (entry_id, timings) in enumerate(self._timings, start=1):
+            lines.append(f'{cycle:<6}{titles.get(entry_id, entry_id):<{width + 2}}' + _seconds(timings))
+
+        means = {stage: sum(timings[stage] for _, timings in self._timings) / len(self._timings) for stage in STAGES}
+        lines.append(f'{"mean":<{width + 8}}' + _seconds(means))
+        return '\n'.join(lines) + '\n'
+
+
+def _seconds(timings: dict[str, float]) -> str:
+    return ''.join(f'{timings[stage]:>10.4f}' for stage in STAGES) + f'{sum(timings.values()):>10.4f}'
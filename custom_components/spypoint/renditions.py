@@ -0,0 +1,165 @@
+"""
+Spypoint photo thumbnail renditions
+"""
+from __future__ import annotations
+
+import io
+import os
+from collections import OrderedDict
+from http import HTTPStatus
+from pathlib import Path
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView, KEY_HASS
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, DATA_SHARED, LOGGER, RENDITION_CACHE_MAX_BYTES
+from .photo_cache import async_get_photo_cache, SpypointPhotoCache
+from .photo_index import async_get_photo_index
+from .photos import Photo
+
+try:
+    from PIL import Image
+except ImportError:
+    # Pillow ships with Home Assistant but is not a requirement of the integration, photos are then served as is
+    Image = None
+
+DATA_RENDITION_CACHE = 'rendition_cache'
+
+# longest side of each rendition in pixels, large is the original photo
+RENDITION_SIZES = {'small': 320, 'medium': 800}
+ORIGINAL_SIZE = 'large'
+JPEG_QUALITY = 80
+
+
+@callback
+def async_get_rendition_cache(hass: HomeAssistant) -> SpypointRenditionCache:
+    shared = hass.data.setdefault(DATA_SHARED, {})
+    if DATA_RENDITION_CACHE not in shared:
+        shared[DATA_RENDITION_CACHE] = SpypointRenditionCache(hass, async_get_photo_cache(hass), Path(hass.config.path(f'{DOMAIN}_renditions')))
+    return shared[DATA_RENDITION_CACHE]
+
+
+def rendition_for_width(width: int) -> str:
+    """Smallest rendition at least as wide as asked."""
+    for size, pixels in RENDITION_SIZES.items():
+        if width <= pixels:
+            return size
+    return ORIGINAL_SIZE
+
+
+def render(content: bytes, pixels: int) -> bytes:
+    with Image.open(io.BytesIO(content)) as image:
+        image.thumbnail((pixels, pixels))
+        output = io.BytesIO()
+        image.convert('RGB').save(output, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+class SpypointRenditionCache:
+    """Size-bounded LRU of photo renditions on disk, rendered in the executor from the cached originals.
+
+    The least recently served files go first, their modification time keeps the
+    order across restarts.
+    """
+
+    def __init__(self, hass: HomeAssistant, photo_cache: SpypointPhotoCache, directory: Path, max_bytes: int = RENDITION_CACHE_MAX_BYTES) -> None:
+        self._hass = hass
+        self._photo_cache = photo_cache
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] | None = None
+        self.size = 0
+
+    async def async_get(self, photo: Photo, size: str) -> bytes | None:
+        if size not in RENDITION_SIZES:
+            return await self._photo_cache.async_get(photo.id, photo.url)
+        if Image is None:
+            # the cloud keeps its own renditions, bigger than ours
+            return await self._photo_cache.async_get(f'{photo.id}_{size}', photo.urls.get(size, photo.url))
+
+        if self._entries is None:
+            self._entries = await self._hass.async_add_executor_job(self._scan)
+            self.size = sum(self._entries.values())
+
+        name = f'{photo.id}_{size}.jpg'
+        if name in self._entries:
+            self._entries.move_to_end(name)
+            if (content := await self._hass.async_add_executor_job(self._read, name)) is not None:
+                return content
+            self.size -= self._entries.pop(name, 0)
+
+        original = await self._photo_cache.async_get(photo.id, photo.url)
+        if original is None:
+            return None
+        try:
+            content = await self._hass.async_add_executor_job(render, original, RENDITION_SIZES[size])
+        except (OSError, ValueError) as error:
+            LOGGER.debug('Unable to render photo %s: %s', photo.id, error)
+            return original
+
+        await self._hass.async_add_executor_job(self._write, name, content, self._put(name, len(content)))
+        return content
+
+    def _put(self, name: str, size: int) -> list[str]:
+        """Adds a rendition to the LRU, returns the files to evict."""
+        if (previous := self._entries.pop(name, None)) is not None:
+            self.size -= previous
+        self._entries[name] = size
+        self.size += size
+        evicted = []
+        while self.size > self._max_bytes and len(self._entries) > 1:
+            evicted_name, evicted_size = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            evicted.append(evicted_name)
+        return evicted
+
+    def _scan(self) -> OrderedDict[str, int]:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for entry in os.scandir(self._directory):
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        return OrderedDict((name, size) for _, name, size in sorted(files))
+
+    def _read(self, name: str) -> bytes | None:
+        path = self._directory / name
+        try:
+            content = path.read_bytes()
+            path.touch()
+        except FileNotFoundError:
+            return None
+        return content
+
+    def _write(self, name: str, content: bytes, evicted: list[str]) -> None:
+        (self._directory / name).write_bytes(content)
+        for evicted_name in evicted:
+            (self._directory / evicted_name).unlink(missing_ok=True)
+
+
+class SpypointPhotoView(HomeAssistantView):
+    """Serves indexed photos by id, as a rendition picked by size name or by the width the frontend asks for."""
+
+    url = '/api/spypoint/photos/{photo_id}'
+    name = 'api:spypoint:photos'
+
+    async def get(self, request: web.Request, photo_id: str) -> web.Response:
+        hass = request.app[KEY_HASS]
+        size = request.query.get('size', ORIGINAL_SIZE)
+        if 'width' in request.query:
+            try:
+                size = rendition_for_width(int(request.query['width']))
+            except ValueError:
+                return web.Response(status=HTTPStatus.BAD_REQUEST)
+
+        index = await async_get_photo_index(hass)
+        photo = await hass.async_add_executor_job(index.photo, photo_id)
+        if photo is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+
+        content = await async_get_rendition_cache(hass).async_get(photo, size)
+        if content is None:
+            return web.Response(status=HTTPStatus.BAD_GATEWAY)
+        # photos never change once taken
+        return web.Response(body=content, content_type='image/jpeg', headers={'Cache-Control': 'private, max-age=31536000, immutable'})
@@ -0,0 +1,96 @@
+"""
+Spypoint adaptive poll scheduler
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from spypointapi import Camera
+
+from .const import DEFAULT_UPDATE_INTERVAL, MIN_UPDATE_INTERVAL, MAX_UPDATE_INTERVAL, MAX_OFFLINE_UPDATE_INTERVAL, \
+    CHECK_IN_GRACE_PERIOD
+
+# weight of the newest observed check-in interval in the learned cadence
+CADENCE_SMOOTHING = 0.3
+# gaps longer than this are outages, not transmission schedules
+MAX_CADENCE = timedelta(hours=24)
+
+
+class SpypointPollScheduler:
+    """Learns each camera check-in cadence and picks the next poll interval.
+
+    Cameras only report on their own transmission schedule, so the next poll is
+    set just after the earliest expected check-in of the online cameras. When
+    every camera is offline, the interval backs off until a change is seen.
+    """
+
+    def __init__(self) -> None:
+        self._last_update_times: dict[str, datetime] = {}
+        self._cadences: dict[str, timedelta] = {}
+        self._offline_interval = DEFAULT_UPDATE_INTERVAL
+
+    def cadence(self, camera_id: str) -> timedelta | None:
+        return self._cadences.get(camera_id)
+
+    def next_interval(self, cameras: Iterable[Camera], now: datetime) -> timedelta:
+        cameras = list(cameras)
+        changed = self.observe(cameras)
+
+        online = [camera for camera in cameras if camera.is_online]
+        if not online:
+            if changed:
+                self._offline_interval = DEFAULT_UPDATE_INTERVAL
+            else:
+                self._offline_interval = min(self._offline_interval * 2, MAX_OFFLINE_UPDATE_INTERVAL)
+            return self._offline_interval
+
+        self._offline_interval = DEFAULT_UPDATE_INTERVAL
+
+        expected_check_ins = [self._expected_check_in(camera, now) for camera in online]
+        if None in expected_check_ins:
+            return DEFAULT_UPDATE_INTERVAL
+
+        interval = min(expected_check_ins) + CHECK_IN_GRACE_PERIOD - now
+        return max(MIN_UPDATE_INTERVAL, min(interval, MAX_UPDATE_INTERVAL))
+
+    def observe(self, cameras: list[Camera]) -> bool:
+        changed = False
+        for camera in cameras:
+            if camera.last_update_time is None:
+                # the cloud omits the time of cameras that have not reported, the last known one stays
+                continue
+            previous = self._last_update_times.get(camera.id)
+            self._last_update_times[camera.id] = camera.last_update_time
+            if previous is None or camera.last_update_time <= previous:
+                continue
+
+            changed = True
+            observed = camera.last_update_time - previous
+            if observed > MAX_CADENCE:
+                self._cadences.pop(camera.id, None)
+                continue
+
+            cadence = self._cadences.get(camera.id)
+            if cadence is None:
+                self._cadences[camera.id] = observed
+            else:
+                self._cadences[camera.id] = cadence * (1 - CADENCE_SMOOTHING) + observed * CADENCE_SMOOTHING
+
+        for camera_id in self._last_update_times.keys() - {camera.id for camera in cameras}:
+            del self._last_update_times[camera_id]
+            self._cadences.pop(camera_id, None)
+
+        return changed
+
+    def _expected_check_in(self, camera: Camera, now: datetime) -> datetime | None:
+        cadence = self._cadences.get(camera.id)
+        if cadence is None or camera.last_update_time is None:
+            return None
+
+        # a missed transmission means the camera reports at its next scheduled slot
+        expected = camera.last_update_time + cadence
+        if expected < now:
+            missed = (now - expected) // cadence + 1
+            expected += cadence * missed
+        return expected
@@ -1,143 +1,316 @@
 """
 Spypoint camera sensors
 """
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
-from homeassistant.const import EntityCategory, PERCENTAGE, UnitOfTemperature
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable
+
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass, SensorEntityDescription
+from homeassistant.const import EntityCategory, PERCENTAGE, UnitOfTemperature, UnitOfTime
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.typing import StateType
 from spypointapi import Camera
 
 from . import SpypointCoordinator
-from .const import DOMAIN, LOGGER
-from .entity import SpypointCameraEntity
+from .battery import SpypointBatteryPredictor
+from .const import DOMAIN, LOGGER, CONF_MEMORY_DEADBAND, CONF_SIGNAL_DEADBAND, CONF_TEMPERATURE_DEADBAND
+from .entity import SpypointCameraEntity, SpypointAccountEntity, camera_device_info
+from .fleet import SpypointFleetAggregates
+
+
+@dataclass(frozen=True, kw_only=True)
+class SpypointSensorEntityDescription(SensorEntityDescription):
+    # camera field the value is read from, only changes to it are written
+    field: str
+    value_fn: Callable[[Any], StateType | datetime] = lambda value: value
+    # option holding the smallest change of the field written
+    deadband_option: str | None = None
+    exists_fn: Callable[[Camera], bool] = lambda camera: True
+
+
+@dataclass(frozen=True, kw_only=True)
+class SpypointBatterySensorEntityDescription(SensorEntityDescription):
+    value_fn: Callable[[SpypointBatteryPredictor], float | None]
+
+
+@dataclass(frozen=True, kw_only=True)
+class SpypointFleetSensorEntityDescription(SensorEntityDescription):
+    value_fn: Callable[[SpypointFleetAggregates], StateType]
+    # camera the value comes from, shown as attributes
+    camera_fn: Callable[[SpypointFleetAggregates], str | None] = lambda fleet: None
+
+
+def _notifications(notifications: list[str] | None) -> str:
+    if notifications is None or len(notifications) == 0:
+        return 'None'
+    return ', '.join(notifications)
+
+
+SENSORS: tuple[SpypointSensorEntityDescription, ...] = (
+    SpypointSensorEntityDescription(
+        key='signal',
+        name='Cellular Signal Strength',
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=PERCENTAGE,
+        field='signal',
+        deadband_option=CONF_SIGNAL_DEADBAND,
+    ),
+    SpypointSensorEntityDescription(
+        key='temperature',
+        name='Temperature',
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        field='temperature',
+        deadband_option=CONF_TEMPERATURE_DEADBAND,
+    ),
+    SpypointSensorEntityDescription(
+        key='battery',
+        name='Battery Level',
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.BATTERY,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=PERCENTAGE,
+        field='battery',
+    ),
+    SpypointSensorEntityDescription(
+        key='battery_type',
+        name='Battery Type',
+        entity_category=EntityCategory.DIAGNOSTIC,
+        field='battery_type',
+    ),
+    SpypointSensorEntityDescription(
+        key='memory',
+        name='SD Card Usage',
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=PERCENTAGE,
+        field='memory',
+        deadband_option=CONF_MEMORY_DEADBAND,
+    ),
+    SpypointSensorEntityDescription(
+        key='is_online',
+        name='Status',
+        device_class=SensorDeviceClass.ENUM,
+        options=['Online', 'Offline'],
+        field='is_online',
+        value_fn=lambda online: 'Online' if online else 'Offline',
+    ),
+    SpypointSensorEntityDescription(
+        key='last_update_time',
+        name='Last Update',
+        device_class=SensorDeviceClass.TIMESTAMP,
+        field='last_update_time',
+    ),
+    SpypointSensorEntityDescription(
+        key='notifications',
+        name='Notifications',
+        entity_category=EntityCategory.DIAGNOSTIC,
+        field='notifications',
+        value_fn=_notifications,
+    ),
+    SpypointSensorEntityDescription(
+        key='owner',
+        name='Owner',
+        entity_category=EntityCategory.DIAGNOSTIC,
+        field='owner',
+        exists_fn=lambda camera: camera.owner is not None,
+    ),
+)
+
+# one shared field set per description instead of one per entity
+_CAMERA_FIELDS = {description.field: frozenset({description.field}) for description in SENSORS}
+
+BATTERY_SENSORS: tuple[SpypointBatterySensorEntityDescription, ...] = (
+    SpypointBatterySensorEntityDescription(
+        key='battery_drain_rate',
+        name='Battery Drain Rate',
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=f'{PERCENTAGE}/{UnitOfTime.DAYS}',
+        suggested_display_precision=1,
+        value_fn=lambda predictor: predictor.drain_rate(),
+    ),
+    SpypointBatterySensorEntityDescription(
+        key='battery_days_remaining',
+        name='Battery Days Remaining',
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.DAYS,
+        suggested_display_precision=0,
+        value_fn=lambda predictor: predictor.days_remaining(),
+    ),
+)
+
+
+def _lowest_battery(fleet: SpypointFleetAggregates) -> tuple[float, str] | tuple[None, None]:
+    return fleet.lowest_battery() or (None, None)
+
+
+FLEET_SENSORS: tuple[SpypointFleetSensorEntityDescription, ...] = (
+    SpypointFleetSensorEntityDescription(
+        key='cameras_offline',
+        name='Cameras Offline',
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.offline,
+    ),
+    SpypointFleetSensorEntityDescription(
+        key='lowest_battery',
+        name='Lowest Battery Level',
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.BATTERY,
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda fleet: _lowest_battery(fleet)[0],
+        camera_fn=lambda fleet: _lowest_battery(fleet)[1],
+    ),
+    SpypointFleetSensorEntityDescription(
+        key='average_memory',
+        name='Average SD Card Usage',
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=1,
+        value_fn=lambda fleet: fleet.average_memory(),
+    ),
+    SpypointFleetSensorEntityDescription(
+        key='cameras_with_notifications',
+        name='Cameras With Notifications',
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.with_notifications,
+    ),
+)
+
+METRICS: tuple[SensorEntityDescription, ...] = (
+    SensorEntityDescription(key='latency_p50', name='Fetch Latency Median',
+                            native_unit_of_measurement=UnitOfTime.SECONDS, state_class=SensorStateClass.MEASUREMENT),
+    SensorEntityDescription(key='latency_p95', name='Fetch Latency 95th Percentile',
+                            native_unit_of_measurement=UnitOfTime.SECONDS, state_class=SensorStateClass.MEASUREMENT),
+    SensorEntityDescription(key='timeouts', name='Fetch Timeouts', state_class=SensorStateClass.TOTAL_INCREASING),
+    SensorEntityDescription(key='errors', name='Fetch Errors', state_class=SensorStateClass.TOTAL_INCREASING),
+    SensorEntityDescription(key='cameras', name='Cameras', state_class=SensorStateClass.MEASUREMENT),
+    SensorEntityDescription(key='entities_notified', name='Entities Notified', state_class=SensorStateClass.MEASUREMENT),
+    SensorEntityDescription(key='check_in_lag_p95', name='Check-in Lag 95th Percentile',
+                            native_unit_of_measurement=UnitOfTime.SECONDS, state_class=SensorStateClass.MEASUREMENT),
+)
 
 
 async def async_setup_entry(hass, entry, async_add_devices) -> None:
     coordinator = hass.data[DOMAIN][entry.entry_id]
 
-    sensors = []
+    @callback
+    def async_add_new_cameras() -> None:
+        sensors = []
+        for camera_id in coordinator.added_cameras:
+            sensors.extend(create_sensors(coordinator, coordinator.data[camera_id]))
+        if sensors:
+            async_add_devices(sensors)
+
+    sensors = [MetricSensor(coordinator, description) for description in METRICS]
+    sensors.extend(FleetSensor(coordinator, description) for description in FLEET_SENSORS)
     for camera in coordinator.data.values():
-        LOGGER.debug(camera)
-        sensors.append(SignalSensor(coordinator, camera))
-        sensors.append(TemperatureSensor(coordinator, camera))
-        sensors.append(BatterySensor(coordinator, camera))
-        sensors.append(BatteryTypeSensor(coordinator, camera))
-        sensors.append(MemorySensor(coordinator, camera))
-        sensors.append(OnlineSensor(coordinator, camera))
-        sensors.append(LastUpdateSensor(coordinator, camera))
-        sensors.append(NotificationsSensor(coordinator, camera))
-        if camera.owner is not None:
-            sensors.append(OwnerSensor(coordinator, camera))
+        sensors.extend(create_sensors(coordinator, camera))
 
     async_add_devices(sensors)
+    entry.async_on_unload(coordinator.async_add_listener(async_add_new_cameras))
 
 
-class SignalSensor(SpypointCameraEntity, SensorEntity):
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-    _attr_native_unit_of_measurement = PERCENTAGE
+def create_sensors(coordinator: SpypointCoordinator, camera: Camera) -> list[SensorEntity]:
+    LOGGER.debug(camera)
+    device_info = camera_device_info(camera)
+    sensors: list[SensorEntity] = [SpypointCameraSensor(coordinator, camera, description, device_info)
+                                   for description in SENSORS if description.exists_fn(camera)]
+    sensors.extend(SpypointBatterySensor(coordinator, camera, description, device_info) for description in BATTERY_SENSORS)
+    return sensors
 
-    def __init__(self, coordinator: SpypointCoordinator, camera: Camera) -> None:
-        super().__init__(coordinator, camera, 'Cellular Signal Strength')
-
-    @property
-    def native_value(self):
-        return self._camera.signal
 
+class SpypointCameraSensor(SpypointCameraEntity, SensorEntity):
+    entity_description: SpypointSensorEntityDescription
 
-class TemperatureSensor(SpypointCameraEntity, SensorEntity):
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-
-    def __init__(self, coordinator: SpypointCoordinator, camera: Camera) -> None:
-        super().__init__(coordinator, camera, 'Temperature')
+    def __init__(self, coordinator: SpypointCoordinator, camera: Camera, description: SpypointSensorEntityDescription,
+                 device_info: DeviceInfo | None = None) -> None:
+        super().__init__(coordinator, camera, description.name, device_info)
+        self.entity_description = description
 
     @property
-    def native_value(self):
-        return self._camera.temperature
-
-
-class BatterySensor(SpypointCameraEntity, SensorEntity):
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_device_class = SensorDeviceClass.BATTERY
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-    _attr_native_unit_of_measurement = PERCENTAGE
-
-    def __init__(self, coordinator: SpypointCoordinator, camera: Camera) -> None:
-        super().__init__(coordinator, camera, 'Battery Level')
+    def _camera_fields(self) -> frozenset[str]:
+        return _CAMERA_FIELDS[self.entity_description.field]
 
     @property
-    def native_value(self):
-        return self._camera.battery
+    def native_value(self) -> StateType | datetime:
+        return self.entity_description.value_fn(self._value(self.entity_description.field))
 
+    def _deadband(self) -> float | None:
+        if (option := self.entity_description.deadband_option) is None:
+            return None
+        return self.coordinator.deadbands.get(option)
 
-class BatteryTypeSensor(SpypointCameraEntity, SensorEntity):
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    def _deadband_value(self) -> Any:
+        return self._value(self.entity_description.field)
 
-    def __init__(self, coordinator: SpypointCoordinator, camera: Camera) -> None:
-        super().__init__(coordinator, camera, 'Battery Type')
 
-    @property
-    def native_value(self):
-        return self._camera.battery_type
+class SpypointBatterySensor(SpypointCameraEntity, SensorEntity):
+    entity_description: SpypointBatterySensorEntityDescription
+    # the predictor takes a reading at each check-in
+    _camera_fields = frozenset({'battery', 'last_update_time'})
 
-
-class MemorySensor(SpypointCameraEntity, SensorEntity):
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-    _attr_native_unit_of_measurement = PERCENTAGE
-
-    def __init__(self, coordinator: SpypointCoordinator, camera: Camera) -> None:
-        super().__init__(coordinator, camera, 'SD Card Usage')
+    def __init__(self, coordinator: SpypointCoordinator, camera: Camera,
+                 description: SpypointBatterySensorEntityDescription, device_info: DeviceInfo | None = None) -> None:
+        super().__init__(coordinator, camera, description.name, device_info)
+        self.entity_description = description
 
     @property
-    def native_value(self):
-        return self._camera.memory
-
-
-class LastUpdateSensor(SpypointCameraEntity, SensorEntity):
-    _attr_device_class = SensorDeviceClass.TIMESTAMP
-
-    def __init__(self, coordinator: SpypointCoordinator, camera: Camera) -> None:
-        super().__init__(coordinator, camera, 'Last Update')
-
-    @property
-    def native_value(self):
-        return self._camera.last_update_time
+    def native_value(self) -> float | None:
+        if (predictor := self.coordinator.battery(self._camera_id)) is None:
+            return None
+        return self.entity_description.value_fn(predictor)
 
 
-class OnlineSensor(SpypointCameraEntity, SensorEntity):
-    _attr_device_class = SensorDeviceClass.ENUM
-    _attr_options = ['Online', 'Offline']
+class MetricSensor(SpypointAccountEntity, SensorEntity):
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
 
-    def __init__(self, coordinator: SpypointCoordinator, camera: Camera) -> None:
-        super().__init__(coordinator, camera, 'Status')
+    def __init__(self, coordinator: SpypointCoordinator, description: SensorEntityDescription) -> None:
+        super().__init__(coordinator, description.key, description.name)
+        self.entity_description = description
 
     @property
     def native_value(self):
-        if self._camera.is_online:
-            return 'Online'
-        return 'Offline'
+        return self.coordinator.metrics.as_dict()[self.entity_description.key]
 
 
-class NotificationsSensor(SpypointCameraEntity, SensorEntity):
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
+class FleetSensor(SpypointAccountEntity, SensorEntity):
+    """Aggregate of the cameras of an account, written only when it changes."""
+    entity_description: SpypointFleetSensorEntityDescription
 
-    def __init__(self, coordinator: SpypointCoordinator, camera: Camera) -> None:
-        super().__init__(coordinator, camera, 'Notifications')
+    def __init__(self, coordinator: SpypointCoordinator, description: SpypointFleetSensorEntityDescription) -> None:
+        super().__init__(coordinator, description.key, description.name)
+        self.entity_description = description
+        self._written: tuple | None = None
 
     @property
-    def native_value(self):
-        if self._camera.notifications is None or len(self._camera.notifications) == 0:
-            return "None"
-        return ", ".join(self._camera.notifications)
-
-
-class OwnerSensor(SpypointCameraEntity, SensorEntity):
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-
-    def __init__(self, coordinator: SpypointCoordinator, camera: Camera) -> None:
-        super().__init__(coordinator, camera, 'Owner')
+    def native_value(self) -> StateType:
+        return self.entity_description.value_fn(self.coordinator.fleet)
 
     @property
-    def native_value(self):
-        return self._camera.owner
\ No newline at end of file
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if (camera_id := self.entity_description.camera_fn(self.coordinator.fleet)) is None:
+            return None
+        return {'camera_id': camera_id, 'camera_name': self.coordinator.account_cameras.get(camera_id)}
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._written = self._state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        state = self._state()
+        if state == self._written:
+            return
+        self._written = state
+        self.coordinator.count_entity_update()
+        self.async_write_ha_state()
+
+    def _state(self) -> tuple:
+        return self.available, self.native_value, self.entity_description.camera_fn(self.coordinator.fleet)
@@ -0,0 +1,77 @@
+"""
+Spypoint services
+"""
+from __future__ import annotations
+
+import asyncio
+
+import voluptuous as vol
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+
+from .const import DOMAIN
+from .profiler import SpypointProfiler
+
+SERVICE_REFRESH = 'refresh'
+SERVICE_PROFILE = 'profile'
+
+ATTR_CAMERA_ID = 'camera_id'
+ATTR_CYCLES = 'cycles'
+
+DEFAULT_PROFILE_CYCLES = 3
+MAX_PROFILE_CYCLES = 50
+
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CAMERA_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CYCLES, default=DEFAULT_PROFILE_CYCLES): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_PROFILE_CYCLES)),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+
+    async def async_refresh(call: ServiceCall) -> None:
+        camera_ids = set(call.data.get(ATTR_CAMERA_ID, []))
+        device_registry = dr.async_get(hass)
+        for device_id in call.data.get(ATTR_DEVICE_ID, []):
+            if (device := device_registry.async_get(device_id)) is None:
+                raise ServiceValidationError(f'Unknown device {device_id}')
+            camera_ids.update(identifier for domain, identifier in device.identifiers if domain == DOMAIN)
+
+        # coordinator and the cameras to refresh, None for all of them
+        targets = []
+        targeted = set()
+        for coordinator in hass.data.get(DOMAIN, {}).values():
+            if not camera_ids or coordinator.config_entry.entry_id in camera_ids:
+                targets.append((coordinator, None))
+                targeted.update([coordinator.config_entry.entry_id, *coordinator.account_cameras])
+            elif owned := camera_ids & coordinator.account_cameras.keys():
+                targets.append((coordinator, owned))
+                targeted.update(owned)
+
+        if unknown := camera_ids - targeted:
+            raise ServiceValidationError(f'Unknown Spypoint cameras {", ".join(sorted(unknown))}')
+        # the refreshes are only created once every target is known, none is left unawaited
+        await asyncio.gather(*(coordinator.async_refresh_cameras(owned) for coordinator, owned in targets))
+
+    @callback
+    def async_profile(call: ServiceCall) -> None:
+        coordinators = list(hass.data.get(DOMAIN, {}).values())
+        if not coordinators:
+            raise ServiceValidationError('No Spypoint account is loaded')
+        if any(coordinator.profiler is not None for coordinator in coordinators):
+            raise ServiceValidationError('Spypoint is already being profiled')
+        SpypointProfiler(hass, coordinators, call.data[ATTR_CYCLES]).attach()
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, async_refresh, schema=REFRESH_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA)
@@ -0,0 +1,62 @@
+"""
+Spypoint camera snapshot store
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, fields
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from spypointapi import Camera, Coordinates
+from spypointapi.cameras.camera import TransmitTime
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+_CAMERA_FIELDS = frozenset(field.name for field in fields(Camera))
+_DATETIME_FIELDS = ('last_update_time', 'activation_date', 'creation_date')
+_DATACLASS_FIELDS = {'coordinates': Coordinates, 'transmit_time': TransmitTime}
+
+
+class SpypointSnapshotStore:
+    """Persists the last good cameras of an entry so setup can start from them."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[list[dict[str, Any]]] = Store(hass, STORAGE_VERSION, f'{DOMAIN}.{entry_id}.cameras')
+
+    async def async_load(self) -> dict[str, Camera] | None:
+        snapshot = await self._store.async_load()
+        if not snapshot:
+            return None
+        cameras = [camera_from_dict(camera) for camera in snapshot]
+        return {camera.id: camera for camera in cameras}
+
+    @callback
+    def async_save(self, cameras: dict[str, Camera]) -> None:
+        self._store.async_delay_save(lambda: [camera_to_dict(camera) for camera in cameras.values()], SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+
+def camera_to_dict(camera: Camera) -> dict[str, Any]:
+    data = asdict(camera)
+    for name in _DATETIME_FIELDS:
+        if data[name] is not None:
+            data[name] = data[name].isoformat()
+    return data
+
+
+def camera_from_dict(data: dict[str, Any]) -> Camera:
+    data = {key: value for key, value in data.items() if key in _CAMERA_FIELDS}
+    for name in _DATETIME_FIELDS:
+        if data.get(name) is not None:
+            data[name] = datetime.fromisoformat(data[name])
+    for name, dataclass in _DATACLASS_FIELDS.items():
+        if data.get(name) is not None:
+            data[name] = dataclass(**data[name])
+    return Camera(**data)
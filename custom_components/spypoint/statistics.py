@@ -0,0 +1,147 @@
+"""
+Spypoint camera telemetry long-term statistics
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from statistics import fmean
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMeanType, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import PERCENTAGE, UnitOfTemperature
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+from spypointapi import Camera
+
+from .const import DOMAIN, LOGGER, MANUFACTURER
+from .coordinator import SpypointCoordinator
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+HOUR = 3600
+# check-ins are reported after they happen, an hour is imported once late reports had time to arrive
+IMPORT_DELAY = timedelta(minutes=10)
+
+# camera field: statistic name, unit, unit class
+TELEMETRY: dict[str, tuple[str, str, str | None]] = {
+    'battery': ('Battery Level', PERCENTAGE, None),
+    'temperature': ('Temperature', UnitOfTemperature.CELSIUS, 'temperature'),
+    'signal': ('Cellular Signal Strength', PERCENTAGE, None),
+    'memory': ('SD Card Usage', PERCENTAGE, None),
+}
+
+
+class SpypointSampleStore:
+    """Persists the telemetry samples of an entry that are not imported yet."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f'{DOMAIN}.{entry_id}.samples')
+
+    async def async_load(self) -> dict[str, Any] | None:
+        return await self._store.async_load()
+
+    @callback
+    def async_save(self, imported_until: float, samples: dict[str, list[list[Any]]]) -> None:
+        self._store.async_delay_save(lambda: {'imported_until': imported_until, 'samples': samples}, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+
+class SpypointStatisticsImporter:
+    """Imports camera telemetry as hourly long-term statistics.
+
+    Each check-in is kept as a sample until its hour is over, then all the hours
+    that ended are imported in one batch per statistic as mean, min and max.
+    Samples are persisted, so hours that ended while Home Assistant was down are
+    imported at the next start.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: SpypointCoordinator, store: SpypointSampleStore) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._store = store
+        self._imported_until = 0.0
+        # camera id: [timestamp, *telemetry values] ordered by timestamp
+        self._samples: dict[str, list[list[Any]]] = {}
+
+    async def async_load(self) -> None:
+        if data := await self._store.async_load():
+            self._imported_until = data['imported_until']
+            self._samples = data['samples']
+        self.async_update()
+
+    @callback
+    def async_update(self) -> None:
+        added = False
+        for camera_id, fields in self._coordinator.changes.items():
+            if 'last_update_time' in fields and (camera := self._coordinator.data.get(camera_id)) is not None:
+                added |= self._add(camera)
+
+        if self._async_import() or added:
+            self._store.async_save(self._imported_until, self._samples)
+
+    def _add(self, camera: Camera) -> bool:
+        if camera.last_update_time is None:
+            return False
+        timestamp = camera.last_update_time.timestamp()
+        samples = self._samples.setdefault(camera.id, [])
+        # hours already imported are not rewritten with a partial set of samples
+        if timestamp < self._imported_until or (samples and timestamp <= samples[-1][0]):
+            return False
+        samples.append([timestamp, *(getattr(camera, field) for field in TELEMETRY)])
+        return True
+
+    def _async_import(self) -> bool:
+        until = (dt_util.utcnow() - IMPORT_DELAY).timestamp() // HOUR * HOUR
+        if until <= self._imported_until or 'recorder' not in self._hass.config.components:
+            return False
+
+        for camera_id, samples in self._samples.items():
+            due = 0
+            while due < len(samples) and samples[due][0] < until:
+                due += 1
+            if not due:
+                continue
+
+            for index, field in enumerate(TELEMETRY, start=1):
+                if statistics := _hourly(samples[:due], index):
+                    async_add_external_statistics(self._hass, self._metadata(camera_id, field), statistics)
+            LOGGER.debug('Imported %d samples of camera %s', due, camera_id)
+            del samples[:due]
+
+        self._samples = {camera_id: samples for camera_id, samples in self._samples.items() if samples}
+        self._imported_until = until
+        return True
+
+    def _metadata(self, camera_id: str, field: str) -> StatisticMetaData:
+        name, unit, unit_class = TELEMETRY[field]
+        camera_name = self._coordinator.account_cameras.get(camera_id, camera_id)
+        return StatisticMetaData(
+            mean_type=StatisticMeanType.ARITHMETIC,
+            has_sum=False,
+            name=f'{MANUFACTURER} {camera_name} {name}',
+            source=DOMAIN,
+            statistic_id=statistic_id(camera_id, field),
+            unit_class=unit_class,
+            unit_of_measurement=unit,
+        )
+
+
+def statistic_id(camera_id: str, field: str) -> str:
+    return f'{DOMAIN}:{slugify(camera_id)}_{field}'
+
+
+def _hourly(samples: list[list[Any]], index: int) -> list[StatisticData]:
+    hours: dict[float, list[float]] = {}
+    for sample in samples:
+        if sample[index] is not None:
+            hours.setdefault(sample[0] // HOUR * HOUR, []).append(sample[index])
+
+    return [
+        StatisticData(start=dt_util.utc_from_timestamp(hour), mean=fmean(values), min=min(values), max=max(values))
+        for hour, values in hours.items()
+    ]
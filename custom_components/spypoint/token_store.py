@@ -0,0 +1,69 @@
+"""
+Spypoint access token store
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from spypointapi import SpypointApi
+
+from .const import DOMAIN, DATA_SHARED
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f'{DOMAIN}.tokens'
+SAVE_DELAY = 10
+
+DATA_TOKEN_STORE = 'token_store'
+
+
+@callback
+def async_get_token_store(hass: HomeAssistant) -> SpypointTokenStore:
+    shared = hass.data.setdefault(DATA_SHARED, {})
+    if DATA_TOKEN_STORE not in shared:
+        shared[DATA_TOKEN_STORE] = SpypointTokenStore(hass)
+    return shared[DATA_TOKEN_STORE]
+
+
+class SpypointTokenStore:
+    """Keeps the access token of each account so a restart does not need to log in again."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store[dict[str, dict[str, Any]]] = Store(hass, STORAGE_VERSION, STORAGE_KEY, private=True)
+        self._tokens: dict[str, dict[str, Any]] | None = None
+
+    async def _async_load(self) -> dict[str, dict[str, Any]]:
+        if self._tokens is None:
+            self._tokens = await self._store.async_load() or {}
+        return self._tokens
+
+    async def async_restore(self, api: SpypointApi) -> bool:
+        tokens = await self._async_load()
+        token = tokens.get(api.username)
+        if token is None or datetime.now().timestamp() >= token['expires_at']:
+            return False
+
+        api.headers['Authorization'] = token['authorization']
+        api.expires_at = datetime.fromtimestamp(token['expires_at'])
+        return True
+
+    async def async_save(self, api: SpypointApi) -> None:
+        tokens = await self._async_load()
+
+        authorization = api.headers.get('Authorization')
+        if authorization is None:
+            return
+
+        token = {'authorization': authorization, 'expires_at': api.expires_at.timestamp()}
+        if tokens.get(api.username) == token:
+            return
+
+        tokens[api.username] = token
+        self._store.async_delay_save(lambda: tokens, SAVE_DELAY)
+
+    async def async_remove(self, username: str) -> None:
+        tokens = await self._async_load()
+        if tokens.pop(username, None) is not None:
+            self._store.async_delay_save(lambda: tokens, SAVE_DELAY)
@@ -0,0 +1,156 @@
+"""
+Local stand-in of the Spypoint cloud for tests
+
+Serves the login endpoint and replays fixture responses of the other endpoints
+over real HTTP, so SpypointApi runs on an actual aiohttp session. Faults can be
+injected per request: latency, error statuses, rejected tokens and truncated bodies.
+
+The fixtures in the repository are written by hand in the shape of the cloud
+responses and scrubbed like recordings. Record fixtures from a real account with:
+
+    python -m test.spypoint_cloud <username> <password>
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import jwt
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+from spypointapi import SpypointApi
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'spypoint'
+API_PATH = '/api/v3'
+USERNAME = 'user@example.com'
+PASSWORD = 'password'
+
+
+@dataclass
+class Fault:
+    # only requests to this endpoint, like 'camera/all', are affected when set
+    endpoint: str | None = None
+    latency: float = 0
+    status: int | None = None
+    truncate: bool = False
+
+
+class SpypointCloud:
+    """Spypoint cloud served from fixture files on a local test server."""
+
+    def __init__(self, fixtures: Path = FIXTURES, username: str = USERNAME, password: str = PASSWORD) -> None:
+        self.fixtures = fixtures
+        self.username = username
+        self.password = password
+        self.requests: list[str] = []
+        self._faults: list[Fault] = []
+        self._tokens: set[str] = set()
+
+        app = web.Application(middlewares=[self._inject_faults])
+        app.router.add_post(f'{API_PATH}/user/login', self._login)
+        app.router.add_route('*', f'{API_PATH}/{{endpoint:.+}}', self._replay)
+        self._server = TestServer(app)
+
+    async def __aenter__(self) -> SpypointCloud:
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self._server.close()
+
+    @property
+    def base_url(self) -> str:
+        return str(self._server.make_url(API_PATH))
+
+    def api(self, session: ClientSession, password: str | None = None) -> SpypointApi:
+        api = SpypointApi(self.username, password or self.password, session)
+        api.base_url = self.base_url
+        return api
+
+    def inject(self, fault: Fault, times: int = 1) -> None:
+        self._faults.extend([fault] * times)
+
+    def expire_tokens(self) -> None:
+        self._tokens.clear()
+
+    def count(self, endpoint: str) -> int:
+        return self.requests.count(endpoint)
+
+    @web.middleware
+    async def _inject_faults(self, request: web.Request, handler) -> web.StreamResponse:
+        endpoint = request.path.removeprefix(f'{API_PATH}/')
+        self.requests.append(endpoint)
+        fault = next((fault for fault in self._faults if fault.endpoint in (None, endpoint)), None)
+        if fault is None:
+            return await handler(request)
+
+        self._faults.remove(fault)
+        if fault.latency:
+            await asyncio.sleep(fault.latency)
+        if fault.status is not None:
+            return web.json_response({'error': 'injected'}, status=fault.status)
+
+        response = await handler(request)
+        if fault.truncate:
+            return web.Response(body=response.body[:len(response.body) // 2], status=response.status,
+                                content_type='application/json')
+        return response
+
+    async def _login(self, request: web.Request) -> web.Response:
+        credentials = await request.json()
+        if (credentials.get('username'), credentials.get('password')) != (self.username, self.password):
+            return web.json_response({'error': 'invalid credentials'}, status=401)
+
+        token = jwt.encode({'sub': self.username, 'exp': int(time.time()) + 3600, 'jti': len(self.requests)}, 'spypoint-cloud-stand-in-signing-key')
+        self._tokens.add(token)
+        return web.json_response({'token': token})
+
+    async def _replay(self, request: web.Request) -> web.Response:
+        if request.headers.get('Authorization', '').removeprefix('Bearer ') not in self._tokens:
+            return web.json_response({'error': 'unauthorized'}, status=401)
+
+        fixture = self.fixtures / fixture_name(request.match_info['endpoint'])
+        if not fixture.exists():
+            return web.json_response({'error': 'not found'}, status=404)
+        return web.Response(body=fixture.read_bytes(), content_type='application/json')
+
+
+def fixture_name(endpoint: str) -> str:
+    return endpoint.replace('/', '_') + '.json'
+
+
+async def async_record(username: str, password: str, fixtures: Path = FIXTURES) -> None:
+    """Records the camera endpoints of a real account, without owner names and camera positions."""
+    async with ClientSession() as session:
+        api = SpypointApi(username, password, session)
+        await api.async_authenticate()
+
+        async def record(endpoint: str) -> Any:
+            async with session.get(f'{api.base_url}/{endpoint}', headers=api.headers) as response:
+                response.raise_for_status()
+                body = _scrub(await response.json())
+            (fixtures / fixture_name(endpoint)).write_text(json.dumps(body, indent=2) + '\n')
+            return body
+
+        await record('camera/all')
+        shared = await record('shared-cameras/all')
+        for camera in (shared[0].get('sharedCameras', []) if shared else []):
+            await record(f'shared-cameras/{camera["cameraId"]}')
+
+
+def _scrub(body: Any) -> Any:
+    if isinstance(body, list):
+        return [_scrub(item) for item in body]
+    if isinstance(body, dict):
+        return {key: 'Owner' if key == 'ownerFirstName' else [] if key == 'coordinates' else _scrub(value)
+                for key, value in body.items()}
+    return body
+
+
+if __name__ == '__main__':
+    asyncio.run(async_record(*sys.argv[1:3]))
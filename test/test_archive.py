@@ -0,0 +1,206 @@
+import asyncio
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import TestCase, IsolatedAsyncioTestCase
+from unittest.mock import Mock, AsyncMock, MagicMock
+
+from aiohttp import ClientError
+from homeassistant.core import HomeAssistant
+
+from custom_components.spypoint import SpypointCoordinator
+from custom_components.spypoint.archive import SpypointArchive, SpypointPhotoArchiver, ArchiveCheckpoint, PAGE_SIZE
+from custom_components.spypoint.photos import Photo
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def photo(id, date, camera_id='camera'):
+    return Photo(id=id, camera_id=camera_id, date=date, urls={'large': f'https://cdn/{id}.jpg'})
+
+
+def archive_in_temporary_directory(test):
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    archive = SpypointArchive(Path(directory.name))
+    archive.open()
+    test.addCleanup(archive.close)
+    return archive
+
+
+def store(archive, photo, content):
+    file = archive.create_file(photo.id)
+    file.write(content)
+    archive.store(file, photo)
+
+
+class TestSpypointArchive(TestCase):
+
+    def setUp(self):
+        self.archive = archive_in_temporary_directory(self)
+
+    def test_stores_photo_by_camera_and_day(self):
+        store(self.archive, photo('1', NOW), b'photo')
+
+        files = list(self.archive.directory.rglob('*.jpg'))
+        self.assertEqual([path.relative_to(self.archive.directory).parts[0] for path in files], ['camera'])
+        self.assertEqual(files[0].read_bytes(), b'photo')
+        self.assertEqual(self.archive.archived(['1', '2']), {'1'})
+        self.assertEqual(self.archive.size, 5)
+
+    def test_deduplicates_photos_by_content(self):
+        store(self.archive, photo('1', NOW), b'photo')
+        store(self.archive, photo('2', NOW, camera_id='other'), b'photo')
+
+        self.assertEqual(len(list(self.archive.directory.rglob('*.jpg'))), 1)
+        self.assertEqual(self.archive.archived(['1', '2']), {'1', '2'})
+        self.assertEqual(self.archive.size, 5)
+
+    def test_evicts_oldest_photos_down_to_quota(self):
+        store(self.archive, photo('old', NOW - timedelta(days=1)), b'old photo')
+        store(self.archive, photo('new', NOW), b'new photo')
+
+        evicted = self.archive.evict(quota=10)
+
+        self.assertEqual(evicted, {'old'})
+        self.assertEqual([path.name for path in self.archive.directory.rglob('*.jpg')], ['new.jpg'])
+        self.assertEqual(self.archive.size, 9)
+        # evicted photos are not downloaded again
+        self.assertEqual(self.archive.archived(['old']), {'old'})
+
+    def test_saves_checkpoints(self):
+        self.assertEqual(self.archive.checkpoint('camera'), ArchiveCheckpoint())
+
+        self.archive.save_checkpoint('camera', ArchiveCheckpoint(NOW, NOW - timedelta(days=1), True))
+
+        self.assertEqual(self.archive.checkpoint('camera'), ArchiveCheckpoint(NOW, NOW - timedelta(days=1), True))
+
+    def test_resumes_with_its_size_and_without_partial_files(self):
+        store(self.archive, photo('1', NOW), b'photo')
+        self.archive.create_file('2').close()
+        self.archive.close()
+
+        self.archive.open()
+
+        self.assertEqual(self.archive.size, 5)
+        self.assertEqual(list(self.archive.directory.rglob('*.part')), [])
+
+
+class TestSpypointPhotoArchiver(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.archive = archive_in_temporary_directory(self)
+        hass = Mock(HomeAssistant)
+        hass.async_add_executor_job = AsyncMock(side_effect=lambda target, *args: target(*args))
+        self.hass = hass
+        self.coordinator = Mock(SpypointCoordinator)
+        self.coordinator.data = {'camera': Mock()}
+        self.coordinator.changes = {}
+        self.coordinator.archive_quota = 1024 * 1024
+        self.coordinator.config_entry = Mock()
+        self.coordinator.photos = Mock()
+        self.session = Mock()
+        self.session.get = Mock(side_effect=lambda url: self.response(url))
+        self.failing = set()
+        self.archiver = SpypointPhotoArchiver(hass, self.coordinator, self.archive, self.session)
+        self.archiver._opened = True
+
+    def response(self, url):
+        async def iter_chunked(_):
+            yield url.encode()
+            yield b'-content'
+
+        response = MagicMock()
+        response.raise_for_status = Mock(side_effect=ClientError('not found') if url in self.failing else None)
+        response.content.iter_chunked = iter_chunked
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=response)
+        context.__aexit__ = AsyncMock(return_value=False)
+        return context
+
+    async def run_archiver(self):
+        self.archiver.async_schedule()
+        self.coordinator.config_entry.async_create_background_task.call_args.args[1].close()
+        await self.archiver._async_run()
+
+    async def test_archives_history_of_every_camera_page_by_page(self):
+        history = [photo(str(i), NOW - timedelta(minutes=i)) for i in range(PAGE_SIZE + 1)]
+        self.coordinator.photos.async_get_photos = AsyncMock(side_effect=[history[:PAGE_SIZE], history[PAGE_SIZE:]])
+
+        await self.run_archiver()
+
+        self.assertEqual(len(self.archive.archived([p.id for p in history])), PAGE_SIZE + 1)
+        self.assertEqual(self.coordinator.photos.async_get_photos.call_args.kwargs['date_end'], history[PAGE_SIZE - 1].date)
+        self.assertEqual(self.archive.checkpoint('camera'), ArchiveCheckpoint(NOW, history[-1].date, True))
+
+    async def test_does_nothing_without_quota(self):
+        self.coordinator.archive_quota = 0
+
+        self.archiver.async_schedule()
+
+        self.coordinator.config_entry.async_create_background_task.assert_not_called()
+
+    async def test_keeps_checkpoint_of_failed_page(self):
+        self.failing.add('https://cdn/1.jpg')
+        self.coordinator.photos.async_get_photos = AsyncMock(return_value=[photo('0', NOW), photo('1', NOW - timedelta(minutes=1))])
+
+        await self.run_archiver()
+
+        self.assertEqual(self.archive.archived(['0', '1']), {'0'})
+        self.assertEqual(self.archive.checkpoint('camera'), ArchiveCheckpoint())
+        self.assertEqual(list(self.archive.directory.rglob('*.part')), [])
+
+    async def test_resumes_history_from_checkpoint(self):
+        self.archive.save_checkpoint('camera', ArchiveCheckpoint(NOW, NOW - timedelta(days=1)))
+        self.coordinator.photos.async_get_photos = AsyncMock(side_effect=[[], [photo('old', NOW - timedelta(days=2))]])
+
+        await self.run_archiver()
+
+        self.assertEqual(self.coordinator.photos.async_get_photos.call_args.kwargs['date_end'], NOW - timedelta(days=1))
+        self.assertEqual(self.archive.archived(['old']), {'old'})
+        self.assertTrue(self.archive.checkpoint('camera').complete)
+
+    async def test_archives_photos_taken_since_checkpoint_of_cameras_that_checked_in(self):
+        self.archive.save_checkpoint('camera', ArchiveCheckpoint(NOW, NOW, True))
+        self.archiver._started = True
+        self.coordinator.changes = {'camera': frozenset({'last_update_time'})}
+        self.coordinator.photos.async_get_photos = AsyncMock(return_value=[photo('new', NOW + timedelta(hours=1)), photo('old', NOW)])
+
+        await self.run_archiver()
+
+        self.assertEqual(self.archive.archived(['new', 'old']), {'new'})
+        self.assertEqual(self.archive.checkpoint('camera').newest, NOW + timedelta(hours=1))
+
+    async def test_stops_history_at_quota(self):
+        self.coordinator.archive_quota = len(b'https://cdn/0.jpg-content')
+        history = [photo(str(i), NOW - timedelta(minutes=i)) for i in range(PAGE_SIZE)]
+        self.coordinator.photos.async_get_photos = AsyncMock(return_value=history)
+
+        await self.run_archiver()
+
+        self.coordinator.photos.async_get_photos.assert_called_once()
+        self.assertEqual([path.name for path in self.archive.directory.rglob('*.jpg')], ['0.jpg'])
+        self.assertTrue(self.archive.checkpoint('camera').complete)
+
+    async def test_malformed_listing_interrupts_the_run(self):
+        self.coordinator.photos.async_get_photos = AsyncMock(side_effect=KeyError('id'))
+
+        await self.run_archiver()
+
+        self.assertEqual(self.archive.checkpoint('camera'), ArchiveCheckpoint())
+        self.assertFalse(self.archiver._running)
+
+    async def test_closes_the_archive_once_the_run_is_cancelled(self):
+        async def async_get_photos(*args, **kwargs):
+            await asyncio.Event().wait()
+
+        self.coordinator.photos.async_get_photos = async_get_photos
+        self.coordinator.config_entry.async_create_background_task = Mock(side_effect=lambda hass, target, name: asyncio.create_task(target))
+        self.archiver.async_schedule()
+        await asyncio.sleep(0)
+
+        await self.archiver.async_close()
+
+        self.assertTrue(self.archiver._task.cancelled())
+        self.assertFalse(self.archiver._running)
+        self.assertIsNone(self.archive._connection)
@@ -1,12 +1,17 @@
+from datetime import datetime
 from unittest import IsolatedAsyncioTestCase
-from unittest.mock import patch, AsyncMock, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock, Mock
 
 from aiohttp import ClientSession
 from homeassistant.config_entries import ConfigEntry, ConfigEntries, ConfigEntryState
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from spypointapi import Camera, SpypointApiInvalidCredentialsError
 
-from custom_components.spypoint import async_setup_entry, PLATFORMS, DOMAIN, SpypointCoordinator
+from custom_components.spypoint import async_setup_entry, async_update_options, async_remove_entry, PLATFORMS, DOMAIN, SpypointCoordinator
+from custom_components.spypoint.const import CONF_EXCLUDED_CAMERAS, CONF_SLOW_CAMERAS
+from custom_components.spypoint.orchestrator import async_get_orchestrator
 
 
 # https://developers.home-assistant.io/docs/config_entries_index/#setting-up-an-entry
@@ -15,9 +20,17 @@ class AsyncSetupEntryTest(IsolatedAsyncioTestCase):
 
     @patch('custom_components.spypoint.SpypointApi')
     @patch('custom_components.spypoint.async_get_clientsession')
-    async def test_creates_api_with_user_credentials(self, async_get_clientsession_constructor, api_constructor):
+    @patch('custom_components.spypoint.async_get_token_store')
+    @patch('custom_components.spypoint.SpypointSnapshotStore')
+    @patch('custom_components.spypoint.SpypointSampleStore')
+    @patch('custom_components.spypoint.SpypointEventStore')
+    async def test_creates_api_with_user_credentials(self, event_store_constructor, sample_store_constructor, snapshot_store_constructor, async_get_token_store, async_get_clientsession_constructor, api_constructor):
         self.spypoint_api_mock(api_constructor)
         async_get_clientsession = self.async_get_client_session_mock(async_get_clientsession_constructor)
+        self.token_store_mock(async_get_token_store)
+        self.snapshot_store_mock(snapshot_store_constructor)
+        self.sample_store_mock(sample_store_constructor)
+        self.event_store_mock(event_store_constructor)
         hass = self.hass_mock()
         entry = self.entry_mock(username='username', password='password')
 
@@ -27,9 +40,17 @@ class AsyncSetupEntryTest(IsolatedAsyncioTestCase):
 
     @patch('custom_components.spypoint.SpypointApi')
     @patch('custom_components.spypoint.async_get_clientsession')
-    async def test_forwards_entries(self, async_get_clientsession_constructor, api_constructor):
+    @patch('custom_components.spypoint.async_get_token_store')
+    @patch('custom_components.spypoint.SpypointSnapshotStore')
+    @patch('custom_components.spypoint.SpypointSampleStore')
+    @patch('custom_components.spypoint.SpypointEventStore')
+    async def test_forwards_entries(self, event_store_constructor, sample_store_constructor, snapshot_store_constructor, async_get_token_store, async_get_clientsession_constructor, api_constructor):
         self.spypoint_api_mock(api_constructor)
         self.async_get_client_session_mock(async_get_clientsession_constructor)
+        self.token_store_mock(async_get_token_store)
+        self.snapshot_store_mock(snapshot_store_constructor)
+        self.sample_store_mock(sample_store_constructor)
+        self.event_store_mock(event_store_constructor)
         hass = self.hass_mock()
         entry = self.entry_mock()
 
@@ -39,9 +60,17 @@ class AsyncSetupEntryTest(IsolatedAsyncioTestCase):
 
     @patch('custom_components.spypoint.SpypointApi')
     @patch('custom_components.spypoint.async_get_clientsession')
-    async def test_starts_the_coordinator(self, async_get_clientsession_constructor, api_constructor):
+    @patch('custom_components.spypoint.async_get_token_store')
+    @patch('custom_components.spypoint.SpypointSnapshotStore')
+    @patch('custom_components.spypoint.SpypointSampleStore')
+    @patch('custom_components.spypoint.SpypointEventStore')
+    async def test_starts_the_coordinator(self, event_store_constructor, sample_store_constructor, snapshot_store_constructor, async_get_token_store, async_get_clientsession_constructor, api_constructor):
         api = self.spypoint_api_mock(api_constructor)
         self.async_get_client_session_mock(async_get_clientsession_constructor)
+        self.token_store_mock(async_get_token_store)
+        self.snapshot_store_mock(snapshot_store_constructor)
+        self.sample_store_mock(sample_store_constructor)
+        self.event_store_mock(event_store_constructor)
         hass = self.hass_mock()
         entry = self.entry_mock(id='entry')
 
@@ -52,15 +81,177 @@ class AsyncSetupEntryTest(IsolatedAsyncioTestCase):
 
     @patch('custom_components.spypoint.SpypointApi')
     @patch('custom_components.spypoint.async_get_clientsession')
-    async def test_returns_true(self, async_get_clientsession_constructor, api_constructor):
+    @patch('custom_components.spypoint.async_get_token_store')
+    @patch('custom_components.spypoint.SpypointSnapshotStore')
+    @patch('custom_components.spypoint.SpypointSampleStore')
+    @patch('custom_components.spypoint.SpypointEventStore')
+    async def test_returns_true(self, event_store_constructor, sample_store_constructor, snapshot_store_constructor, async_get_token_store, async_get_clientsession_constructor, api_constructor):
         self.spypoint_api_mock(api_constructor)
         self.async_get_client_session_mock(async_get_clientsession_constructor)
+        self.token_store_mock(async_get_token_store)
+        self.snapshot_store_mock(snapshot_store_constructor)
+        self.sample_store_mock(sample_store_constructor)
+        self.event_store_mock(event_store_constructor)
         hass = self.hass_mock()
         entry = self.entry_mock()
 
         result = await async_setup_entry(hass=hass, entry=entry)
         self.assertTrue(result)
 
+    @patch('custom_components.spypoint.SpypointApi')
+    @patch('custom_components.spypoint.async_get_clientsession')
+    @patch('custom_components.spypoint.async_get_token_store')
+    @patch('custom_components.spypoint.SpypointSnapshotStore')
+    @patch('custom_components.spypoint.SpypointSampleStore')
+    @patch('custom_components.spypoint.SpypointEventStore')
+    async def test_restores_saved_access_token(self, event_store_constructor, sample_store_constructor, snapshot_store_constructor, async_get_token_store, async_get_clientsession_constructor, api_constructor):
+        api = self.spypoint_api_mock(api_constructor)
+        self.async_get_client_session_mock(async_get_clientsession_constructor)
+        token_store = self.token_store_mock(async_get_token_store)
+        self.snapshot_store_mock(snapshot_store_constructor)
+        self.sample_store_mock(sample_store_constructor)
+        self.event_store_mock(event_store_constructor)
+        hass = self.hass_mock()
+        entry = self.entry_mock(id='entry')
+
+        await async_setup_entry(hass=hass, entry=entry)
+
+        token_store.async_restore.assert_called_once_with(api)
+        self.assertIs(hass.data[DOMAIN]['entry'].token_store, token_store)
+
+    @patch('custom_components.spypoint.SpypointApi')
+    @patch('custom_components.spypoint.async_get_clientsession')
+    @patch('custom_components.spypoint.async_get_token_store')
+    @patch('custom_components.spypoint.SpypointSnapshotStore')
+    @patch('custom_components.spypoint.SpypointSampleStore')
+    @patch('custom_components.spypoint.SpypointEventStore')
+    async def test_warm_starts_from_snapshot(self, event_store_constructor, sample_store_constructor, snapshot_store_constructor, async_get_token_store, async_get_clientsession_constructor, api_constructor):
+        api = self.spypoint_api_mock(api_constructor)
+        self.async_get_client_session_mock(async_get_clientsession_constructor)
+        self.token_store_mock(async_get_token_store)
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone())
+        self.snapshot_store_mock(snapshot_store_constructor, cameras={'123': camera})
+        self.sample_store_mock(sample_store_constructor)
+        self.event_store_mock(event_store_constructor)
+        hass = self.hass_mock()
+        entry = self.entry_mock(id='entry')
+
+        await async_setup_entry(hass=hass, entry=entry)
+
+        coordinator = hass.data[DOMAIN]['entry']
+        self.assertEqual(coordinator.data, {'123': camera})
+        self.assertTrue(coordinator.stale)
+        api.async_get_cameras.assert_not_called()
+        hass.config_entries.async_forward_entry_setups.assert_called_once_with(entry, PLATFORMS)
+        entry.async_create_background_task.assert_called_once()
+        entry.async_create_background_task.call_args.args[1].close()
+
+    @patch('custom_components.spypoint.SpypointApi')
+    @patch('custom_components.spypoint.async_get_clientsession')
+    @patch('custom_components.spypoint.async_get_token_store')
+    @patch('custom_components.spypoint.SpypointSnapshotStore')
+    @patch('custom_components.spypoint.SpypointSampleStore')
+    @patch('custom_components.spypoint.SpypointEventStore')
+    async def test_applies_camera_options(self, event_store_constructor, sample_store_constructor, snapshot_store_constructor, async_get_token_store, async_get_clientsession_constructor, api_constructor):
+        self.spypoint_api_mock(api_constructor)
+        self.async_get_client_session_mock(async_get_clientsession_constructor)
+        self.token_store_mock(async_get_token_store)
+        self.snapshot_store_mock(snapshot_store_constructor)
+        self.sample_store_mock(sample_store_constructor)
+        self.event_store_mock(event_store_constructor)
+        hass = self.hass_mock()
+        entry = self.entry_mock(id='entry', options={CONF_EXCLUDED_CAMERAS: ['1'], CONF_SLOW_CAMERAS: ['2']})
+
+        await async_setup_entry(hass=hass, entry=entry)
+
+        coordinator = hass.data[DOMAIN]['entry']
+        self.assertEqual(coordinator.excluded_cameras, {'1'})
+        self.assertEqual(coordinator.slow_cameras, {'2'})
+        entry.add_update_listener.assert_called_once_with(async_update_options)
+
+    @patch('custom_components.spypoint.SpypointApi')
+    @patch('custom_components.spypoint.async_get_clientsession')
+    @patch('custom_components.spypoint.async_get_token_store')
+    @patch('custom_components.spypoint.SpypointSnapshotStore')
+    @patch('custom_components.spypoint.SpypointSampleStore')
+    @patch('custom_components.spypoint.SpypointEventStore')
+    async def test_leaves_nothing_behind_when_first_refresh_fails(self, event_store_constructor, sample_store_constructor, snapshot_store_constructor, async_get_token_store, async_get_clientsession_constructor, api_constructor):
+        api = self.spypoint_api_mock(api_constructor)
+        api.async_get_cameras.side_effect = SpypointApiInvalidCredentialsError(Mock())
+        self.async_get_client_session_mock(async_get_clientsession_constructor)
+        self.token_store_mock(async_get_token_store)
+        self.snapshot_store_mock(snapshot_store_constructor)
+        self.sample_store_mock(sample_store_constructor)
+        self.event_store_mock(event_store_constructor)
+        hass = self.hass_mock()
+        entry = self.entry_mock(id='entry')
+
+        with self.assertRaises(ConfigEntryAuthFailed):
+            await async_setup_entry(hass=hass, entry=entry)
+
+        self.assertNotIn('entry', hass.data[DOMAIN])
+        self.assertEqual(async_get_orchestrator(hass).entries, 0)
+        hass.config_entries.async_forward_entry_setups.assert_not_called()
+
+    @patch('custom_components.spypoint.async_get_token_store')
+    @patch('custom_components.spypoint.SpypointSnapshotStore')
+    @patch('custom_components.spypoint.SpypointSampleStore')
+    @patch('custom_components.spypoint.SpypointEventStore')
+    async def test_removes_stored_data_of_removed_entry(self, event_store_constructor, sample_store_constructor, snapshot_store_constructor, async_get_token_store):
+        stores = [self.snapshot_store_mock(snapshot_store_constructor), self.sample_store_mock(sample_store_constructor),
+                  self.event_store_mock(event_store_constructor)]
+        for store in stores:
+            store.async_remove = AsyncMock()
+        token_store = self.token_store_mock(async_get_token_store)
+        entry = self.entry_mock(username='username', id='entry')
+
+        await async_remove_entry(self.hass_mock(), entry)
+
+        for store in stores:
+            store.async_remove.assert_called_once()
+        token_store.async_remove.assert_called_once_with('username')
+
+    async def test_refreshes_only_when_options_changed(self):
+        coordinator = Mock(SpypointCoordinator)
+        coordinator.set_options.side_effect = [True, False]
+        coordinator.async_request_refresh = AsyncMock()
+        hass = self.hass_mock()
+        hass.data = {DOMAIN: {'entry': coordinator}}
+        entry = self.entry_mock(id='entry', options={CONF_SLOW_CAMERAS: ['2']})
+
+        await async_update_options(hass, entry)
+        await async_update_options(hass, entry)
+
+        coordinator.async_request_refresh.assert_called_once()
+
+    @staticmethod
+    def event_store_mock(event_store_constructor):
+        event_store = MagicMock()
+        event_store_constructor.return_value = event_store
+        event_store.async_load = AsyncMock(return_value=None)
+        return event_store
+
+    @staticmethod
+    def sample_store_mock(sample_store_constructor):
+        sample_store = MagicMock()
+        sample_store_constructor.return_value = sample_store
+        sample_store.async_load = AsyncMock(return_value=None)
+        return sample_store
+
+    @staticmethod
+    def snapshot_store_mock(snapshot_store_constructor, cameras=None):
+        snapshot_store = MagicMock()
+        snapshot_store_constructor.return_value = snapshot_store
+        snapshot_store.async_load = AsyncMock(return_value=cameras)
+        return snapshot_store
+
+    @staticmethod
+    def token_store_mock(async_get_token_store):
+        token_store = AsyncMock()
+        async_get_token_store.return_value = token_store
+        return token_store
+
     @staticmethod
     def async_get_client_session_mock(async_get_clientsession_constructor):
         async_get_clientsession = MagicMock()
@@ -69,11 +260,14 @@ class AsyncSetupEntryTest(IsolatedAsyncioTestCase):
         return async_get_clientsession
 
     @staticmethod
-    def entry_mock(username='u', password='p', id='e'):
+    def entry_mock(username='u', password='p', id='e', options=None):
         entry = AsyncMock(ConfigEntry)
         entry.entry_id = id
         entry.data = {CONF_USERNAME: username, CONF_PASSWORD: password}
+        entry.options = options or {}
         entry.state = ConfigEntryState.SETUP_IN_PROGRESS
+        # listeners added during setup would otherwise schedule the next poll
+        entry.pref_disable_polling = True
         return entry
 
     @staticmethod
@@ -81,6 +275,9 @@ class AsyncSetupEntryTest(IsolatedAsyncioTestCase):
         hass = AsyncMock(HomeAssistant)
         hass.data = {}
         hass.config_entries = AsyncMock(ConfigEntries)
+        hass.config = Mock()
+        hass.config.components = set()
+        hass.config.path = Mock(side_effect=lambda *parts: '/'.join(('config', *parts)))
         return hass
 
     @staticmethod
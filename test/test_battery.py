@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+from custom_components.spypoint.battery import SpypointBatteryPredictor
+
+START = datetime(2024, 6, 1, 12, 0).astimezone()
+
+
+class TestSpypointBatteryPredictor(TestCase):
+
+    def setUp(self):
+        self.predictor = SpypointBatteryPredictor(window=4)
+
+    def add(self, *levels, start=0):
+        for day, level in enumerate(levels, start=start):
+            self.predictor.add(START + timedelta(days=day), level)
+
+    def test_no_prediction_before_enough_readings(self):
+        self.add(90, 89)
+
+        self.assertIsNone(self.predictor.drain_rate())
+        self.assertIsNone(self.predictor.days_remaining())
+
+    def test_predicts_drain_rate_and_days_remaining(self):
+        self.add(90, 88, 86, 84)
+
+        self.assertAlmostEqual(self.predictor.drain_rate(), 2)
+        self.assertAlmostEqual(self.predictor.days_remaining(), 42)
+
+    def test_forgets_readings_out_of_the_window(self):
+        self.add(90, 89, 88, 87, 84, 81, 78)
+
+        self.assertAlmostEqual(self.predictor.drain_rate(), 3)
+
+    def test_ignores_repeated_readings(self):
+        self.add(90, 88, 86)
+        self.predictor.add(START + timedelta(days=2), 80)
+
+        self.assertAlmostEqual(self.predictor.drain_rate(), 2)
+
+    def test_no_days_remaining_while_charging(self):
+        self.add(80, 82, 84)
+
+        self.assertAlmostEqual(self.predictor.drain_rate(), -2)
+        self.assertIsNone(self.predictor.days_remaining())
+
+    def test_resets_on_battery_swap(self):
+        self.add(30, 28, 26)
+
+        self.add(100, start=3)
+
+        self.assertIsNone(self.predictor.drain_rate())
+        self.assertEqual(self.predictor.level, 100)
@@ -0,0 +1,55 @@
+from datetime import timedelta
+from unittest import TestCase
+
+from custom_components.spypoint.circuit import SpypointCircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class TestSpypointCircuitBreaker(TestCase):
+
+    def setUp(self):
+        self.breaker = SpypointCircuitBreaker(failure_threshold=2, base=timedelta(seconds=60), maximum=timedelta(minutes=5))
+
+    def test_allows_requests_while_closed(self):
+        self.assertTrue(self.breaker.allow_request(now=0))
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_backs_off_exponentially_with_jitter(self):
+        delays = [self.breaker.record_failure(now=0) for _ in range(4)]
+
+        self.assertTrue(timedelta(seconds=30) <= delays[0] <= timedelta(seconds=60))
+        self.assertTrue(timedelta(seconds=60) <= delays[1] <= timedelta(seconds=120))
+        self.assertTrue(timedelta(seconds=120) <= delays[2] <= timedelta(seconds=240))
+        self.assertTrue(timedelta(seconds=150) <= delays[3] <= timedelta(minutes=5))
+
+    def test_opens_after_threshold(self):
+        self.breaker.record_failure(now=0)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        delay = self.breaker.record_failure(now=0)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow_request(now=1))
+        self.assertAlmostEqual(self.breaker.retry_in(now=1), delay - timedelta(seconds=1), delta=timedelta(milliseconds=1))
+
+    def test_half_opens_when_the_delay_is_over(self):
+        self.breaker.record_failure(now=0)
+        self.breaker.record_failure(now=0)
+
+        self.assertTrue(self.breaker.allow_request(now=1000))
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+    def test_failed_probe_opens_again(self):
+        self.breaker.state = HALF_OPEN
+
+        self.breaker.record_failure(now=0)
+
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_success_closes(self):
+        self.breaker.record_failure(now=0)
+        self.breaker.record_failure(now=0)
+
+        self.breaker.record_success()
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.failures, 0)
@@ -1,3 +1,16 @@
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, Mock
+
+from homeassistant.config_entries import ConfigEntries, ConfigEntry, ConfigEntryState
+from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from spypointapi import SpypointApi
+
+from custom_components.spypoint import DOMAIN, SpypointCoordinator
+from custom_components.spypoint.config_flow import SpypointConfigFlow
+
+DATA = {CONF_USERNAME: 'username', CONF_PASSWORD: 'new-password'}
+
 # from http import HTTPStatus
 # from unittest import IsolatedAsyncioTestCase
 # from unittest.mock import AsyncMock, patch, Mock, MagicMock
@@ -119,3 +132,49 @@
 #         async_create_clientsession_constructor.return_value = async_create_clientsession
 #         async_create_clientsession.return_value = AsyncMock(ClientSession)
 #         return async_create_clientsession
+
+
+class ReauthTest(IsolatedAsyncioTestCase):
+
+    async def test_reloads_an_entry_that_failed_to_set_up(self):
+        hass, entry = self.hass_mock(ConfigEntryState.SETUP_ERROR)
+        # a failed setup leaves no coordinator behind
+        hass.data = {DOMAIN: {}}
+        flow = self.reauth_flow(hass, entry)
+
+        await flow._async_reauth_entry(Mock(SpypointApi), DATA)
+
+        hass.config_entries.async_update_entry.assert_called_once_with(entry, data=DATA)
+        hass.config_entries.async_reload.assert_called_once_with('entry')
+
+    async def test_swaps_credentials_of_a_loaded_entry(self):
+        hass, entry = self.hass_mock(ConfigEntryState.LOADED)
+        coordinator = Mock(SpypointCoordinator)
+        hass.data = {DOMAIN: {'entry': coordinator}}
+        flow = self.reauth_flow(hass, entry)
+        api = Mock(SpypointApi)
+
+        await flow._async_reauth_entry(api, DATA)
+
+        coordinator.set_credentials.assert_called_once_with(api)
+        hass.config_entries.async_update_entry.assert_called_once_with(entry, data=DATA)
+        hass.config_entries.async_reload.assert_not_called()
+        entry.async_create_background_task.assert_called_once()
+        entry.async_create_background_task.call_args.args[1].close()
+
+    @staticmethod
+    def hass_mock(state):
+        hass = Mock(HomeAssistant)
+        hass.config_entries = AsyncMock(ConfigEntries)
+        hass.config_entries.async_update_entry = Mock()
+        entry = Mock(ConfigEntry)
+        entry.entry_id = 'entry'
+        entry.state = state
+        return hass, entry
+
+    @staticmethod
+    def reauth_flow(hass, entry):
+        flow = SpypointConfigFlow()
+        flow.hass = hass
+        flow._reauth_entry = entry
+        return flow
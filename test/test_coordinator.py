@@ -1,6 +1,10 @@
-from datetime import timedelta
+import asyncio
+from contextlib import nullcontext
+from dataclasses import replace
+from datetime import timedelta, datetime
+from http import HTTPStatus
 from unittest import IsolatedAsyncioTestCase
-from unittest.mock import Mock, AsyncMock
+from unittest.mock import Mock, AsyncMock, patch
 
 from spypointapi import SpypointApi, Camera, SpypointApiInvalidCredentialsError, SpypointApiError
 from homeassistant.config_entries import ConfigEntry
@@ -8,6 +12,10 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryAuthFailed
 
 from custom_components.spypoint import SpypointCoordinator, DOMAIN
+from custom_components.spypoint.const import CONF_EXCLUDED_CAMERAS, CONF_SLOW_CAMERAS, CONF_TEMPERATURE_DEADBAND, \
+    CONF_SIGNAL_DEADBAND, CONF_MAX_WRITE_INTERVAL, CONF_ARCHIVE_QUOTA
+from custom_components.spypoint.orchestrator import SpypointPollOrchestrator
+from custom_components.spypoint.profiler import SpypointProfiler
 
 
 class TestSpypointCoordinator(IsolatedAsyncioTestCase):
@@ -34,13 +42,188 @@ class TestSpypointCoordinator(IsolatedAsyncioTestCase):
         entry = Mock(ConfigEntry)
         coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
 
-        camera = Mock(Camera)
-        camera.id = '123'
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone())
+        api.async_get_cameras = AsyncMock(return_value=[camera])
+
+        cameras = await coordinator._async_update_data()
+
+        self.assertEqual(cameras, {"123": camera})
+
+    async def test_adapts_refresh_interval_to_camera_check_ins(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+
+        now = datetime.now().astimezone()
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', last_update_time=now - timedelta(hours=2))
+        api.async_get_cameras = AsyncMock(return_value=[camera])
+        await coordinator._async_update_data()
+
+        camera.last_update_time = now - timedelta(hours=1)
+        await coordinator._async_update_data()
+
+        self.assertEqual(coordinator.update_interval, timedelta(minutes=30))
+
+    async def test_tracks_changed_camera_fields(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone(), battery=50)
         api.async_get_cameras = AsyncMock(return_value=[camera])
+        await coordinator._async_update_data()
+
+        api.async_get_cameras = AsyncMock(return_value=[Camera(**{**camera.__dict__, 'battery': 40})])
+        await coordinator._async_update_data()
+
+        self.assertEqual(coordinator.changed_fields('123'), frozenset({'battery'}))
+        self.assertEqual(coordinator.changed_fields('unknown'), frozenset())
+
+    async def test_survives_a_camera_losing_its_last_update(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone())
+        api.async_get_cameras = AsyncMock(return_value=[camera])
+        coordinator.data = await coordinator._async_update_data()
+
+        api.async_get_cameras = AsyncMock(return_value=[replace(camera, last_update_time=None)])
+        await coordinator._async_update_data()
+
+        self.assertEqual(coordinator.changed_fields('123'), frozenset({'last_update_time', 'is_online'}))
+        self.assertIsNone(coordinator.metrics.check_in_lag(50))
+
+    @patch('custom_components.spypoint.coordinator.dr')
+    async def test_detects_added_and_removed_cameras(self, device_registry):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        entry.entry_id = 'entry'
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+        registry = device_registry.async_get.return_value
+        registry.async_get_device.return_value.id = 'device'
+
+        old = Camera(id='1', name='Old', model='model', modem_firmware='modem_firmware',
+                     camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone())
+        new = Camera(id='2', name='New', model='model', modem_firmware='modem_firmware',
+                     camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone())
+        coordinator.data = {'1': old}
+        api.async_get_cameras = AsyncMock(return_value=[new])
+
+        await coordinator._async_update_data()
+
+        self.assertEqual(coordinator.added_cameras, frozenset({'2'}))
+        self.assertEqual(coordinator.removed_cameras, frozenset({'1'}))
+        registry.async_get_device.assert_called_once_with(identifiers={(DOMAIN, '1')})
+        registry.async_update_device.assert_called_once_with('device', remove_config_entry_id='entry')
+
+    @patch('custom_components.spypoint.coordinator.dr')
+    async def test_keeps_fleet_aggregates_of_changed_and_removed_cameras(self, device_registry):
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        entry.entry_id = 'entry'
+        coordinator = SpypointCoordinator(hass=Mock(HomeAssistant), api=api, entry=entry)
+        first = Camera(id='1', name='First', model='model', modem_firmware='modem_firmware',
+                       camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone(), battery=20)
+        second = Camera(id='2', name='Second', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone(), battery=60)
+        api.async_get_cameras = AsyncMock(return_value=[first, second])
+        coordinator.data = await coordinator._async_update_data()
+        self.assertEqual(coordinator.fleet.lowest_battery(), (20, '1'))
+
+        api.async_get_cameras = AsyncMock(return_value=[second])
+        await coordinator._async_update_data()
+
+        self.assertEqual(len(coordinator.fleet), 1)
+        self.assertEqual(coordinator.fleet.lowest_battery(), (60, '2'))
+
+    async def test_saves_access_token_after_refresh(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        api.async_get_cameras = AsyncMock(return_value=[])
+        entry = Mock(ConfigEntry)
+        token_store = AsyncMock()
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry, token_store=token_store)
+
+        await coordinator._async_update_data()
+
+        token_store.async_save.assert_called_once_with(api)
+
+    async def test_authenticates_again_when_access_token_is_rejected(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone())
+        api.async_get_cameras = AsyncMock(side_effect=[SpypointApiError(Mock(status=HTTPStatus.UNAUTHORIZED)), [camera]])
 
         cameras = await coordinator._async_update_data()
 
         self.assertEqual(cameras, {"123": camera})
+        self.assertEqual(api.async_get_cameras.call_count, 2)
+
+    async def test_restores_snapshot_as_stale_data(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        snapshot_store = Mock()
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone(), battery=50)
+        snapshot_store.async_load = AsyncMock(return_value={'123': camera})
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry, snapshot_store=snapshot_store)
+
+        restored = await coordinator.async_restore_snapshot()
+
+        self.assertTrue(restored)
+        self.assertTrue(coordinator.stale)
+        self.assertEqual(coordinator.data, {'123': camera})
+
+        api.async_get_cameras = AsyncMock(return_value=[Camera(**{**camera.__dict__, 'battery': 40})])
+        data = await coordinator._async_update_data()
+
+        self.assertFalse(coordinator.stale)
+        self.assertEqual(coordinator.changed_fields('123'), frozenset({'battery'}))
+        self.assertEqual(data['123'].battery, 40)
+        snapshot_store.async_save.assert_called_once()
+
+    async def test_nothing_restored_without_snapshot(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        snapshot_store = Mock()
+        snapshot_store.async_load = AsyncMock(return_value=None)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry, snapshot_store=snapshot_store)
+
+        restored = await coordinator.async_restore_snapshot()
+
+        self.assertFalse(restored)
+        self.assertFalse(coordinator.stale)
+
+    async def test_fetches_through_the_orchestrator(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        api.async_get_cameras = AsyncMock(return_value=[])
+        entry = Mock(ConfigEntry)
+        entry.entry_id = 'entry'
+        orchestrator = SpypointPollOrchestrator(max_concurrent_fetches=1)
+        orchestrator.register('entry')
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry, orchestrator=orchestrator)
+
+        await coordinator._async_update_data()
+
+        self.assertEqual(orchestrator.queue_depth, 0)
+        self.assertGreaterEqual(coordinator.update_interval, timedelta(seconds=60))
+        self.assertLessEqual(coordinator.update_interval, timedelta(seconds=180))
 
     async def test_triggers_a_reauth_on_invalid_credentials_error(self):
         hass = Mock(HomeAssistant)
@@ -52,6 +235,8 @@ class TestSpypointCoordinator(IsolatedAsyncioTestCase):
 
         with self.assertRaises(ConfigEntryAuthFailed):
             await coordinator._async_update_data()
+        # a reauth is not a failing cloud
+        self.assertEqual(coordinator.metrics.errors, 0)
 
     async def test_raise_on_other_api_error(self):
         hass = Mock(HomeAssistant)
@@ -63,3 +248,221 @@ class TestSpypointCoordinator(IsolatedAsyncioTestCase):
 
         with self.assertRaises(ConnectionError):
             await coordinator._async_update_data()
+
+    async def test_serves_last_known_cameras_as_stale_on_api_error(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+        camera = Mock(Camera)
+        coordinator.data = {'123': camera}
+
+        api.async_get_cameras.side_effect = SpypointApiError(Mock())
+        cameras = await coordinator._async_update_data()
+
+        self.assertEqual(cameras, {'123': camera})
+        self.assertTrue(coordinator.stale)
+        self.assertEqual(coordinator.breaker.failures, 1)
+        self.assertLessEqual(coordinator.update_interval, timedelta(seconds=60))
+
+    async def test_stops_polling_while_the_circuit_is_open(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+        coordinator.data = {}
+        api.async_get_cameras.side_effect = SpypointApiError(Mock())
+        for _ in range(3):
+            coordinator.breaker._retry_at = 0
+            await coordinator._async_update_data()
+        api.async_get_cameras.reset_mock()
+
+        await coordinator._async_update_data()
+
+        api.async_get_cameras.assert_not_called()
+        self.assertEqual(coordinator.breaker.state, 'open')
+
+    async def test_closes_the_circuit_when_the_probe_succeeds(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+        coordinator.data = {}
+        coordinator.stale = True
+        coordinator.breaker.state = 'open'
+        coordinator.breaker.failures = 3
+        api.async_get_cameras = AsyncMock(return_value=[])
+
+        await coordinator._async_update_data()
+
+        self.assertEqual(coordinator.breaker.state, 'closed')
+        self.assertEqual(coordinator.breaker.failures, 0)
+        self.assertFalse(coordinator.stale)
+
+    async def test_skips_excluded_cameras(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+        coordinator.set_options({CONF_EXCLUDED_CAMERAS: ['2']})
+
+        now = datetime.now().astimezone()
+        cameras = [Camera(id=camera_id, name=camera_id, model='model', modem_firmware='modem_firmware',
+                          camera_firmware='camera_firmware', last_update_time=now) for camera_id in ['1', '2']]
+        api.async_get_cameras = AsyncMock(return_value=cameras)
+
+        data = await coordinator._async_update_data()
+
+        self.assertEqual(list(data), ['1'])
+        self.assertEqual(coordinator.account_cameras, {'1': '1', '2': '2'})
+
+    async def test_profiles_refresh_stages(self):
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        entry.entry_id = 'entry'
+        coordinator = SpypointCoordinator(hass=Mock(HomeAssistant), api=api, entry=entry)
+        coordinator.profiler = Mock(SpypointProfiler)
+        coordinator.profiler.stage.side_effect = lambda entry_id, stage: nullcontext()
+        api.async_get_cameras = AsyncMock(return_value=[])
+
+        await coordinator._async_update_data()
+        coordinator.async_update_listeners()
+
+        self.assertEqual([call.args for call in coordinator.profiler.stage.call_args_list],
+                         [('entry', 'fetch'), ('entry', 'apply'), ('entry', 'notify')])
+        coordinator.profiler.end_cycle.assert_called_once_with('entry')
+
+    async def test_ignores_unchanged_options(self):
+        coordinator = SpypointCoordinator(hass=Mock(HomeAssistant), api=Mock(SpypointApi), entry=Mock(ConfigEntry))
+
+        self.assertTrue(coordinator.set_options({CONF_SLOW_CAMERAS: ['2']}))
+        self.assertFalse(coordinator.set_options({CONF_SLOW_CAMERAS: ['2']}))
+
+    async def test_applies_deadband_options_without_refresh(self):
+        coordinator = SpypointCoordinator(hass=Mock(HomeAssistant), api=Mock(SpypointApi), entry=Mock(ConfigEntry))
+
+        refresh = coordinator.set_options({CONF_TEMPERATURE_DEADBAND: 0.5, CONF_SIGNAL_DEADBAND: 0, CONF_MAX_WRITE_INTERVAL: 30})
+
+        self.assertFalse(refresh)
+        self.assertEqual(coordinator.deadbands, {CONF_TEMPERATURE_DEADBAND: 0.5})
+        self.assertEqual(coordinator.max_write_interval, timedelta(minutes=30))
+
+    async def test_applies_archive_quota_without_refresh(self):
+        coordinator = SpypointCoordinator(hass=Mock(HomeAssistant), api=Mock(SpypointApi), entry=Mock(ConfigEntry))
+
+        refresh = coordinator.set_options({CONF_ARCHIVE_QUOTA: 2})
+
+        self.assertFalse(refresh)
+        self.assertEqual(coordinator.archive_quota, 2 * 1024 * 1024)
+
+    async def test_swaps_credentials_in_place(self):
+        session = Mock()
+        api = SpypointApi('user', 'old', session)
+        coordinator = SpypointCoordinator(hass=Mock(HomeAssistant), api=api, entry=Mock(ConfigEntry))
+        reauthenticated = SpypointApi('user', 'new', session)
+        reauthenticated.headers['Authorization'] = 'Bearer token'
+        reauthenticated.expires_at = datetime.now() + timedelta(hours=1)
+
+        coordinator.set_credentials(reauthenticated)
+
+        self.assertIs(coordinator.api, api)
+        self.assertIs(coordinator.photos.api, api)
+        self.assertEqual(api.password, 'new')
+        self.assertEqual(api.headers['Authorization'], 'Bearer token')
+        self.assertEqual(api.expires_at, reauthenticated.expires_at)
+
+    async def test_keeps_slow_cameras_until_due(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+        coordinator.set_options({CONF_SLOW_CAMERAS: ['2']})
+
+        now = datetime.now().astimezone()
+        fast = Camera(id='1', name='1', model='model', modem_firmware='modem_firmware',
+                      camera_firmware='camera_firmware', last_update_time=now, battery=90)
+        slow = Camera(id='2', name='2', model='model', modem_firmware='modem_firmware',
+                      camera_firmware='camera_firmware', last_update_time=now, battery=90)
+        api.async_get_cameras = AsyncMock(return_value=[fast, slow])
+        coordinator.data = await coordinator._async_update_data()
+
+        api.async_get_cameras = AsyncMock(return_value=[replace(fast, battery=80), replace(slow, battery=80)])
+        data = await coordinator._async_update_data()
+
+        self.assertEqual(data['1'].battery, 80)
+        self.assertIs(data['2'], slow)
+        self.assertEqual(coordinator.changes.keys(), {'1'})
+        self.assertLessEqual(coordinator.update_interval, timedelta(minutes=30))
+
+    async def test_takes_a_battery_reading_at_each_check_in(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+
+        now = datetime.now().astimezone()
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', last_update_time=now - timedelta(days=2), battery=90)
+        api.async_get_cameras = AsyncMock(return_value=[camera])
+        for day, level in enumerate([88, 86]):
+            coordinator.data = await coordinator._async_update_data()
+            camera = replace(camera, last_update_time=now - timedelta(days=1 - day), battery=level)
+            api.async_get_cameras = AsyncMock(return_value=[camera])
+        await coordinator._async_update_data()
+
+        self.assertAlmostEqual(coordinator.battery('123').drain_rate(), 2)
+
+    async def test_skips_battery_readings_without_a_last_update(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', battery=90)
+        api.async_get_cameras = AsyncMock(return_value=[camera])
+        await coordinator._async_update_data()
+
+        self.assertIsNone(coordinator.battery('123'))
+
+    async def test_concurrent_refreshes_share_one_fetch(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+        coordinator.async_set_updated_data = Mock()
+        fetched = asyncio.Event()
+
+        async def async_get_cameras():
+            await fetched.wait()
+            return []
+        api.async_get_cameras = AsyncMock(side_effect=async_get_cameras)
+
+        refreshes = asyncio.gather(coordinator.async_refresh_cameras(['1']), coordinator.async_refresh_cameras(['2']))
+        await asyncio.sleep(0)
+        fetched.set()
+        await refreshes
+
+        api.async_get_cameras.assert_called_once()
+        self.assertEqual(coordinator.async_set_updated_data.call_count, 2)
+
+    async def test_refresh_applies_to_targeted_cameras_only(self):
+        hass = Mock(HomeAssistant)
+        api = Mock(SpypointApi)
+        entry = Mock(ConfigEntry)
+        coordinator = SpypointCoordinator(hass=hass, api=api, entry=entry)
+        coordinator.async_set_updated_data = Mock()
+
+        now = datetime.now().astimezone()
+        cameras = [Camera(id=camera_id, name=camera_id, model='model', modem_firmware='modem_firmware',
+                          camera_firmware='camera_firmware', last_update_time=now, battery=90) for camera_id in ['1', '2']]
+        api.async_get_cameras = AsyncMock(return_value=cameras)
+        coordinator.data = await coordinator._async_update_data()
+
+        api.async_get_cameras = AsyncMock(return_value=[replace(camera, battery=80) for camera in cameras])
+        await coordinator.async_refresh_cameras(['1'])
+
+        data = coordinator.async_set_updated_data.call_args.args[0]
+        self.assertEqual(data['1'].battery, 80)
+        self.assertEqual(data['2'].battery, 90)
+        self.assertEqual(coordinator.changes.keys(), {'1'})
@@ -1,4 +1,5 @@
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import Mock
 
@@ -8,6 +9,7 @@ from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from spypointapi import Camera, Coordinates
 
 from custom_components.spypoint import DOMAIN
+from custom_components.spypoint.const import CONF_TRACKER_MIN_DISTANCE
 from custom_components.spypoint.device_tracker import async_setup_entry, SpypointCameraTracker
 
 
@@ -26,7 +28,7 @@ class TestDeviceTrackerCreation(IsolatedAsyncioTestCase):
             last_update_time=datetime.now().astimezone(),
             coordinates=Coordinates(latitude=45.1234, longitude=-70.5678)
         )
-        self.coordinator.data = {'123': self.camera}
+        self.coordinator.data = {'id': self.camera}
         hass = Mock(HomeAssistant)
         hass.data = {DOMAIN: {entry.entry_id: self.coordinator}}
 
@@ -41,15 +43,33 @@ class TestDeviceTrackerCreation(IsolatedAsyncioTestCase):
         tracker = self.trackers[0]
         self.assertIsInstance(tracker, SpypointCameraTracker)
         self.assertEqual(tracker.coordinator, self.coordinator)
-        self.assertEqual(tracker._camera, self.camera)
+        self.assertEqual(tracker._camera_id, self.camera.id)
         self.assertEqual(tracker.source_type, SourceType.GPS)
         self.assertEqual(tracker.latitude, 45.1234)
         self.assertEqual(tracker.longitude, -70.5678)
         self.assertEqual(tracker._attr_name, 'Spypoint Test Location')
 
+    async def test_add_tracker_for_new_cameras(self):
+        self.coordinator.async_add_listener.assert_called_once()
+        async_add_new_cameras = self.coordinator.async_add_listener.call_args.args[0]
+        self.async_add_devices.reset_mock()
+
+        camera = Camera(id="456", name="New", model="model",
+                        modem_firmware="modem_firmware", camera_firmware="camera_firmware",
+                        last_update_time=datetime.now().astimezone(),
+                        coordinates=Coordinates(latitude=46.0, longitude=-71.0))
+        self.coordinator.data = {'id': self.camera, '456': camera}
+        self.coordinator.added_cameras = frozenset({'456'})
+        async_add_new_cameras()
+
+        self.async_add_devices.assert_called_once()
+        trackers = self.async_add_devices.call_args.args[0]
+        self.assertEqual(len(trackers), 1)
+        self.assertEqual(trackers[0]._attr_name, 'Spypoint New Location')
+
     async def test_no_device_tracker_when_no_coordinates(self):
         self.camera.coordinates = None
-        self.coordinator.data = {'123': self.camera}
+        self.coordinator.data = {'id': self.camera}
 
         self.async_add_devices.reset_mock()
 
@@ -63,3 +83,25 @@ class TestDeviceTrackerCreation(IsolatedAsyncioTestCase):
         self.async_add_devices.assert_called_once()
         trackers = self.async_add_devices.call_args.args[0]
         self.assertEqual(len(trackers), 0)
+
+    async def test_skips_moves_shorter_than_min_distance(self):
+        tracker = self.trackers[0]
+        tracker.async_write_ha_state = Mock()
+        self.coordinator.last_update_success = True
+        self.coordinator.stale = False
+        self.coordinator.deadbands = {CONF_TRACKER_MIN_DISTANCE: 100}
+        self.coordinator.max_write_interval = timedelta(hours=1)
+        self.coordinator.changed_fields = Mock(return_value=frozenset({'coordinates'}))
+        self.coordinator.count_entity_update = Mock()
+        self.coordinator.data = {'id': self.camera}
+        await tracker.async_added_to_hass()
+
+        # about 11 meters north
+        self.coordinator.data = {'id': replace(self.camera, coordinates=Coordinates(latitude=45.1235, longitude=-70.5678))}
+        tracker._handle_coordinator_update()
+        tracker.async_write_ha_state.assert_not_called()
+
+        # about 1.1 kilometers north
+        self.coordinator.data = {'id': replace(self.camera, coordinates=Coordinates(latitude=45.1334, longitude=-70.5678))}
+        tracker._handle_coordinator_update()
+        tracker.async_write_ha_state.assert_called_once()
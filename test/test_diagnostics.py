@@ -0,0 +1,42 @@
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from spypointapi import Camera, Coordinates
+
+from custom_components.spypoint import DOMAIN, SpypointCoordinator
+from custom_components.spypoint.circuit import SpypointCircuitBreaker
+from custom_components.spypoint.diagnostics import async_get_config_entry_diagnostics
+from custom_components.spypoint.metrics import SpypointCoordinatorMetrics
+
+
+class TestDiagnostics(IsolatedAsyncioTestCase):
+
+    async def test_redacts_credentials(self):
+        entry = Mock(ConfigEntry)
+        entry.entry_id = 'entry'
+        entry.as_dict.return_value = {'title': 'user@example.com', 'data': {CONF_USERNAME: 'user@example.com', CONF_PASSWORD: 'secret'}}
+        coordinator = Mock(SpypointCoordinator)
+        coordinator.last_update_success = True
+        coordinator.update_interval = None
+        coordinator.stale = False
+        coordinator.metrics = SpypointCoordinatorMetrics()
+        coordinator.breaker = SpypointCircuitBreaker()
+        coordinator.metrics.record_fetch(0.5, cameras=1)
+        coordinator.data = {'123': Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                                          camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone(),
+                                          owner='Dude', coordinates=Coordinates(latitude=45.0, longitude=-70.0))}
+        hass = Mock(HomeAssistant)
+        hass.data = {DOMAIN: {'entry': coordinator}}
+
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+        self.assertEqual(diagnostics['entry']['title'], '**REDACTED**')
+        self.assertEqual(diagnostics['entry']['data'], {CONF_USERNAME: '**REDACTED**', CONF_PASSWORD: '**REDACTED**'})
+        self.assertEqual(diagnostics['coordinator']['metrics']['latency_p50'], 0.5)
+        self.assertEqual(diagnostics['cameras'][0]['owner'], '**REDACTED**')
+        self.assertEqual(diagnostics['cameras'][0]['coordinates'], '**REDACTED**')
+        self.assertEqual(diagnostics['orchestrator']['entries'], 0)
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+from spypointapi import Camera
+
+from custom_components.spypoint.diff import SpypointCameraDiffer, CAMERA_FIELDS
+
+
+class TestSpypointCameraDiffer(TestCase):
+
+    def setUp(self):
+        self.now = datetime.now().astimezone()
+        self.differ = SpypointCameraDiffer()
+
+    def test_all_fields_changed_for_new_camera(self):
+        changes = self.differ.diff({'id': self.camera()})
+
+        self.assertEqual(changes, {'id': CAMERA_FIELDS})
+
+    def test_no_change_when_snapshot_is_equal(self):
+        self.differ.diff({'id': self.camera()})
+
+        changes = self.differ.diff({'id': self.camera()})
+
+        self.assertEqual(changes, {})
+
+    def test_reports_changed_fields(self):
+        self.differ.diff({'id': self.camera()})
+
+        changes = self.differ.diff({'id': self.camera(battery=40, temperature=21)})
+
+        self.assertEqual(changes, {'id': frozenset({'battery', 'temperature'})})
+
+    def test_reports_online_status_change(self):
+        self.differ.diff({'id': self.camera(last_update=self.now - timedelta(hours=23))})
+
+        changes = self.differ.diff({'id': self.camera(last_update=self.now - timedelta(hours=25))})
+
+        self.assertEqual(changes, {'id': frozenset({'last_update_time', 'is_online'})})
+
+    def camera(self, battery=50, temperature=20, last_update=None):
+        return Camera(id='id', name="Test", model="model",
+                      modem_firmware="modem_firmware", camera_firmware="camera_firmware",
+                      last_update_time=last_update or self.now, battery=battery, temperature=temperature)
@@ -0,0 +1,139 @@
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock, patch
+
+from spypointapi import Camera
+
+from custom_components.spypoint import SpypointCoordinator
+from custom_components.spypoint.const import CONF_TEMPERATURE_DEADBAND
+from custom_components.spypoint.sensor import SpypointCameraSensor, SENSORS
+
+
+class TestSpypointCameraEntityUpdate(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.camera = Camera(id='id', name="Test", model="model",
+                             modem_firmware="modem_firmware", camera_firmware="camera_firmware",
+                             last_update_time=datetime.now().astimezone(), battery=50)
+        self.coordinator = Mock(SpypointCoordinator)
+        self.coordinator.last_update_success = True
+        self.coordinator.stale = False
+        self.coordinator.data = {'id': self.camera}
+        self.coordinator.changed_fields.return_value = frozenset()
+
+        self.sensor = SpypointCameraSensor(self.coordinator, self.camera, next(d for d in SENSORS if d.key == 'battery'))
+        self.sensor.async_write_ha_state = Mock()
+        await self.sensor.async_added_to_hass()
+
+    def test_writes_state_when_source_field_changed(self):
+        self.coordinator.changed_fields.return_value = frozenset({'battery'})
+
+        self.sensor._handle_coordinator_update()
+
+        self.sensor.async_write_ha_state.assert_called_once()
+
+    def test_skips_write_when_other_fields_changed(self):
+        self.coordinator.changed_fields.return_value = frozenset({'temperature'})
+
+        self.sensor._handle_coordinator_update()
+
+        self.sensor.async_write_ha_state.assert_not_called()
+
+    def test_reads_latest_camera_of_the_coordinator(self):
+        self.coordinator.data = {'id': replace(self.camera, battery=40)}
+
+        self.sensor._handle_coordinator_update()
+
+        self.assertEqual(self.sensor.native_value, 40)
+
+    def test_writes_state_when_availability_changed(self):
+        self.coordinator.last_update_success = False
+
+        self.sensor._handle_coordinator_update()
+
+        self.sensor.async_write_ha_state.assert_called_once()
+
+    def test_unavailable_when_camera_removed_from_account(self):
+        self.coordinator.data = {}
+
+        self.sensor._handle_coordinator_update()
+
+        self.assertFalse(self.sensor.available)
+        self.sensor.async_write_ha_state.assert_called_once()
+
+    def test_writes_state_when_data_is_no_longer_stale(self):
+        self.coordinator.stale = True
+        self.sensor._handle_coordinator_update()
+        self.sensor.async_write_ha_state.reset_mock()
+
+        self.coordinator.stale = False
+        self.sensor._handle_coordinator_update()
+
+        self.sensor.async_write_ha_state.assert_called_once()
+        self.assertIsNone(self.sensor.extra_state_attributes)
+
+    def test_marks_stale_state(self):
+        self.coordinator.stale = True
+
+        self.assertEqual(self.sensor.extra_state_attributes, {'stale': True})
+
+
+class TestSpypointCameraEntityDeadband(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.camera = Camera(id='id', name="Test", model="model",
+                             modem_firmware="modem_firmware", camera_firmware="camera_firmware",
+                             last_update_time=datetime.now().astimezone(), temperature=20)
+        self.coordinator = Mock(SpypointCoordinator)
+        self.coordinator.last_update_success = True
+        self.coordinator.stale = False
+        self.coordinator.data = {'id': self.camera}
+        self.coordinator.changed_fields.return_value = frozenset({'temperature'})
+        self.coordinator.deadbands = {CONF_TEMPERATURE_DEADBAND: 2}
+        self.coordinator.max_write_interval = timedelta(hours=1)
+
+        self.sensor = SpypointCameraSensor(self.coordinator, self.camera, next(d for d in SENSORS if d.key == 'temperature'))
+        self.sensor.async_write_ha_state = Mock()
+        await self.sensor.async_added_to_hass()
+
+    def check_in(self, temperature):
+        self.coordinator.data = {'id': replace(self.camera, temperature=temperature)}
+        self.sensor._handle_coordinator_update()
+
+    def test_skips_changes_inside_the_deadband(self):
+        self.check_in(21)
+        self.check_in(19)
+
+        self.sensor.async_write_ha_state.assert_not_called()
+
+    def test_writes_changes_that_add_up_past_the_deadband(self):
+        self.check_in(21)
+        self.check_in(22)
+
+        self.sensor.async_write_ha_state.assert_called_once()
+        self.sensor.async_write_ha_state.reset_mock()
+
+        self.check_in(21)
+
+        self.sensor.async_write_ha_state.assert_not_called()
+
+    def test_writes_changes_inside_the_deadband_after_max_interval(self):
+        with patch('custom_components.spypoint.entity.time.monotonic', return_value=self.sensor._written_at + 3601):
+            self.check_in(21)
+
+        self.sensor.async_write_ha_state.assert_called_once()
+
+    def test_writes_every_change_without_deadband(self):
+        self.coordinator.deadbands = {}
+
+        self.check_in(21)
+
+        self.sensor.async_write_ha_state.assert_called_once()
+
+    def test_writes_availability_changes_inside_the_deadband(self):
+        self.coordinator.last_update_success = False
+
+        self.check_in(21)
+
+        self.sensor.async_write_ha_state.assert_called_once()
@@ -0,0 +1,83 @@
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock, AsyncMock
+
+from homeassistant.core import HomeAssistant
+from spypointapi import Camera
+
+from custom_components.spypoint import SpypointCoordinator
+from custom_components.spypoint.events import SpypointEventEmitter, SpypointEventStore, EVENT_SPYPOINT, \
+    EVENT_NOTIFICATION, EVENT_OFFLINE
+
+
+class TestSpypointEventEmitter(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.hass = Mock(HomeAssistant)
+        self.hass.bus = Mock()
+        self.coordinator = Mock(SpypointCoordinator)
+        self.coordinator.account_cameras = {'123': 'Test'}
+        self.coordinator.changes = {}
+        self.coordinator.removed_cameras = frozenset()
+        self.store = Mock(SpypointEventStore)
+        self.store.async_load = AsyncMock(return_value=None)
+        self.emitter = SpypointEventEmitter(self.hass, self.coordinator, self.store)
+        self.camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                             camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone(),
+                             notifications=['low_battery'])
+        self.refresh(self.camera)
+
+    def refresh(self, camera, fields=frozenset({'notifications', 'is_online'})):
+        self.coordinator.data = {camera.id: camera}
+        self.coordinator.changes = {camera.id: fields}
+        self.emitter.async_update()
+
+    def fired(self):
+        return [call.args[1] for call in self.hass.bus.async_fire.call_args_list if call.args[0] == EVENT_SPYPOINT]
+
+    async def test_first_seen_camera_fires_nothing(self):
+        self.assertEqual(self.fired(), [])
+        self.store.async_save.assert_called_once_with({'123': ['low_battery']}, {'123': True})
+
+    async def test_fires_new_notifications(self):
+        self.refresh(replace(self.camera, notifications=['low_battery', 'sd_card_full']))
+
+        self.assertEqual(self.fired(), [{'type': EVENT_NOTIFICATION, 'camera_id': '123', 'camera_name': 'Test',
+                                         'notification': 'sd_card_full'}])
+
+    async def test_fires_a_notification_again_once_cleared(self):
+        self.refresh(replace(self.camera, notifications=[]))
+        self.refresh(replace(self.camera, notifications=['low_battery']))
+
+        self.assertEqual([event['notification'] for event in self.fired()], ['low_battery'])
+
+    async def test_fires_camera_going_offline(self):
+        offline = replace(self.camera, last_update_time=self.camera.last_update_time - timedelta(days=2))
+
+        self.refresh(offline, fields=frozenset({'is_online', 'last_update_time'}))
+
+        self.assertEqual([event['type'] for event in self.fired()], [EVENT_OFFLINE])
+
+    async def test_fires_camera_losing_its_last_update_going_offline(self):
+        self.refresh(replace(self.camera, last_update_time=None), fields=frozenset({'is_online', 'last_update_time'}))
+
+        self.assertEqual(self.fired(), [{'type': EVENT_OFFLINE, 'camera_id': '123', 'camera_name': 'Test',
+                                         'last_update_time': None}])
+
+    async def test_does_not_fire_again_after_restart(self):
+        saved = self.store.async_save.call_args.args
+        self.store.async_load.return_value = {'seen': saved[0], 'online': saved[1]}
+        self.emitter = SpypointEventEmitter(self.hass, self.coordinator, self.store)
+
+        await self.emitter.async_load()
+
+        self.assertEqual(self.fired(), [])
+
+    async def test_forgets_removed_cameras(self):
+        self.coordinator.changes = {}
+        self.coordinator.removed_cameras = frozenset({'123'})
+
+        self.emitter.async_update()
+
+        self.assertEqual(self.store.async_save.call_args.args, ({}, {}))
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone, timedelta
+from unittest import TestCase
+
+from spypointapi import Camera
+
+from custom_components.spypoint.fleet import SpypointFleetAggregates
+
+NOW = datetime.now(timezone.utc)
+
+
+def camera(camera_id, last_update_time=NOW, **fields):
+    return Camera(**{'id': camera_id, 'name': camera_id, 'model': 'model', 'modem_firmware': 'modem_firmware',
+                     'camera_firmware': 'camera_firmware', 'last_update_time': last_update_time, **fields})
+
+
+class TestSpypointFleetAggregates(TestCase):
+
+    def setUp(self):
+        self.fleet = SpypointFleetAggregates()
+
+    def test_empty_fleet(self):
+        self.assertEqual(self.fleet.offline, 0)
+        self.assertEqual(self.fleet.with_notifications, 0)
+        self.assertIsNone(self.fleet.average_memory())
+        self.assertIsNone(self.fleet.lowest_battery())
+
+    def test_aggregates_cameras(self):
+        self.fleet.update(camera('1', battery=80, memory=10, notifications=['missing_battery']))
+        self.fleet.update(camera('2', NOW - timedelta(days=2), battery=30, memory=20))
+        self.fleet.update(camera('3'))
+
+        self.assertEqual(len(self.fleet), 3)
+        self.assertEqual(self.fleet.offline, 1)
+        self.assertEqual(self.fleet.with_notifications, 1)
+        self.assertEqual(self.fleet.average_memory(), 15)
+        self.assertEqual(self.fleet.lowest_battery(), (30, '2'))
+
+    def test_replaces_previous_reading_of_a_camera(self):
+        self.fleet.update(camera('1', NOW - timedelta(days=2), battery=30, memory=20, notifications=['missing_battery']))
+        self.fleet.update(camera('2', battery=50))
+
+        self.fleet.update(camera('1', battery=90, memory=40))
+
+        self.assertEqual(self.fleet.offline, 0)
+        self.assertEqual(self.fleet.with_notifications, 0)
+        self.assertEqual(self.fleet.average_memory(), 40)
+        self.assertEqual(self.fleet.lowest_battery(), (50, '2'))
+
+    def test_forgets_removed_cameras(self):
+        self.fleet.update(camera('1', NOW - timedelta(days=2), battery=10, memory=20))
+        self.fleet.update(camera('2', battery=50))
+
+        self.fleet.remove('1')
+
+        self.assertEqual(len(self.fleet), 1)
+        self.assertEqual(self.fleet.offline, 0)
+        self.assertIsNone(self.fleet.average_memory())
+        self.assertEqual(self.fleet.lowest_battery(), (50, '2'))
+
+    def test_keeps_lowest_battery_candidates_bounded(self):
+        self.fleet.update(camera('1', battery=1))
+        for battery in range(100, 2, -1):
+            self.fleet.update(camera('2', battery=battery))
+
+        self.assertLessEqual(len(self.fleet._batteries), 4)
+        self.assertEqual(self.fleet.lowest_battery(), (1, '1'))
@@ -0,0 +1,96 @@
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock, AsyncMock, patch
+
+from homeassistant.core import HomeAssistant
+from spypointapi import Camera
+
+from custom_components.spypoint import DOMAIN, SpypointCoordinator
+from custom_components.spypoint.image import async_setup_entry, SpypointLatestPhoto
+from custom_components.spypoint.photos import Photo, photo_from_json
+
+
+class TestLatestPhotoImage(IsolatedAsyncioTestCase):
+
+    # the image entities are created during setup
+    @patch('homeassistant.components.image.get_async_client', Mock())
+    @patch('custom_components.spypoint.image.async_get_photo_cache')
+    async def asyncSetUp(self, async_get_photo_cache):
+        entry = Mock()
+        entry.entry_id = 'id'
+        self.photo_cache = async_get_photo_cache.return_value
+        self.photo_cache.async_get = AsyncMock(return_value=b'jpeg')
+        self.coordinator = Mock(SpypointCoordinator)
+        self.coordinator.hass = Mock(HomeAssistant)
+        self.coordinator.photos = Mock()
+        self.coordinator.last_update_success = True
+        self.coordinator.stale = False
+        self.camera = Camera(id='123', name='Test', model='model',
+                             modem_firmware='modem_firmware', camera_firmware='camera_firmware',
+                             last_update_time=datetime.now().astimezone())
+        self.coordinator.data = {'123': self.camera}
+        hass = Mock(HomeAssistant)
+        hass.data = {DOMAIN: {entry.entry_id: self.coordinator}}
+
+        self.async_add_entities = Mock()
+        await async_setup_entry(hass, entry, self.async_add_entities)
+        self.images = self.async_add_entities.call_args.args[0]
+        self.image = self.images[0]
+        self.image.async_write_ha_state = Mock()
+
+    async def test_add_image_on_setup(self):
+        self.assertEqual(len(self.images), 1)
+        self.assertIsInstance(self.image, SpypointLatestPhoto)
+        self.assertEqual(self.image._attr_name, 'Spypoint Test Latest Photo')
+        self.assertEqual(self.image._attr_unique_id, 'spypoint_test_latest_photo')
+
+    async def test_no_image_before_first_photo(self):
+        self.assertIsNone(await self.image.async_image())
+
+    async def test_new_photo_updates_the_image(self):
+        photo = self.photo('1')
+        self.coordinator.photos.async_get_latest_photo = AsyncMock(return_value=photo)
+
+        await self.image._async_update_photo()
+
+        self.assertEqual(self.image._attr_image_last_updated, photo.date)
+        self.image.async_write_ha_state.assert_called_once()
+        self.assertEqual(await self.image.async_image(), b'jpeg')
+        self.photo_cache.async_get.assert_called_once_with('1', 'https://host/large.jpg')
+
+    async def test_same_photo_is_not_written_again(self):
+        self.coordinator.photos.async_get_latest_photo = AsyncMock(return_value=self.photo('1'))
+        await self.image._async_update_photo()
+        self.image.async_write_ha_state.reset_mock()
+
+        await self.image._async_update_photo()
+
+        self.image.async_write_ha_state.assert_not_called()
+
+    async def test_malformed_photo_keeps_the_current_photo(self):
+        self.coordinator.photos.async_get_latest_photo = AsyncMock(return_value=self.photo('1'))
+        await self.image._async_update_photo()
+        self.image.async_write_ha_state.reset_mock()
+        # a listed photo without id
+        malformed = {'originDate': '2024-06-01T12:30:00.000Z', 'large': {'host': 'host', 'path': 'large.jpg'}}
+        self.coordinator.photos.async_get_latest_photo = AsyncMock(side_effect=lambda camera_id: photo_from_json(malformed))
+
+        await self.image._async_update_photo()
+
+        self.image.async_write_ha_state.assert_not_called()
+        self.assertEqual(self.image._photo.id, '1')
+
+    async def test_looks_for_a_new_photo_after_a_check_in(self):
+        self.coordinator.changed_fields.return_value = frozenset({'last_update_time'})
+        self.coordinator.config_entry = Mock()
+        self.image.hass = Mock(HomeAssistant)
+
+        self.image._handle_coordinator_update()
+
+        self.coordinator.config_entry.async_create_background_task.assert_called_once()
+        self.coordinator.config_entry.async_create_background_task.call_args.args[1].close()
+
+    @staticmethod
+    def photo(id):
+        return Photo(id=id, camera_id='123', date=datetime.now().astimezone(),
+                     urls={'small': 'https://host/small.jpg', 'large': 'https://host/large.jpg'})
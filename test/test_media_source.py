@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock, AsyncMock, patch
+
+from homeassistant.components.media_source.error import Unresolvable
+from homeassistant.components.media_source.models import MediaSourceItem
+from homeassistant.core import HomeAssistant
+from spypointapi import Camera
+
+from custom_components.spypoint import DOMAIN, SpypointCoordinator
+from custom_components.spypoint.media_source import SpypointMediaSource, DAYS_PER_PAGE
+from custom_components.spypoint.photos import Photo
+
+
+class TestSpypointMediaSource(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        patcher = patch('custom_components.spypoint.media_source.async_get_photo_index')
+        self.index = Mock()
+        patcher.start().return_value = self.index
+        self.addCleanup(patcher.stop)
+
+        coordinator = Mock(SpypointCoordinator)
+        coordinator.data = {'123': Camera(id='123', name='Trail', model='model', modem_firmware='modem_firmware',
+                                          camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone())}
+        self.hass = Mock(HomeAssistant)
+        self.hass.data = {DOMAIN: {'entry': coordinator}}
+        self.hass.async_add_executor_job = AsyncMock(side_effect=lambda target, *args: target(*args))
+        self.source = SpypointMediaSource(self.hass)
+
+    async def test_browse_lists_cameras(self):
+        result = await self.source.async_browse_media(self.item(None))
+
+        self.assertEqual([(child.identifier, child.title) for child in result.children], [('camera/123', 'Trail')])
+
+    async def test_browse_camera_lists_days_with_next_page(self):
+        self.index.days.return_value = [(f'2024-05-{day:02}', 1) for day in range(DAYS_PER_PAGE + 1, 0, -1)]
+
+        result = await self.source.async_browse_media(self.item('camera/123'))
+
+        self.index.days.assert_called_once_with('123', DAYS_PER_PAGE + 1, 0)
+        self.assertEqual(len(result.children), DAYS_PER_PAGE + 1)
+        self.assertEqual(result.children[-1].identifier, 'camera/123/1')
+
+    async def test_browse_day_lists_photos(self):
+        self.index.photos.return_value = [self.photo()]
+
+        result = await self.source.async_browse_media(self.item('day/123/2024-06-01'))
+
+        self.assertEqual(result.children[0].identifier, 'photo/photo')
+        self.assertEqual(result.children[0].thumbnail, '/api/spypoint/photos/photo?size=small')
+
+    async def test_resolves_photo(self):
+        self.index.photo.return_value = self.photo()
+
+        result = await self.source.async_resolve_media(self.item('photo/photo'))
+
+        self.assertEqual(result.url, 'https://cdn/large.jpg')
+        self.assertEqual(result.mime_type, 'image/jpeg')
+
+    async def test_unknown_photo_is_unresolvable(self):
+        self.index.photo.return_value = None
+
+        with self.assertRaises(Unresolvable):
+            await self.source.async_resolve_media(self.item('photo/unknown'))
+
+    def item(self, identifier):
+        return MediaSourceItem(self.hass, DOMAIN, identifier, None)
+
+    @staticmethod
+    def photo():
+        return Photo(id='photo', camera_id='123', date=datetime(2024, 6, 1, 12, tzinfo=timezone.utc),
+                     urls={'small': 'https://cdn/small.jpg', 'large': 'https://cdn/large.jpg'})
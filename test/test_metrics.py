@@ -0,0 +1,35 @@
+from datetime import timedelta
+from unittest import TestCase
+
+from custom_components.spypoint.metrics import SpypointCoordinatorMetrics
+
+
+class TestSpypointCoordinatorMetrics(TestCase):
+
+    def setUp(self):
+        self.metrics = SpypointCoordinatorMetrics()
+
+    def test_no_percentile_before_first_fetch(self):
+        self.assertIsNone(self.metrics.latency(50))
+
+    def test_latency_percentiles(self):
+        for latency in [0.3, 0.1, 0.5, 0.2, 0.4]:
+            self.metrics.record_fetch(latency, cameras=3)
+
+        self.assertEqual(self.metrics.latency(50), 0.3)
+        self.assertEqual(self.metrics.latency(95), 0.5)
+        self.assertEqual(self.metrics.cameras, 3)
+        self.assertEqual(self.metrics.fetches, 5)
+
+    def test_check_in_lag(self):
+        self.metrics.record_check_in_lag(timedelta(seconds=42))
+
+        self.assertEqual(self.metrics.check_in_lag(95), 42)
+
+    def test_counts_entities_notified_per_refresh(self):
+        self.metrics.start_notifying()
+        self.metrics.count_notified()
+        self.metrics.count_notified()
+        self.metrics.stop_notifying()
+
+        self.assertEqual(self.metrics.entities_notified, 2)
@@ -0,0 +1,80 @@
+import asyncio
+from datetime import timedelta
+from unittest import IsolatedAsyncioTestCase
+
+from custom_components.spypoint.const import MAX_POLL_JITTER
+from custom_components.spypoint.orchestrator import SpypointPollOrchestrator
+
+
+class TestSpypointPollOrchestrator(IsolatedAsyncioTestCase):
+
+    async def test_first_poll_is_spread_across_the_interval(self):
+        orchestrator = SpypointPollOrchestrator()
+        orchestrator.register('entry')
+
+        interval = orchestrator.spread('entry', timedelta(seconds=60))
+
+        self.assertGreaterEqual(interval, timedelta(seconds=60))
+        self.assertLessEqual(interval, timedelta(seconds=120))
+
+    async def test_next_polls_get_bounded_jitter(self):
+        orchestrator = SpypointPollOrchestrator()
+        orchestrator.register('entry')
+        orchestrator.spread('entry', timedelta(minutes=30))
+
+        interval = orchestrator.spread('entry', timedelta(minutes=30))
+
+        self.assertGreaterEqual(interval, timedelta(minutes=30))
+        self.assertLessEqual(interval, timedelta(minutes=30) + MAX_POLL_JITTER)
+
+    async def test_shortened_interval_gets_no_jitter(self):
+        orchestrator = SpypointPollOrchestrator()
+        orchestrator.register('entry')
+
+        interval = orchestrator.spread('entry', timedelta(seconds=45))
+
+        self.assertEqual(interval, timedelta(seconds=45))
+        # the first poll at the regular interval is still spread
+        self.assertIn('entry', orchestrator._unscheduled)
+
+    async def test_bounds_concurrent_fetches(self):
+        orchestrator = SpypointPollOrchestrator(max_concurrent_fetches=1)
+        release = asyncio.Event()
+        running = []
+
+        async def fetch(name):
+            async with orchestrator.async_fetch_slot():
+                running.append(name)
+                await release.wait()
+
+        first = asyncio.create_task(fetch('first'))
+        second = asyncio.create_task(fetch('second'))
+        await asyncio.sleep(0)
+
+        self.assertEqual(running, ['first'])
+        self.assertEqual(orchestrator.queue_depth, 1)
+
+        release.set()
+        await asyncio.gather(first, second)
+
+        self.assertEqual(running, ['first', 'second'])
+        self.assertEqual(orchestrator.queue_depth, 0)
+        self.assertGreaterEqual(orchestrator.max_lag, 0)
+
+    async def test_cancelled_wait_leaves_the_queue(self):
+        orchestrator = SpypointPollOrchestrator(max_concurrent_fetches=1)
+        release = asyncio.Event()
+
+        async def fetch():
+            async with orchestrator.async_fetch_slot():
+                await release.wait()
+
+        first = asyncio.create_task(fetch())
+        second = asyncio.create_task(fetch())
+        await asyncio.sleep(0)
+        second.cancel()
+        await asyncio.sleep(0)
+
+        self.assertEqual(orchestrator.queue_depth, 0)
+        release.set()
+        await first
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import timedelta
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from aiohttp import ClientError
+
+from custom_components.spypoint.photo_cache import SpypointPhotoCache, REVALIDATE_AFTER
+
+
+class TestSpypointPhotoCache(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.cache = SpypointPhotoCache(self.session, max_bytes=10)
+
+    async def test_downloads_photo_once(self):
+        self.response(status=200, content=b'abc')
+
+        first = await self.cache.async_get('1', 'https://host/1.jpg')
+        second = await self.cache.async_get('1', 'https://host/1.jpg')
+
+        self.assertEqual(first, b'abc')
+        self.assertEqual(second, b'abc')
+        self.session.get.assert_called_once_with('https://host/1.jpg', headers={})
+
+    async def test_evicts_least_recently_used_photos(self):
+        self.response(status=200, content=b'123456')
+        await self.cache.async_get('1', 'https://host/1.jpg')
+        await self.cache.async_get('2', 'https://host/2.jpg')
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.size, 6)
+
+    async def test_revalidates_old_photos_with_conditional_request(self):
+        self.response(status=200, content=b'abc', headers={'ETag': '"v1"'})
+        await self.cache.async_get('1', 'https://host/1.jpg')
+
+        self.response(status=304, content=b'')
+        with patch('custom_components.spypoint.photo_cache.time.monotonic', return_value=10 ** 9 + REVALIDATE_AFTER):
+            content = await self.cache.async_get('1', 'https://host/1.jpg')
+
+        self.assertEqual(content, b'abc')
+        self.session.get.assert_called_with('https://host/1.jpg', headers={'If-None-Match': '"v1"'})
+
+    async def test_nothing_returned_on_download_error(self):
+        self.session.get.side_effect = ClientError()
+
+        content = await self.cache.async_get('1', 'https://host/1.jpg')
+
+        self.assertIsNone(content)
+
+    @patch('custom_components.spypoint.photo_cache.FETCH_TIMEOUT', timedelta(milliseconds=10))
+    async def test_gives_up_on_a_hung_download(self):
+        async def read():
+            await asyncio.Event().wait()
+
+        self.response(status=200, content=b'').read = read
+
+        content = await self.cache.async_get('1', 'https://host/1.jpg')
+
+        self.assertIsNone(content)
+
+    def response(self, status, content, headers=None):
+        response = MagicMock()
+        response.status = status
+        response.headers = headers or {}
+        response.read = AsyncMock(return_value=content)
+        response.raise_for_status = MagicMock()
+        self.session.get.return_value.__aenter__ = AsyncMock(return_value=response)
+        self.session.get.return_value.__aexit__ = AsyncMock(return_value=False)
+        return response
@@ -0,0 +1,200 @@
+from datetime import datetime, timedelta, timezone
+from unittest import TestCase, IsolatedAsyncioTestCase
+from unittest.mock import Mock, AsyncMock
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.spypoint import SpypointCoordinator
+from custom_components.spypoint.events import EVENT_SPYPOINT, EVENT_NEW_PHOTO
+from custom_components.spypoint.photo_index import SpypointPhotoIndex, SpypointPhotoIndexer, PAGE_SIZE, MAX_PAGES_PER_RUN
+from custom_components.spypoint.photos import Photo
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def photo(id, date, camera_id='camera'):
+    return Photo(id=id, camera_id=camera_id, date=date, urls={'small': f'https://cdn/{id}-s.jpg', 'large': f'https://cdn/{id}.jpg'})
+
+
+class TestSpypointPhotoIndex(TestCase):
+
+    def setUp(self):
+        self.index = SpypointPhotoIndex(':memory:')
+        self.index.open()
+        self.addCleanup(self.index.close)
+
+    def test_lists_days_newest_first(self):
+        self.index.add('camera', [photo('1', NOW), photo('2', NOW - timedelta(minutes=1)), photo('3', NOW - timedelta(days=3))])
+
+        days = self.index.days('camera', limit=10)
+
+        self.assertEqual([count for _, count in days], [2, 1])
+        self.assertGreater(days[0][0], days[1][0])
+
+    def test_paginates_photos_of_a_day(self):
+        self.index.add('camera', [photo(str(i), NOW - timedelta(minutes=i)) for i in range(5)])
+        day = self.index.days('camera', limit=1)[0][0]
+
+        first_page = self.index.photos('camera', day, limit=2)
+        second_page = self.index.photos('camera', day, limit=2, offset=2)
+
+        self.assertEqual([p.id for p in first_page], ['0', '1'])
+        self.assertEqual([p.id for p in second_page], ['2', '3'])
+
+    def test_ignores_already_indexed_photos(self):
+        self.index.add('camera', [photo('1', NOW)])
+        self.index.add('camera', [photo('1', NOW)])
+
+        self.assertEqual(self.index.days('camera', limit=10)[0][1], 1)
+
+    def test_finds_photo_by_id(self):
+        self.index.add('camera', [photo('1', NOW)])
+
+        self.assertEqual(self.index.photo('1'), photo('1', NOW))
+        self.assertIsNone(self.index.photo('unknown'))
+
+    def test_tracks_newest_and_oldest_photo(self):
+        self.index.add('camera', [photo('1', NOW), photo('2', NOW - timedelta(days=1))])
+
+        self.assertEqual(self.index.newest('camera'), NOW)
+        self.assertEqual(self.index.oldest('camera'), NOW - timedelta(days=1))
+        self.assertIsNone(self.index.newest('other'))
+
+    def test_tracks_incomplete_history(self):
+        self.index.add('camera', [])
+        self.assertEqual(self.index.incomplete_cameras(), ['camera'])
+
+        self.index.set_complete('camera')
+        self.assertEqual(self.index.incomplete_cameras(), [])
+
+    def test_tracks_gaps(self):
+        self.index.save_gap('camera', NOW - timedelta(days=1), NOW)
+        self.index.save_gap('camera', NOW - timedelta(days=1), NOW - timedelta(hours=1))
+        self.assertEqual(self.index.gaps(), [('camera', NOW - timedelta(days=1), NOW - timedelta(hours=1))])
+
+        self.index.remove_gap('camera', NOW - timedelta(days=1))
+        self.assertEqual(self.index.gaps(), [])
+
+    def test_removes_camera(self):
+        self.index.add('camera', [photo('1', NOW)])
+        self.index.save_gap('camera', NOW - timedelta(days=1), NOW)
+
+        self.index.remove_camera('camera')
+
+        self.assertIsNone(self.index.photo('1'))
+        self.assertEqual(self.index.incomplete_cameras(), [])
+        self.assertEqual(self.index.gaps(), [])
+
+
+class TestSpypointPhotoIndexer(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.index = SpypointPhotoIndex(':memory:')
+        self.index.open()
+        self.addCleanup(self.index.close)
+        hass = Mock(HomeAssistant)
+        hass.async_add_executor_job = AsyncMock(side_effect=lambda target, *args: target(*args))
+        hass.bus = Mock()
+        self.hass = hass
+        self.coordinator = Mock(SpypointCoordinator)
+        self.coordinator.data = {'camera': Mock()}
+        self.coordinator.account_cameras = {'camera': 'Test'}
+        self.coordinator.photos = Mock()
+        self.indexer = SpypointPhotoIndexer(hass, self.coordinator)
+        self.indexer.index = self.index
+
+    async def test_indexes_photos_of_cameras_that_checked_in(self):
+        self.coordinator.photos.async_get_photos = AsyncMock(return_value=[photo('1', NOW), photo('2', NOW - timedelta(hours=1))])
+        self.schedule(changes={'camera': frozenset({'last_update_time'})})
+
+        await self.indexer._async_run()
+
+        self.assertEqual(self.index.newest('camera'), NOW)
+        self.assertEqual(self.index.incomplete_cameras(), [])
+
+    async def test_stops_at_already_indexed_photos(self):
+        self.index.add('camera', [photo('1', NOW - timedelta(hours=1))])
+        self.index.set_complete('camera')
+        page = [photo(str(i), NOW - timedelta(minutes=i)) for i in range(PAGE_SIZE)]
+        self.coordinator.photos.async_get_photos = AsyncMock(return_value=page)
+        self.schedule(changes={'camera': frozenset({'last_update_time'})})
+
+        await self.indexer._async_run()
+
+        self.coordinator.photos.async_get_photos.assert_called_once()
+
+    async def test_fires_an_event_for_each_new_photo(self):
+        self.index.add('camera', [photo('1', NOW - timedelta(hours=2))])
+        self.coordinator.photos.async_get_photos = AsyncMock(return_value=[photo('3', NOW), photo('2', NOW - timedelta(hours=1))])
+        self.schedule(changes={'camera': frozenset({'last_update_time'})})
+
+        await self.indexer._async_run()
+
+        events = [call.args for call in self.hass.bus.async_fire.call_args_list]
+        self.assertEqual([event['photo_id'] for _, event in events], ['2', '3'])
+        self.assertEqual(events[0], (EVENT_SPYPOINT, {'type': EVENT_NEW_PHOTO, 'camera_id': 'camera', 'camera_name': 'Test',
+                                                      'photo_id': '2', 'date': (NOW - timedelta(hours=1)).isoformat(),
+                                                      'url': 'https://cdn/2.jpg'}))
+
+    async def test_resumes_new_photos_beyond_the_pages_of_a_run(self):
+        self.index.add('camera', [photo('old', NOW - timedelta(days=30))])
+        self.index.set_complete('camera')
+        cloud = [photo(str(i), NOW - timedelta(minutes=i)) for i in range((MAX_PAGES_PER_RUN + 1) * PAGE_SIZE + 10)]
+        cloud.append(photo('old', NOW - timedelta(days=30)))
+
+        async def async_get_photos(camera_id, limit, date_end=None):
+            return [p for p in cloud if date_end is None or p.date < date_end][:limit]
+
+        self.coordinator.photos.async_get_photos = AsyncMock(side_effect=async_get_photos)
+        self.schedule(changes={'camera': frozenset({'last_update_time'})})
+        await self.indexer._async_run()
+        self.schedule(changes={'camera': frozenset({'last_update_time'})})
+        await self.indexer._async_run()
+
+        self.assertTrue(all(self.index.photo(p.id) is not None for p in cloud))
+        self.assertEqual(self.index.gaps(), [])
+
+    async def test_no_event_for_the_history_of_a_new_camera(self):
+        self.coordinator.photos.async_get_photos = AsyncMock(return_value=[photo('1', NOW)])
+        self.schedule(changes={'camera': frozenset({'last_update_time'})})
+
+        await self.indexer._async_run()
+
+        self.hass.bus.async_fire.assert_not_called()
+
+    async def test_removes_photos_of_cameras_that_left_the_account(self):
+        self.index.add('camera', [photo('1', NOW)])
+        self.coordinator.account_cameras = {}
+        self.schedule(removed=frozenset({'camera'}))
+
+        await self.indexer._async_run()
+
+        self.assertIsNone(self.index.photo('1'))
+
+    async def test_keeps_photos_of_excluded_cameras(self):
+        self.index.add('camera', [photo('1', NOW)])
+        self.coordinator.data = {}
+        self.coordinator.removed_cameras = frozenset({'camera'})
+        self.coordinator.changes = {}
+
+        self.indexer.async_schedule()
+
+        self.assertEqual(self.indexer._removed, set())
+        self.assertIsNotNone(self.index.photo('1'))
+
+    async def test_malformed_listing_interrupts_the_run(self):
+        self.index.add('camera', [photo('1', NOW - timedelta(hours=1))])
+        self.coordinator.photos.async_get_photos = AsyncMock(side_effect=KeyError('id'))
+        self.schedule(changes={'camera': frozenset({'last_update_time'})})
+
+        await self.indexer._async_run()
+
+        self.assertEqual(self.index.newest('camera'), NOW - timedelta(hours=1))
+        self.assertFalse(self.indexer._running)
+
+    def schedule(self, changes=None, removed=frozenset()):
+        self.coordinator.changes = changes or {}
+        self.coordinator.removed_cameras = removed
+        self.coordinator.config_entry = Mock()
+        self.indexer.async_schedule()
+        self.coordinator.config_entry.async_create_background_task.call_args.args[1].close()
@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+from custom_components.spypoint.photos import photo_from_json
+
+
+class TestPhotoFromJson(TestCase):
+
+    def test_photo_with_all_sizes(self):
+        photo = photo_from_json({
+            'id': 'photo',
+            'camera': 'camera',
+            'originDate': '2024-06-01T12:30:00.000Z',
+            'small': {'host': 'cdn', 'path': 'small.jpg'},
+            'medium': {'host': 'cdn', 'path': 'medium.jpg'},
+            'large': {'host': 'cdn', 'path': 'large.jpg'},
+        })
+
+        self.assertEqual(photo.id, 'photo')
+        self.assertEqual(photo.camera_id, 'camera')
+        self.assertEqual(photo.date.isoformat(), '2024-06-01T12:30:00+00:00')
+        self.assertEqual(photo.url, 'https://cdn/large.jpg')
+        self.assertEqual(photo.urls['small'], 'https://cdn/small.jpg')
+
+    def test_photo_without_url_is_ignored(self):
+        photo = photo_from_json({'id': 'photo', 'camera': 'camera', 'originDate': '2024-06-01T12:30:00.000Z'})
+
+        self.assertIsNone(photo)
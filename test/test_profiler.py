@@ -0,0 +1,66 @@
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import Mock
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.spypoint import SpypointCoordinator
+from custom_components.spypoint.profiler import SpypointProfiler
+
+
+class TestSpypointProfiler(TestCase):
+
+    def setUp(self):
+        self.hass = Mock(HomeAssistant)
+        self.coordinator = Mock(SpypointCoordinator)
+        self.coordinator.config_entry = Mock()
+        self.coordinator.config_entry.entry_id = 'entry'
+        self.coordinator.config_entry.title = 'user@example.com'
+        self.profiler = SpypointProfiler(self.hass, [self.coordinator], cycles=2)
+        self.profiler.attach()
+        self.addCleanup(self.profiler.detach)
+
+    def cycle(self):
+        for stage in ('fetch', 'apply', 'notify'):
+            with self.profiler.stage('entry', stage):
+                sum(range(1000))
+        self.profiler.end_cycle('entry')
+
+    def test_attaches_to_coordinators(self):
+        self.assertIs(self.coordinator.profiler, self.profiler)
+
+    def test_turns_itself_off_after_its_cycles(self):
+        self.cycle()
+        self.assertIs(self.coordinator.profiler, self.profiler)
+        self.hass.async_create_task.assert_not_called()
+
+        self.cycle()
+
+        self.assertIsNone(self.coordinator.profiler)
+        self.hass.async_create_task.assert_called_once()
+        self.hass.async_create_task.call_args.args[0].close()
+        self.assertIsNone(sys.getprofile())
+
+    def test_writes_report_with_stage_breakdown(self):
+        self.cycle()
+        self.cycle()
+        self.hass.async_create_task.call_args.args[0].close()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = self.profiler.write_report(Path(directory))
+
+            report = path.read_text()
+            self.assertTrue(path.with_suffix('.prof').exists())
+
+        lines = report.splitlines()
+        self.assertEqual(lines[2].split(), ['cycle', 'entry', 'fetch', 'apply', 'notify', 'total'])
+        self.assertEqual(lines[3].split()[:2], ['1', 'user@example.com'])
+        self.assertEqual(lines[5].split()[0], 'mean')
+        self.assertIn('cumulative', report)
+
+    def test_ignores_cycles_that_did_not_start(self):
+        self.profiler.end_cycle('entry')
+
+        self.assertIs(self.coordinator.profiler, self.profiler)
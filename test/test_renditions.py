@@ -0,0 +1,103 @@
+import io
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase, TestCase, skipIf
+from unittest.mock import Mock, AsyncMock, patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.spypoint.photos import Photo
+from custom_components.spypoint.renditions import SpypointRenditionCache, rendition_for_width, render, Image
+
+PHOTO = Photo(id='1', camera_id='camera', date=datetime(2024, 6, 1, tzinfo=timezone.utc),
+              urls={'small': 'https://cdn/1-s.jpg', 'large': 'https://cdn/1.jpg'})
+
+
+class TestRenditionForWidth(TestCase):
+
+    def test_picks_smallest_rendition_at_least_as_wide(self):
+        self.assertEqual(rendition_for_width(200), 'small')
+        self.assertEqual(rendition_for_width(320), 'small')
+        self.assertEqual(rendition_for_width(500), 'medium')
+        self.assertEqual(rendition_for_width(1920), 'large')
+
+
+@skipIf(Image is None, 'Pillow is not installed')
+class TestRender(TestCase):
+
+    def test_renders_jpeg_within_size(self):
+        original = io.BytesIO()
+        Image.new('RGB', (1600, 1200)).save(original, format='JPEG')
+
+        with Image.open(io.BytesIO(render(original.getvalue(), 320))) as rendition:
+            self.assertEqual(rendition.size, (320, 240))
+            self.assertEqual(rendition.format, 'JPEG')
+
+
+class TestSpypointRenditionCache(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.hass = Mock(HomeAssistant)
+        self.hass.async_add_executor_job = AsyncMock(side_effect=lambda target, *args: target(*args))
+        self.photo_cache = Mock()
+        self.photo_cache.async_get = AsyncMock(return_value=b'original photo')
+        patcher = patch('custom_components.spypoint.renditions.render', side_effect=lambda content, pixels: f'{pixels}px'.encode())
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('custom_components.spypoint.renditions.Image', Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = self.rendition_cache()
+
+    def rendition_cache(self, max_bytes=1024):
+        return SpypointRenditionCache(self.hass, self.photo_cache, self.directory, max_bytes=max_bytes)
+
+    async def test_renders_rendition_once(self):
+        first = await self.cache.async_get(PHOTO, 'small')
+        second = await self.cache.async_get(PHOTO, 'small')
+
+        self.assertEqual(first, b'320px')
+        self.assertEqual(second, b'320px')
+        self.render.assert_called_once_with(b'original photo', 320)
+        self.photo_cache.async_get.assert_called_once_with('1', 'https://cdn/1.jpg')
+
+    async def test_serves_original_for_large_size(self):
+        content = await self.cache.async_get(PHOTO, 'large')
+
+        self.assertEqual(content, b'original photo')
+        self.render.assert_not_called()
+
+    async def test_evicts_least_recently_served_renditions(self):
+        self.cache = self.rendition_cache(max_bytes=8)
+        await self.cache.async_get(PHOTO, 'small')
+        await self.cache.async_get(PHOTO, 'medium')
+
+        self.assertEqual([path.name for path in self.directory.iterdir()], ['1_medium.jpg'])
+        self.assertEqual(self.cache.size, 5)
+
+    async def test_keeps_renditions_across_restarts(self):
+        await self.cache.async_get(PHOTO, 'small')
+
+        content = await self.rendition_cache().async_get(PHOTO, 'small')
+
+        self.assertEqual(content, b'320px')
+        self.render.assert_called_once()
+
+    async def test_serves_original_when_photo_cannot_be_rendered(self):
+        self.render.side_effect = OSError('cannot identify image file')
+
+        content = await self.cache.async_get(PHOTO, 'small')
+
+        self.assertEqual(content, b'original photo')
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    async def test_serves_cloud_rendition_without_pillow(self):
+        with patch('custom_components.spypoint.renditions.Image', None):
+            await self.cache.async_get(PHOTO, 'small')
+
+        self.photo_cache.async_get.assert_called_once_with('1_small', 'https://cdn/1-s.jpg')
+        self.render.assert_not_called()
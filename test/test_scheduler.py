@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+from spypointapi import Camera
+
+from custom_components.spypoint.const import DEFAULT_UPDATE_INTERVAL, MIN_UPDATE_INTERVAL, MAX_UPDATE_INTERVAL, \
+    CHECK_IN_GRACE_PERIOD
+from custom_components.spypoint.scheduler import SpypointPollScheduler
+
+
+class TestSpypointPollScheduler(TestCase):
+
+    def setUp(self):
+        self.now = datetime.now().astimezone()
+        self.scheduler = SpypointPollScheduler()
+
+    def test_polls_at_default_interval_until_cadence_is_learned(self):
+        interval = self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(minutes=5))], self.now)
+
+        self.assertEqual(interval, DEFAULT_UPDATE_INTERVAL)
+
+    def test_learns_camera_cadence(self):
+        self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(minutes=25))], self.now)
+        self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(minutes=5))], self.now)
+
+        self.assertEqual(self.scheduler.cadence('id'), timedelta(minutes=20))
+
+    def test_polls_just_after_the_earliest_expected_check_in(self):
+        self.scheduler.next_interval([self.camera('1', self.now - timedelta(minutes=25)),
+                                      self.camera('2', self.now - timedelta(minutes=25))], self.now)
+        interval = self.scheduler.next_interval([self.camera('1', self.now - timedelta(minutes=5)),
+                                                 self.camera('2', self.now - timedelta(minutes=15))], self.now)
+
+        self.assertEqual(interval, timedelta(minutes=5) + CHECK_IN_GRACE_PERIOD)
+
+    def test_expects_next_slot_after_a_missed_check_in(self):
+        self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(minutes=25))], self.now)
+        self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(minutes=15))], self.now)
+
+        interval = self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(minutes=15))], self.now)
+
+        self.assertEqual(interval, timedelta(minutes=5) + CHECK_IN_GRACE_PERIOD)
+
+    def test_interval_is_bounded(self):
+        self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(hours=4))], self.now)
+        interval = self.scheduler.next_interval([self.camera(last_update=self.now)], self.now)
+        self.assertEqual(interval, MAX_UPDATE_INTERVAL)
+
+        self.scheduler = SpypointPollScheduler()
+        self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(minutes=20))], self.now)
+        interval = self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(minutes=10))], self.now)
+        self.assertEqual(interval, MIN_UPDATE_INTERVAL)
+
+    def test_backs_off_when_all_cameras_are_offline(self):
+        offline = self.camera(last_update=self.now - timedelta(days=2))
+
+        first = self.scheduler.next_interval([offline], self.now)
+        second = self.scheduler.next_interval([offline], self.now)
+
+        self.assertEqual(first, DEFAULT_UPDATE_INTERVAL * 2)
+        self.assertEqual(second, DEFAULT_UPDATE_INTERVAL * 4)
+
+    def test_tightens_after_a_change_is_seen(self):
+        offline = self.camera(last_update=self.now - timedelta(days=2))
+        self.scheduler.next_interval([offline], self.now)
+        self.scheduler.next_interval([offline], self.now)
+
+        interval = self.scheduler.next_interval([self.camera(last_update=self.now)], self.now)
+
+        self.assertEqual(interval, DEFAULT_UPDATE_INTERVAL)
+
+    def test_keeps_cadence_of_camera_that_loses_its_last_update(self):
+        self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(minutes=25))], self.now)
+        self.scheduler.next_interval([self.camera(last_update=self.now - timedelta(minutes=5))], self.now)
+
+        interval = self.scheduler.next_interval([self.camera(last_update=None)], self.now)
+        self.scheduler.next_interval([self.camera(last_update=self.now)], self.now)
+
+        self.assertEqual(interval, DEFAULT_UPDATE_INTERVAL * 2)
+        self.assertEqual(self.scheduler.cadence('id'), timedelta(minutes=20) * 0.7 + timedelta(minutes=5) * 0.3)
+
+    @staticmethod
+    def camera(id='id', last_update=None):
+        return Camera(id=id, name="Test", model="model",
+                      modem_firmware="modem_firmware", camera_firmware="camera_firmware",
+                      last_update_time=last_update)
@@ -1,9 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import Mock
 
 from homeassistant.components.sensor import SensorStateClass, SensorDeviceClass
-from homeassistant.const import EntityCategory, PERCENTAGE, UnitOfTemperature
+from homeassistant.const import EntityCategory, PERCENTAGE, UnitOfTemperature, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
@@ -11,9 +11,12 @@ from homeassistant.util import slugify
 from spypointapi import Camera
 
 from custom_components.spypoint import DOMAIN
+from custom_components.spypoint.battery import SpypointBatteryPredictor
 from custom_components.spypoint.const import MANUFACTURER
-from custom_components.spypoint.sensor import async_setup_entry, SignalSensor, TemperatureSensor, BatterySensor, \
-    MemorySensor, LastUpdateSensor, OnlineSensor, NotificationsSensor, BatteryTypeSensor, OwnerSensor
+from custom_components.spypoint.entity import SpypointCameraEntity
+from custom_components.spypoint.fleet import SpypointFleetAggregates
+from custom_components.spypoint.metrics import SpypointCoordinatorMetrics
+from custom_components.spypoint.sensor import async_setup_entry, MetricSensor, METRICS, FleetSensor, FLEET_SENSORS
 
 
 class TestSensorCreation(IsolatedAsyncioTestCase):
@@ -21,27 +24,104 @@ class TestSensorCreation(IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
         entry = Mock()
         entry.entry_id = 'id'
+        entry.title = 'user@example.com'
         self.coordinator = Mock(DataUpdateCoordinator)
+        self.coordinator.config_entry = entry
+        self.coordinator.metrics = SpypointCoordinatorMetrics()
         self.camera = Camera(id="id", name="Test", model="model",
                              modem_firmware="modem_firmware", camera_firmware="camera_firmware",
                              last_update_time=datetime.now().astimezone(),
                              signal=100, temperature=20, battery=50, battery_type="12V", memory=45,
                              owner='Dude')
-        self.coordinator.data = {'123': self.camera}
+        self.coordinator.data = {'id': self.camera}
+        self.coordinator.fleet = SpypointFleetAggregates()
+        self.coordinator.fleet.update(self.camera)
+        self.coordinator.account_cameras = {'id': 'Test'}
         hass = Mock(HomeAssistant)
         hass.data = {DOMAIN: {entry.entry_id: self.coordinator}}
 
-        async_add_devices = Mock()
-        await async_setup_entry(hass, entry, async_add_devices)
-        async_add_devices.assert_called_once()
+        self.async_add_devices = Mock()
+        await async_setup_entry(hass, entry, self.async_add_devices)
+        self.async_add_devices.assert_called_once()
 
-        self.sensors = async_add_devices.call_args.args[0]
+        self.sensors = self.async_add_devices.call_args.args[0]
 
     async def test_add_sensors_on_setup(self):
-        self.assertEqual(len(self.sensors), 9)
+        camera_sensors = [sensor for sensor in self.sensors if isinstance(sensor, SpypointCameraEntity)]
+        self.assertEqual(len(camera_sensors), 11)
+
+    async def test_add_disabled_metric_sensors_on_setup(self):
+        metric_sensors = [sensor for sensor in self.sensors if isinstance(sensor, MetricSensor)]
+        self.assertEqual(len(metric_sensors), len(METRICS))
+
+        sensor = next(sensor for sensor in metric_sensors if sensor.entity_description.key == 'latency_p95')
+        self.coordinator.metrics.record_fetch(0.25, cameras=1)
+        self.assertEqual(sensor.native_value, 0.25)
+        self.assertEqual(sensor._attr_name, 'Spypoint user@example.com Fetch Latency 95th Percentile')
+        self.assertEqual(sensor._attr_unique_id, 'id_latency_p95')
+        self.assertEqual(sensor.native_unit_of_measurement, UnitOfTime.SECONDS)
+        self.assertEqual(sensor.entity_category, EntityCategory.DIAGNOSTIC)
+        self.assertFalse(sensor.entity_registry_enabled_default)
+
+    async def test_add_fleet_sensors_on_setup(self):
+        fleet_sensors = {sensor.entity_description.key: sensor for sensor in self.sensors if isinstance(sensor, FleetSensor)}
+        self.assertEqual(len(fleet_sensors), len(FLEET_SENSORS))
+
+        self.assertEqual(fleet_sensors['cameras_offline'].native_value, 0)
+        self.assertEqual(fleet_sensors['average_memory'].native_value, 45)
+        self.assertEqual(fleet_sensors['cameras_with_notifications'].native_value, 0)
+        sensor = fleet_sensors['lowest_battery']
+        self.assertEqual(sensor.native_value, 50)
+        self.assertEqual(sensor.extra_state_attributes, {'camera_id': 'id', 'camera_name': 'Test'})
+        self.assertEqual(sensor._attr_name, 'Spypoint user@example.com Lowest Battery Level')
+        self.assertEqual(sensor._attr_unique_id, 'id_lowest_battery')
+        self.assertEqual(sensor.device_class, SensorDeviceClass.BATTERY)
+
+    async def test_fleet_sensor_writes_only_changes(self):
+        sensor = next(sensor for sensor in self.sensors if isinstance(sensor, FleetSensor) and sensor.entity_description.key == 'lowest_battery')
+        sensor.async_write_ha_state = Mock()
+        self.coordinator.last_update_success = True
+        self.coordinator.count_entity_update = Mock()
+        sensor._written = sensor._state()
+
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.assert_not_called()
+
+        self.coordinator.fleet.update(Camera(id='id', name='Test', model='model', modem_firmware='modem_firmware',
+                                             camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone(),
+                                             battery=40, memory=45))
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.assert_called_once()
+
+    async def test_add_sensors_for_new_cameras(self):
+        self.coordinator.async_add_listener.assert_called_once()
+        async_add_new_cameras = self.coordinator.async_add_listener.call_args.args[0]
+        self.async_add_devices.reset_mock()
+
+        camera = Camera(id="456", name="New", model="model",
+                        modem_firmware="modem_firmware", camera_firmware="camera_firmware",
+                        last_update_time=datetime.now().astimezone())
+        self.coordinator.data = {'id': self.camera, '456': camera}
+        self.coordinator.added_cameras = frozenset({'456'})
+        async_add_new_cameras()
+
+        self.async_add_devices.assert_called_once()
+        sensors = self.async_add_devices.call_args.args[0]
+        self.assertEqual(len(sensors), 10)
+        self.assertTrue(all(sensor._camera_id == '456' for sensor in sensors))
+        self.assertTrue(all(sensor.device_info is sensors[0].device_info for sensor in sensors))
+
+    async def test_no_sensors_added_when_no_new_cameras(self):
+        async_add_new_cameras = self.coordinator.async_add_listener.call_args.args[0]
+        self.async_add_devices.reset_mock()
+
+        self.coordinator.added_cameras = frozenset()
+        async_add_new_cameras()
+
+        self.async_add_devices.assert_not_called()
 
     def test_signal_sensor_created(self):
-        self.assert_sensor_created(type=SignalSensor,
+        self.assert_sensor_created(key='signal',
                                    name='Cellular Signal Strength',
                                    state_class=SensorStateClass.MEASUREMENT,
                                    entity_category=EntityCategory.DIAGNOSTIC,
@@ -49,7 +129,7 @@ class TestSensorCreation(IsolatedAsyncioTestCase):
                                    value=100)
 
     def test_temperature_sensor_created(self):
-        self.assert_sensor_created(type=TemperatureSensor,
+        self.assert_sensor_created(key='temperature',
                                    name='Temperature',
                                    state_class=SensorStateClass.MEASUREMENT,
                                    device_class=SensorDeviceClass.TEMPERATURE,
@@ -57,7 +137,7 @@ class TestSensorCreation(IsolatedAsyncioTestCase):
                                    value=20)
 
     def test_battery_sensor_created(self):
-        self.assert_sensor_created(type=BatterySensor,
+        self.assert_sensor_created(key='battery',
                                    name='Battery Level',
                                    state_class=SensorStateClass.MEASUREMENT,
                                    device_class=SensorDeviceClass.BATTERY,
@@ -66,13 +146,13 @@ class TestSensorCreation(IsolatedAsyncioTestCase):
                                    value=50)
 
     def test_battery_type_sensor_created(self):
-        self.assert_sensor_created(type=BatteryTypeSensor,
+        self.assert_sensor_created(key='battery_type',
                                    name='Battery Type',
                                    entity_category=EntityCategory.DIAGNOSTIC,
                                    value='12V')
 
     def test_memory_consumed_sensor_created(self):
-        self.assert_sensor_created(type=MemorySensor,
+        self.assert_sensor_created(key='memory',
                                    name='SD Card Usage',
                                    state_class=SensorStateClass.MEASUREMENT,
                                    entity_category=EntityCategory.DIAGNOSTIC,
@@ -80,34 +160,56 @@ class TestSensorCreation(IsolatedAsyncioTestCase):
                                    value=45)
 
     def test_last_update_sensor_created(self):
-        self.assert_sensor_created(type=LastUpdateSensor,
+        self.assert_sensor_created(key='last_update_time',
                                    name='Last Update',
                                    device_class=SensorDeviceClass.TIMESTAMP,
                                    value=self.camera.last_update_time)
 
     def test_online_sensor_created(self):
-        self.assert_sensor_created(type=OnlineSensor,
+        self.assert_sensor_created(key='is_online',
                                    name='Status',
                                    device_class=SensorDeviceClass.ENUM,
                                    options=['Online', 'Offline'],
                                    value='Online')
 
     def test_notifications_sensor_created(self):
-        self.assert_sensor_created(type=NotificationsSensor,
+        self.assert_sensor_created(key='notifications',
                                    name='Notifications',
                                    entity_category=EntityCategory.DIAGNOSTIC,
                                    value='None')
 
     def test_owner_sensor_created(self):
-        self.assert_sensor_created(type=OwnerSensor,
+        self.assert_sensor_created(key='owner',
                                    name='Owner',
                                    entity_category=EntityCategory.DIAGNOSTIC,
                                    value='Dude')
 
-    def assert_sensor_created(self, type, name, state_class=None, device_class=None, unit=None, precision=None, options=None, value=None, entity_category=None):
-        sensor = next(s for s in self.sensors if isinstance(s, type))
+    def test_battery_drain_rate_sensor_created(self):
+        predictor = SpypointBatteryPredictor()
+        for day, level in enumerate([90, 88, 86]):
+            predictor.add(self.camera.last_update_time + timedelta(days=day), level)
+        self.coordinator.battery = Mock(return_value=predictor)
+
+        self.assert_sensor_created(key='battery_drain_rate',
+                                   name='Battery Drain Rate',
+                                   state_class=SensorStateClass.MEASUREMENT,
+                                   entity_category=EntityCategory.DIAGNOSTIC,
+                                   unit='%/d',
+                                   value=2)
+
+    def test_battery_days_remaining_sensor_created(self):
+        self.coordinator.battery = Mock(return_value=None)
+
+        self.assert_sensor_created(key='battery_days_remaining',
+                                   name='Battery Days Remaining',
+                                   device_class=SensorDeviceClass.DURATION,
+                                   unit=UnitOfTime.DAYS,
+                                   value=None)
+
+    def assert_sensor_created(self, key, name, state_class=None, device_class=None, unit=None, precision=None, options=None, value=None, entity_category=None):
+        sensor = next(s for s in self.sensors if isinstance(s, SpypointCameraEntity) and s.entity_description.key == key)
         self.assertEqual(sensor.coordinator, self.coordinator)
-        self.assertEqual(sensor._camera, self.camera)
+        self.assertEqual(sensor._camera_id, self.camera.id)
         self.assertEqual(sensor.device_info, DeviceInfo(identifiers={(DOMAIN, self.camera.id)},
                                                         manufacturer=MANUFACTURER,
                                                         model=self.camera.model,
@@ -115,17 +217,17 @@ class TestSensorCreation(IsolatedAsyncioTestCase):
                                                         hw_version=self.camera.modem_firmware,
                                                         name='Spypoint Test'))
         if state_class is not None:
-            self.assertEqual(sensor._attr_state_class, state_class)
+            self.assertEqual(sensor.state_class, state_class)
         if device_class is not None:
-            self.assertEqual(sensor._attr_device_class, device_class)
+            self.assertEqual(sensor.device_class, device_class)
         if unit is not None:
-            self.assertEqual(sensor._attr_native_unit_of_measurement, unit)
+            self.assertEqual(sensor.native_unit_of_measurement, unit)
         if precision is not None:
-            self.assertEqual(sensor._attr_suggested_display_precision, precision)
+            self.assertEqual(sensor.suggested_display_precision, precision)
         if options is not None:
-            self.assertEqual(sensor._attr_options, options)
+            self.assertEqual(sensor.options, options)
         if entity_category is not None:
-            self.assertEqual(sensor._attr_entity_category, entity_category)
+            self.assertEqual(sensor.entity_category, entity_category)
 
         self.assertEqual(sensor._attr_name, f'Spypoint Test {name}')
         self.assertEqual(sensor._attr_unique_id, f'spypoint_test_{slugify(name)}')
@@ -0,0 +1,100 @@
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock, AsyncMock, patch
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.spypoint import DOMAIN, SpypointCoordinator
+from custom_components.spypoint.profiler import SpypointProfiler
+from custom_components.spypoint.services import async_setup_services, SERVICE_REFRESH, SERVICE_PROFILE, ATTR_CAMERA_ID, \
+    ATTR_CYCLES
+
+
+class TestRefreshService(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.hass = Mock(HomeAssistant)
+        self.hass.services = Mock()
+        self.first = self.coordinator_mock('first', ['1', '2'])
+        self.second = self.coordinator_mock('second', ['3'])
+        self.hass.data = {DOMAIN: {'first': self.first, 'second': self.second}}
+        async_setup_services(self.hass)
+        handlers = {(call.args[0], call.args[1]): call.args[2] for call in self.hass.services.async_register.call_args_list}
+        self.handler = handlers[(DOMAIN, SERVICE_REFRESH)]
+        self.profile_handler = handlers[(DOMAIN, SERVICE_PROFILE)]
+
+        patcher = patch('custom_components.spypoint.services.dr.async_get')
+        self.device_registry = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def coordinator_mock(entry_id, camera_ids):
+        coordinator = Mock(SpypointCoordinator)
+        coordinator.config_entry = Mock()
+        coordinator.config_entry.entry_id = entry_id
+        coordinator.account_cameras = {camera_id: camera_id for camera_id in camera_ids}
+        coordinator.async_refresh_cameras = AsyncMock()
+        coordinator.profiler = None
+        return coordinator
+
+    async def call(self, **data):
+        call = Mock(ServiceCall)
+        call.data = data
+        await self.handler(call)
+
+    async def test_refreshes_all_cameras_without_target(self):
+        await self.call()
+
+        self.first.async_refresh_cameras.assert_called_once_with(None)
+        self.second.async_refresh_cameras.assert_called_once_with(None)
+
+    async def test_refreshes_targeted_cameras(self):
+        await self.call(**{ATTR_CAMERA_ID: ['2']})
+
+        self.first.async_refresh_cameras.assert_called_once_with({'2'})
+        self.second.async_refresh_cameras.assert_not_called()
+
+    async def test_refreshes_cameras_of_targeted_devices(self):
+        device = Mock()
+        device.identifiers = {(DOMAIN, '3')}
+        self.device_registry.async_get.return_value = device
+
+        await self.call(**{ATTR_DEVICE_ID: ['device']})
+
+        self.first.async_refresh_cameras.assert_not_called()
+        self.second.async_refresh_cameras.assert_called_once_with({'3'})
+
+    async def test_refreshes_every_camera_of_a_targeted_account(self):
+        device = Mock()
+        device.identifiers = {(DOMAIN, 'first')}
+        self.device_registry.async_get.return_value = device
+
+        await self.call(**{ATTR_DEVICE_ID: ['device']})
+
+        self.first.async_refresh_cameras.assert_called_once_with(None)
+        self.second.async_refresh_cameras.assert_not_called()
+
+    async def test_rejects_unknown_cameras(self):
+        with self.assertRaises(ServiceValidationError):
+            await self.call(**{ATTR_CAMERA_ID: ['2', '4']})
+
+        self.first.async_refresh_cameras.assert_not_called()
+
+    async def test_profiles_every_account(self):
+        call = Mock(ServiceCall)
+        call.data = {ATTR_CYCLES: 2}
+
+        self.profile_handler(call)
+
+        self.assertIsInstance(self.first.profiler, SpypointProfiler)
+        self.assertIs(self.second.profiler, self.first.profiler)
+        self.assertEqual(self.first.profiler.cycles, 2)
+
+    async def test_rejects_profiling_while_profiling(self):
+        call = Mock(ServiceCall)
+        call.data = {ATTR_CYCLES: 2}
+        self.profile_handler(call)
+
+        with self.assertRaises(ServiceValidationError):
+            self.profile_handler(call)
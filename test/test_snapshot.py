@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch, Mock, AsyncMock
+
+from homeassistant.core import HomeAssistant
+from spypointapi import Camera, Coordinates
+from spypointapi.cameras.camera import TransmitTime
+
+from custom_components.spypoint.snapshot import SpypointSnapshotStore, camera_to_dict, camera_from_dict
+
+
+class TestSpypointSnapshotStore(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        patcher = patch('custom_components.spypoint.snapshot.Store')
+        self.store = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.store.async_load = AsyncMock(return_value=None)
+        self.snapshot_store = SpypointSnapshotStore(Mock(HomeAssistant), 'entry')
+        self.camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                             camera_firmware='camera_firmware', last_update_time=datetime.now().astimezone(),
+                             signal=100, temperature=20, battery=50, notifications=['low_battery'],
+                             coordinates=Coordinates(latitude=45.1234, longitude=-70.5678))
+
+    async def test_saved_cameras_are_restored(self):
+        self.snapshot_store.async_save({'123': self.camera})
+        saved = self.store.async_delay_save.call_args.args[0]()
+        self.store.async_load.return_value = saved
+
+        cameras = await self.snapshot_store.async_load()
+
+        self.assertEqual(cameras, {'123': self.camera})
+
+    async def test_nothing_restored_without_snapshot(self):
+        cameras = await self.snapshot_store.async_load()
+
+        self.assertIsNone(cameras)
+
+    async def test_every_field_survives_the_round_trip(self):
+        now = datetime.now().astimezone()
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                        camera_firmware='camera_firmware', last_update_time=now,
+                        coordinates=Coordinates(latitude=45.1234, longitude=-70.5678),
+                        activation_date=now - timedelta(days=30), creation_date=now - timedelta(days=60),
+                        transmit_time=TransmitTime(hour=6, minute=30))
+
+        self.assertEqual(camera_from_dict(camera_to_dict(camera)), camera)
+
+    async def test_camera_that_has_not_reported_survives_the_round_trip(self):
+        camera = Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware', camera_firmware='camera_firmware')
+
+        self.assertEqual(camera_from_dict(camera_to_dict(camera)), camera)
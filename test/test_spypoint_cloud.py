@@ -0,0 +1,197 @@
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from http import HTTPStatus
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock, AsyncMock, MagicMock, patch
+
+from aiohttp import ClientSession
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.entity import Entity
+
+from custom_components.spypoint import DOMAIN, SpypointCoordinator, device_tracker, sensor
+from custom_components.spypoint.config_flow import SpypointConfigFlow
+from test.spypoint_cloud import SpypointCloud, Fault, FIXTURES, USERNAME, PASSWORD
+
+CAMERA_IDS = ['5f0d1a2b3c4d5e6f7a8b9c01', '5f0d1a2b3c4d5e6f7a8b9c02', '5f0d1a2b3c4d5e6f7a8b9c03']
+
+
+class TestSpypointCloud(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.cloud = await self.enterAsyncContext(SpypointCloud())
+        self.session = await self.enterAsyncContext(ClientSession())
+
+    def coordinator(self, api=None):
+        entry = Mock(ConfigEntry)
+        entry.entry_id = 'entry'
+        entry.title = USERNAME
+        return SpypointCoordinator(hass=Mock(HomeAssistant), api=api or self.cloud.api(self.session), entry=entry)
+
+    @patch('custom_components.spypoint.config_flow.async_get_clientsession')
+    @patch('custom_components.spypoint.config_flow.async_get_token_store')
+    async def configure(self, data, async_get_token_store, async_get_clientsession):
+        async_get_token_store.return_value.async_save = AsyncMock()
+        flow = SpypointConfigFlow()
+        flow.hass = Mock(HomeAssistant)
+        flow.flow_id = 'flow'
+        flow.handler = DOMAIN
+        flow.context = {'source': 'user'}
+        flow.async_set_unique_id = AsyncMock()
+        flow._abort_if_unique_id_configured = Mock()
+        async_get_clientsession.return_value = self.session
+        # the flow builds its own api, pointed at the stand-in here
+        with patch('custom_components.spypoint.config_flow.SpypointApi',
+                   side_effect=lambda username, password, session: self.cloud.api(session, password)):
+            return await flow.async_step_user(data)
+
+    async def test_replays_own_and_shared_cameras(self):
+        cameras = await self.cloud.api(self.session).async_get_cameras()
+
+        self.assertEqual([camera.id for camera in cameras], CAMERA_IDS)
+        self.assertEqual(cameras[0].name, 'Trail')
+        self.assertEqual(cameras[2].name, 'Neighbour')
+
+    async def test_rejects_invalid_credentials(self):
+        coordinator = self.coordinator(self.cloud.api(self.session, password='wrong'))
+
+        with self.assertRaises(ConfigEntryAuthFailed):
+            await coordinator._async_update_data()
+
+    async def test_authenticates_again_after_token_expired(self):
+        coordinator = self.coordinator()
+        await coordinator._async_update_data()
+        self.cloud.expire_tokens()
+
+        cameras = await coordinator._async_update_data()
+
+        self.assertEqual(list(cameras), CAMERA_IDS)
+        self.assertFalse(coordinator.stale)
+        self.assertEqual(self.cloud.count('user/login'), 2)
+
+    async def test_serves_stale_cameras_on_server_errors(self):
+        coordinator = self.coordinator()
+        coordinator.data = await coordinator._async_update_data()
+        self.cloud.inject(Fault(endpoint='camera/all', status=HTTPStatus.SERVICE_UNAVAILABLE))
+
+        cameras = await coordinator._async_update_data()
+
+        self.assertIs(cameras, coordinator.data)
+        self.assertTrue(coordinator.stale)
+        self.assertEqual(coordinator.metrics.errors, 1)
+
+    async def test_raises_on_server_errors_without_cameras(self):
+        coordinator = self.coordinator()
+        self.cloud.inject(Fault(status=HTTPStatus.INTERNAL_SERVER_ERROR))
+
+        with self.assertRaises(ConnectionError):
+            await coordinator._async_update_data()
+
+    @patch('custom_components.spypoint.coordinator.FETCH_TIMEOUT', timedelta(seconds=0.1))
+    async def test_serves_stale_cameras_on_slow_responses(self):
+        coordinator = self.coordinator()
+        coordinator.data = await coordinator._async_update_data()
+        self.cloud.inject(Fault(endpoint='shared-cameras/all', latency=1))
+
+        cameras = await coordinator._async_update_data()
+
+        self.assertIs(cameras, coordinator.data)
+        self.assertEqual(coordinator.metrics.timeouts, 1)
+
+    async def test_serves_stale_cameras_on_truncated_responses(self):
+        coordinator = self.coordinator()
+        coordinator.data = await coordinator._async_update_data()
+        self.cloud.inject(Fault(endpoint='camera/all', truncate=True))
+
+        cameras = await coordinator._async_update_data()
+
+        self.assertIs(cameras, coordinator.data)
+        self.assertTrue(coordinator.stale)
+
+    async def test_config_flow_creates_entry_with_valid_credentials(self):
+        result = await self.configure({CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD})
+
+        self.assertEqual(result['type'], FlowResultType.CREATE_ENTRY)
+        self.assertEqual(result['title'], USERNAME)
+        self.assertEqual(self.cloud.count('user/login'), 1)
+
+    async def test_config_flow_rejects_invalid_credentials(self):
+        result = await self.configure({CONF_USERNAME: USERNAME, CONF_PASSWORD: 'wrong'})
+
+        self.assertEqual(result['type'], FlowResultType.FORM)
+        self.assertEqual(result['errors'], {'base': 'invalid_auth'})
+
+    async def test_config_flow_reports_unreachable_cloud(self):
+        self.cloud.inject(Fault(endpoint='user/login', status=HTTPStatus.SERVICE_UNAVAILABLE))
+
+        result = await self.configure({CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD})
+
+        self.assertEqual(result['type'], FlowResultType.FORM)
+        self.assertEqual(result['errors'], {'base': 'cannot_connect'})
+
+
+class TestSpypointCloudFanOut(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.fixtures = Path(directory.name)
+        shutil.copytree(FIXTURES, self.fixtures, dirs_exist_ok=True)
+        cloud = await self.enterAsyncContext(SpypointCloud(self.fixtures))
+        session = await self.enterAsyncContext(ClientSession())
+        entry = Mock(ConfigEntry)
+        entry.entry_id = 'entry'
+        entry.title = USERNAME
+        self.coordinator = SpypointCoordinator(hass=Mock(HomeAssistant), api=cloud.api(session), entry=entry)
+        self.coordinator.async_add_listener = MagicMock()
+        self.coordinator.data = await self.coordinator._async_update_data()
+
+        hass = Mock(HomeAssistant)
+        hass.data = {DOMAIN: {'entry': self.coordinator}}
+        entities = []
+        for platform in (sensor, device_tracker):
+            await platform.async_setup_entry(hass, entry, entities.extend)
+        # entities disabled by default are never added to hass
+        self.entities = {entity.unique_id: entity for entity in entities if entity.entity_registry_enabled_default}
+        for entity in self.entities.values():
+            await entity.async_added_to_hass()
+
+    def check_in(self, camera_id, **status):
+        path = self.fixtures / 'camera_all.json'
+        cameras = json.loads(path.read_text())
+        next(camera for camera in cameras if camera['id'] == camera_id)['status'].update(status)
+        path.write_text(json.dumps(cameras))
+
+    async def fan_out(self):
+        written = []
+        self.coordinator.data = await self.coordinator._async_update_data()
+        with patch.object(Entity, 'async_write_ha_state', lambda entity: written.append(entity.unique_id)):
+            for entity in self.entities.values():
+                entity._handle_coordinator_update()
+        return written
+
+    async def test_creates_entities_from_replayed_cameras(self):
+        self.assertEqual(self.entities['spypoint_trail_battery_level'].native_value, 90)
+        self.assertEqual(self.entities['spypoint_feeder_temperature'].native_value, 15)
+        self.assertEqual(self.entities['spypoint_neighbour_battery_level'].native_value, 70)
+        self.assertEqual(self.entities['entry_lowest_battery'].native_value, 45)
+        # scrubbed fixtures have no camera positions
+        self.assertFalse(any(isinstance(entity, device_tracker.SpypointCameraTracker) for entity in self.entities.values()))
+
+    async def test_writes_only_entities_of_a_camera_that_checked_in(self):
+        self.check_in(CAMERA_IDS[0], lastUpdate='2024-06-01T13:00:00.000Z', batteries=[85, 0])
+
+        written = await self.fan_out()
+
+        self.assertEqual(sorted(written), ['spypoint_trail_battery_days_remaining', 'spypoint_trail_battery_drain_rate',
+                                           'spypoint_trail_battery_level', 'spypoint_trail_last_update'])
+        self.assertEqual(self.entities['spypoint_trail_battery_level'].native_value, 85)
+
+    async def test_writes_nothing_when_no_camera_changed(self):
+        self.assertEqual(await self.fan_out(), [])
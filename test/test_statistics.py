@@ -0,0 +1,93 @@
+from dataclasses import replace
+from datetime import datetime, timezone
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch, Mock, AsyncMock
+
+from homeassistant.core import HomeAssistant
+from spypointapi import Camera
+
+from custom_components.spypoint import SpypointCoordinator
+from custom_components.spypoint.statistics import SpypointStatisticsImporter, SpypointSampleStore, statistic_id
+
+NOW = datetime(2024, 6, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def camera(hour, minute, battery, temperature=None):
+    return Camera(id='123', name='Test', model='model', modem_firmware='modem_firmware',
+                  camera_firmware='camera_firmware', last_update_time=datetime(2024, 6, 1, hour, minute, tzinfo=timezone.utc),
+                  battery=battery, temperature=temperature)
+
+
+@patch('custom_components.spypoint.statistics.dt_util.utcnow', return_value=NOW)
+@patch('custom_components.spypoint.statistics.async_add_external_statistics')
+class TestSpypointStatisticsImporter(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.hass = Mock(HomeAssistant)
+        self.hass.config = Mock()
+        self.hass.config.components = {'recorder'}
+        self.coordinator = Mock(SpypointCoordinator)
+        self.coordinator.account_cameras = {'123': 'Test'}
+        self.coordinator.changes = {}
+        self.store = Mock(SpypointSampleStore)
+        self.store.async_load = AsyncMock(return_value=None)
+        self.importer = SpypointStatisticsImporter(self.hass, self.coordinator, self.store)
+
+    def check_in(self, camera):
+        self.coordinator.data = {camera.id: camera}
+        self.coordinator.changes = {camera.id: frozenset({'last_update_time', 'battery'})}
+        self.importer.async_update()
+
+    async def test_imports_ended_hours(self, async_add_external_statistics, utcnow):
+        for check_in in [camera(10, 5, battery=90, temperature=10), camera(10, 35, battery=80, temperature=20),
+                         camera(10, 55, battery=70), camera(12, 5, battery=60)]:
+            utcnow.return_value = check_in.last_update_time
+            self.check_in(check_in)
+
+        battery = next(call.args for call in async_add_external_statistics.call_args_list
+                       if call.args[1]['statistic_id'] == statistic_id('123', 'battery'))
+        self.assertEqual(battery[1]['name'], 'Spypoint Test Battery Level')
+        self.assertEqual([(row['start'].hour, row['mean'], row['min'], row['max']) for row in battery[2]],
+                         [(10, 80, 70, 90)])
+
+    async def test_skips_statistics_without_values(self, async_add_external_statistics, _):
+        self.check_in(camera(11, 5, battery=70))
+
+        statistic_ids = [call.args[1]['statistic_id'] for call in async_add_external_statistics.call_args_list]
+        self.assertEqual(statistic_ids, [statistic_id('123', 'battery')])
+
+    async def test_keeps_samples_of_the_current_hour(self, async_add_external_statistics, _):
+        self.check_in(camera(11, 5, battery=70))
+        async_add_external_statistics.reset_mock()
+
+        self.check_in(camera(12, 5, battery=60))
+
+        async_add_external_statistics.assert_not_called()
+        imported_until, samples = self.store.async_save.call_args.args
+        self.assertEqual(imported_until, datetime(2024, 6, 1, 12, tzinfo=timezone.utc).timestamp())
+        self.assertEqual(len(samples['123']), 1)
+
+    async def test_backfills_persisted_samples(self, async_add_external_statistics, _):
+        self.store.async_load.return_value = {
+            'imported_until': datetime(2024, 6, 1, 9, tzinfo=timezone.utc).timestamp(),
+            'samples': {'123': [[camera(9, 15, battery=95).last_update_time.timestamp(), 95, None, None, None]]},
+        }
+
+        await self.importer.async_load()
+
+        async_add_external_statistics.assert_called_once()
+        self.assertEqual(async_add_external_statistics.call_args.args[2][0]['mean'], 95)
+
+    async def test_skips_cameras_without_a_last_update(self, async_add_external_statistics, _):
+        self.check_in(replace(camera(11, 5, battery=70), last_update_time=None))
+
+        async_add_external_statistics.assert_not_called()
+        self.assertEqual(self.store.async_save.call_args.args[1], {})
+
+    async def test_waits_for_recorder(self, async_add_external_statistics, _):
+        self.hass.config.components = set()
+
+        self.check_in(camera(11, 5, battery=70))
+
+        async_add_external_statistics.assert_not_called()
+        self.store.async_save.assert_called_once()
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch, Mock, AsyncMock
+
+from homeassistant.core import HomeAssistant
+from spypointapi import SpypointApi
+
+from custom_components.spypoint.token_store import SpypointTokenStore
+
+
+class TestSpypointTokenStore(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        patcher = patch('custom_components.spypoint.token_store.Store')
+        self.store = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.store.async_load = AsyncMock(return_value=None)
+        self.token_store = SpypointTokenStore(Mock(HomeAssistant))
+        self.api = SpypointApi('username', 'password', Mock())
+
+    async def test_restores_valid_token(self):
+        expires_at = datetime.now() + timedelta(hours=1)
+        self.store.async_load.return_value = {'username': {'authorization': 'Bearer token', 'expires_at': expires_at.timestamp()}}
+
+        restored = await self.token_store.async_restore(self.api)
+
+        self.assertTrue(restored)
+        self.assertEqual(self.api.headers['Authorization'], 'Bearer token')
+        self.assertEqual(self.api.expires_at, datetime.fromtimestamp(expires_at.timestamp()))
+
+    async def test_ignores_expired_token(self):
+        expires_at = datetime.now() - timedelta(minutes=1)
+        self.store.async_load.return_value = {'username': {'authorization': 'Bearer token', 'expires_at': expires_at.timestamp()}}
+
+        restored = await self.token_store.async_restore(self.api)
+
+        self.assertFalse(restored)
+        self.assertNotIn('Authorization', self.api.headers)
+
+    async def test_ignores_unknown_account(self):
+        restored = await self.token_store.async_restore(self.api)
+
+        self.assertFalse(restored)
+
+    async def test_saves_new_token(self):
+        self.api.headers['Authorization'] = 'Bearer token'
+        self.api.expires_at = datetime.now() + timedelta(hours=1)
+
+        await self.token_store.async_save(self.api)
+
+        self.store.async_delay_save.assert_called_once()
+        tokens = self.store.async_delay_save.call_args.args[0]()
+        self.assertEqual(tokens, {'username': {'authorization': 'Bearer token', 'expires_at': self.api.expires_at.timestamp()}})
+
+    async def test_skips_save_when_token_unchanged(self):
+        self.api.headers['Authorization'] = 'Bearer token'
+        self.api.expires_at = datetime.now() + timedelta(hours=1)
+        await self.token_store.async_save(self.api)
+        self.store.async_delay_save.reset_mock()
+
+        await self.token_store.async_save(self.api)
+
+        self.store.async_delay_save.assert_not_called()
+
+    async def test_removes_token_of_removed_account(self):
+        expires_at = datetime.now() + timedelta(hours=1)
+        self.store.async_load.return_value = {'username': {'authorization': 'Bearer token', 'expires_at': expires_at.timestamp()},
+                                              'other': {'authorization': 'Bearer other', 'expires_at': expires_at.timestamp()}}
+
+        await self.token_store.async_remove('username')
+
+        tokens = self.store.async_delay_save.call_args.args[0]()
+        self.assertEqual(list(tokens), ['other'])
+        self.assertFalse(await self.token_store.async_restore(self.api))
+
+    async def test_skips_save_when_not_authenticated(self):
+        await self.token_store.async_save(self.api)
+
+        self.store.async_delay_save.assert_not_called()